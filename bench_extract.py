@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+🏁 Remember Extraction Benchmark - Standalone Script
+Runs the extraction engine against a local HTTP stand-in server and reports URLs/sec
+"""
+
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.absolute()))
+
+from core.extraction import ExtractionEngine
+
+PARAGRAPH = ("The Tenant Protection Act limits annual rent increases and requires just cause "
+             "for terminating tenancies after twelve months of occupancy. ")
+
+def make_handler(latency: float, paragraphs: int):
+    """Build a request handler that sleeps to mimic a remote server, then serves an article"""
+    body = ("<html><head><title>Bench Page</title></head><body><article>"
+            + "".join(f"<p>{PARAGRAPH * 4}</p>" for _ in range(paragraphs))
+            + "</article></body></html>").encode('utf-8')
+
+    class StandInHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, so connection pooling shows up in the numbers
+
+        def do_GET(self):
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return StandInHandler
+
+def run_once(urls, workers: int, per_host: int, delay: float) -> float:
+    """Extract all URLs once and return URLs/sec"""
+    with tempfile.TemporaryDirectory() as content_dir:
+        engine = ExtractionEngine(Path(content_dir), [("Local", None)], ["RememberBench/1.0"],
+                                  workers=workers, per_host=per_host, host_delay=delay, verbose=False)
+        started = time.perf_counter()
+        succeeded, failed = engine.run(urls, on_result=lambda *_: None)
+        elapsed = time.perf_counter() - started
+    if failed:
+        print(f"⚠️ {len(failed)} URLs failed during benchmark")
+    return succeeded / elapsed if elapsed else 0.0
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the concurrent extraction engine")
+    parser.add_argument("--urls", type=int, default=200, help="number of URLs to extract")
+    parser.add_argument("--workers", type=int, default=16, help="worker pool size for the concurrent run")
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated server latency in seconds")
+    parser.add_argument("--paragraphs", type=int, default=20, help="paragraphs per stand-in page")
+    parser.add_argument("--delay", type=float, default=0.0, help="per-host politeness delay in seconds")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.latency, args.paragraphs))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    urls = [f"{base}/page/{i}" for i in range(args.urls)]
+
+    try:
+        # Every stand-in URL shares one host, so the per-host cap has to match the pool size
+        sequential = run_once(urls, workers=1, per_host=1, delay=args.delay)
+        concurrent = run_once(urls, workers=args.workers, per_host=args.workers, delay=args.delay)
+    finally:
+        server.shutdown()
+
+    print(f"\n🏁 Extraction benchmark ({args.urls} URLs, {args.latency * 1000:.0f}ms latency)")
+    print(f"   Sequential (1 worker):        {sequential:8.2f} URLs/sec")
+    print(f"   Concurrent ({args.workers} workers):      {concurrent:8.2f} URLs/sec")
+    if sequential:
+        print(f"   Speedup:                      {concurrent / sequential:8.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -78,24 +78,27 @@ class CollectionHandler(BaseCommand):
             print(f"{'#':<3} {'Name':<45} {'Docs':<8} {'Type':<12} {'Created'}")
             print("-" * 80)
             
+            total_docs = 0
             for i, collection in enumerate(collections, 1):
                 col_data = self.client.get_collection(collection.name)
                 count = col_data.count()
+                total_docs += count
                 
                 # Determine type
                 col_type = 'extraction' if 'extraction' in collection.name else 'other'
                 
                 # Get creation date if available
                 if count > 0:
-                    sample = col_data.get(limit=1, include=['metadatas'])
-                    created = sample['metadatas'][0].get('created', 'unknown') if sample['metadatas'] else 'unknown'
+                    created = (col_data.metadata or {}).get('created')
+                    if not created:
+                        sample = col_data.get(limit=1, include=['metadatas'])
+                        created = sample['metadatas'][0].get('created', 'unknown') if sample['metadatas'] else 'unknown'
                 else:
                     created = 'empty'
                 
                 print(f"{i:<3} {collection.name:<45} {count:<8} {col_type:<12} {created}")
             
             print("-" * 80)
-            total_docs = sum(self.client.get_collection(c.name).count() for c in collections)
             print(f"Total: {len(collections)} collections, {total_docs} documents")
             
         except Exception as e:
@@ -282,6 +285,7 @@ class CollectionHandler(BaseCommand):
                 metadatas=source_data['metadatas'],
                 ids=new_ids
             )
+            self.client.mark_changed()
             
             print(f"✅ Merged {len(source_data['ids'])} documents")
             print(f"🗑️  Now delete source collection: collection delete {source}")
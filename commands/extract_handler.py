@@ -1,16 +1,12 @@
-import requests
-import subprocess
-from bs4 import BeautifulSoup
-from readability import Document
-import json
 from datetime import datetime
 from pathlib import Path
 import re
 import time
-import random
-import fitz  # PyMuPDF
-from typing import List
+from typing import List, Optional
 from commands.base_command import BaseCommand
+from core.checkpoint import SessionCheckpoint
+from core.http_cache import HttpCache
+from core.extraction import ExtractionEngine, DEFAULT_WORKERS, DEFAULT_PER_HOST, DEFAULT_HOST_DELAY, DEFAULT_MAX_PDF_PAGES
 
 # --- Configuration ---
 RED, GREEN, BLUE, YELLOW, BOLD, RESET = '\033[91m', '\033[92m', '\033[94m', '\033[93m', '\033[1m', '\033[0m'
@@ -18,6 +14,7 @@ REMEMBER_DIR = Path.home() / "remember"
 CONTENT_DIR = REMEMBER_DIR / "scraped_content"
 PDF_DIR = REMEMBER_DIR / "pdfs"
 URLS_FILE = REMEMBER_DIR / "urls.txt"
+CHECKPOINT_DIR = REMEMBER_DIR / "checkpoints"
 
 # --- CORRECTED PROXY_ORDER LIST - NO STRAY CHARACTERS ---
 PROXY_ORDER = [
@@ -36,6 +33,9 @@ class ExtractHandler(BaseCommand):
         return ["extract", "scrape", "grab"]
 
     def execute(self, command_input: str) -> str:
+        options = self._parse_options(command_input.strip().split()[1:])
+        if isinstance(options, str): return self.format_error([options])
+
         for d in [CONTENT_DIR, PDF_DIR]: d.mkdir(exist_ok=True, parents=True)
         try:
             with open(URLS_FILE, 'r') as f:
@@ -44,93 +44,82 @@ class ExtractHandler(BaseCommand):
         except FileNotFoundError:
             return self.format_error([f"urls.txt not found in {REMEMBER_DIR}!"])
 
-        print_border_section([f"🚀 TACTICAL EXTRACTION INITIATED", f"📋 URLs: {len(urls)}", f"⚡️ Strategy: Local First"])
-        
-        all_results, failed_urls = [], []
-        for i, url in enumerate(urls, 1):
-            print(f"\n{BLUE}--- Engaging URL {i}/{len(urls)}: {url[:70]}... ---{RESET}")
-            success = False
-            for attempt, (proxy_name, proxy_url) in enumerate(PROXY_ORDER):
-                print(f"{YELLOW}  -> Attempt {attempt + 1}/{len(PROXY_ORDER)} via {proxy_name}...{RESET}")
-                try:
-                    session = requests.Session()
-                    session.headers.update({'User-Agent': random.choice(USER_AGENTS)})
-                    if proxy_url: session.proxies = {"http": proxy_url, "https": proxy_url}
-                    
-                    response = session.get(url, timeout=30, stream=True)
-                    response.raise_for_status()
-                    
-                    content_type = response.headers.get('Content-Type', '').lower()
+        if options['resume']:
+            timestamp = self._resolve_session(options['resume'])
+            if not timestamp: return self.format_error([f"No checkpoint found for session: {options['resume']}"])
+        else:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        checkpoint = SessionCheckpoint(CHECKPOINT_DIR / f"extraction_results_{timestamp}.jsonl")
 
-                    if 'application/pdf' in content_type:
-                        pdf_bytes = response.content
-                        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-                        pdf_text = "".join(page.get_text() for page in doc)
-                        doc.close()
-                        
-                        md_filename = self._clean_filename(url, "md")
-                        md_filepath = CONTENT_DIR / md_filename
-                        title = f"[PDF] {Path(url).name}"
-                        with open(md_filepath, 'w', encoding='utf-8') as f:
-                            f.write(f"# {title}\n\n_Source: {url}_\n\n---\n\n{pdf_text}")
-                        
-                        all_results.append({"url": url, "title": title, "rating": self._calculate_rating(len(pdf_text)),
-                                            "markdown_file": str(md_filepath), "content": pdf_text})
-                        print(f"{GREEN}✅ Success (PDF):{RESET} Extracted {len(pdf_text):,} chars")
-                        success = True
-                        break
+        # On resume, URLs that already succeeded are skipped; earlier failures are retried
+        done = checkpoint.succeeded_urls()
+        todo = [(i, url) for i, url in enumerate(urls, 1) if url not in done]
 
-                    clean_content = response.text.replace('\x00', '')
-                    doc = Document(clean_content)
-                    title = doc.title()
-                    best_content = BeautifulSoup(doc.summary(), 'html.parser').get_text(separator='\n', strip=True)
-                    
-                    if not best_content or len(best_content) < 100:
-                        soup = BeautifulSoup(clean_content, 'html.parser')
-                        [tag.decompose() for tag in soup(["script", "style", "nav", "header", "footer", "aside", "form"])]
-                        best_content = soup.get_text(separator='\n', strip=True)
-                    
-                    md_filename = self._clean_filename(url, "md")
-                    md_filepath = CONTENT_DIR / md_filename
-                    with open(md_filepath, 'w', encoding='utf-8') as f:
-                        f.write(f"# {title}\n\n_Source: {url}_\n\n---\n\n{best_content}")
-                    
-                    rating = self._calculate_rating(len(best_content))
-                    all_results.append({"url": url, "title": title, "rating": rating,
-                                        "markdown_file": str(md_filepath), "content": best_content})
-                    print(f"{GREEN}✅ Success (HTML):{RESET} Saved {len(best_content):,} chars")
-                    success = True
-                    break
+        strategy = "Local First, cache bypassed" if options['refresh'] else "Local First"
+        print_border_section([f"🚀 TACTICAL EXTRACTION INITIATED", f"📋 URLs: {len(urls)}", f"⚡️ Strategy: {strategy}",
+                              f"🧵 Workers: {options['workers']} ({options['per_host']}/host, {options['delay']}s delay)"]
+                             + ([f"♻️ Resuming {timestamp}: {len(done)} done, {len(todo)} to go"] if options['resume'] else []))
 
-                except requests.RequestException as e: print(f"{RED}   - Network Error: {e}{RESET}"); time.sleep(1)
-                except Exception as e: print(f"{RED}   - Critical Error: {e}{RESET}"); break
-            
-            if not success: failed_urls.append(url)
+        engine = ExtractionEngine(CONTENT_DIR, PROXY_ORDER, USER_AGENTS,
+                                  workers=options['workers'], per_host=options['per_host'],
+                                  host_delay=options['delay'], max_pdf_pages=options['max_pages'],
+                                  spool_dir=PDF_DIR, cache=HttpCache(), refresh=options['refresh'])
+        started = time.time()
+        _, failed_urls = engine.run([url for _, url in todo], on_result=checkpoint.record,
+                                    indexes=[i for i, _ in todo], total=len(urls))
+        elapsed = max(time.time() - started, 1e-6)
 
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         results_file = REMEMBER_DIR / f'extraction_results_{timestamp}.json'
-        with open(results_file, 'w', encoding='utf-8') as f: json.dump(all_results, f, indent=2)
+        succeeded = checkpoint.write_json(results_file)
         
-        summary_text = ["📊 MISSION SUMMARY", f"✅ Successful: {len(all_results)}/{len(urls)}", f"❌ Failed: {len(failed_urls)}/{len(urls)}", f"💾 JSON Log: {results_file.name}"]
+        summary_text = ["📊 MISSION SUMMARY", f"✅ Successful: {succeeded}/{len(urls)}", f"❌ Failed: {len(failed_urls)}/{len(urls)}",
+                        f"⏱️ Elapsed: {elapsed:.1f}s ({len(todo) / elapsed:.2f} URLs/sec)", f"💾 JSON Log: {results_file.name}"]
         if failed_urls:
             summary_text.append("Failed URLs:"); summary_text.extend([f"  - {u}" for u in failed_urls])
+            summary_text.append(f"🔁 Retry failures: extract --resume {timestamp}")
         
         return self.format_info(summary_text)
 
-    def _clean_filename(self, url: str, extension: str) -> str:
-        clean = re.sub(r'^https?:\/\/', '', url).replace('/', '_')
-        clean = re.sub(r'[\\?%*:|"<>]', '', clean)
-        return f"{datetime.now().strftime('%Y%m%d%H%M%S')}_{clean[:70]}.{extension}"
+    def _resolve_session(self, session: str) -> Optional[str]:
+        """Accept a bare timestamp or any extraction_results_<timestamp>.* name"""
+        match = re.search(r'(\d{8}_\d{6})', session)
+        if not match or not (CHECKPOINT_DIR / f"extraction_results_{match.group(1)}.jsonl").exists():
+            return None
+        return match.group(1)
 
-    def _calculate_rating(self, length: int) -> int:
-        if length > 8000: return 5;
-        if length > 4000: return 4;
-        if length > 1500: return 3;
-        if length > 500: return 2;
-        return 1
+    def _parse_options(self, args: List[str]):
+        """Parse --workers/--per-host/--delay/--max-pages/--refresh/--resume flags; returns an error string on bad input"""
+        options = {"workers": DEFAULT_WORKERS, "per_host": DEFAULT_PER_HOST, "delay": DEFAULT_HOST_DELAY,
+                   "max_pages": DEFAULT_MAX_PDF_PAGES, "refresh": False, "resume": None}
+        flags = {"--workers": ("workers", int), "--per-host": ("per_host", int), "--delay": ("delay", float),
+                 "--max-pages": ("max_pages", int), "--resume": ("resume", str)}
+        i = 0
+        while i < len(args):
+            if args[i] == "--refresh":
+                options["refresh"] = True
+                i += 1
+                continue
+            if args[i] not in flags:
+                return f"Unknown option: {args[i]}"
+            key, cast = flags[args[i]]
+            try:
+                options[key] = cast(args[i + 1])
+            except (IndexError, ValueError):
+                return f"{args[i]} needs a {'session name' if cast is str else 'numeric value'}"
+            i += 2
+        return options
 
     def get_help(self) -> str:
-        return self.format_info(["Runs the resilient URL scraper on urls.txt."])
+        return self.format_info(["Runs the resilient URL scraper on urls.txt.",
+                                 "",
+                                 "Usage:",
+                                 f"  extract [--workers N] [--per-host N] [--delay SECONDS] [--max-pages N] [--refresh]",
+                                 f"  extract --resume <session>   Skip URLs that succeeded, retry the rest",
+                                 "",
+                                 "Unchanged pages are served from ~/remember/.cache/http via ETag/Last-Modified;",
+                                 "--refresh re-downloads everything.",
+                                 f"PDFs stream to {PDF_DIR.name}/ and are read in page ranges, up to --max-pages (default {DEFAULT_MAX_PDF_PAGES}).",
+                                 f"Defaults: {DEFAULT_WORKERS} workers, {DEFAULT_PER_HOST} per host, {DEFAULT_HOST_DELAY}s between hits to a host"])
 
 def print_border_section(content):
     max_len = max(len(re.sub(r'\033\[[0-9;]*m', '', line)) for line in content) if content else 0
@@ -31,7 +31,7 @@ class ImportHandler(BaseCommand):
     def _interactive_import(self) -> str:
         """Interactive import mode"""
         json_file = questionary.path(
-            "📁 Enter path to extraction JSON file:",
+            "📁 Enter path to extraction JSON/JSONL file:",
             validate=lambda x: Path(x).exists() or "File not found"
         ).ask()
         
@@ -52,7 +52,8 @@ class ImportHandler(BaseCommand):
             
             return self.format_success([
                 f"✅ Imported extraction session: {result['session_id']}",
-                f"📋 URLs imported: {result['urls_imported']}",
+                f"📋 URLs imported: {result['urls_imported']} ({len(result['vector_ids_updated'])} updated in place)",
+                f"♻️ Duplicates skipped: {result['duplicates_skipped']}",
                 f"🗂️ Collection: {result['collection_name']}"
             ])
             
@@ -66,7 +67,9 @@ class ImportHandler(BaseCommand):
             "",
             "Usage:",
             "  import                    Interactive import",
-            "  import <json_file>        Import specific file",
+            "  import <json_file>        Import specific file (.json array, .jsonl, or a checkpoint log)",
             "",
-            "Imports JSON extraction results into Remember database"
+            "Imports JSON or JSONL extraction results into Remember database.",
+            "Large files are streamed and added in batches, so memory stays flat.",
+            "Re-imports are idempotent: unchanged content is skipped, changed pages keep their vector ID."
         ])
@@ -4,7 +4,6 @@
 Universal legal document processing connecting Remember CLI to Groq infrastructure
 """
 
-import sys
 import os
 from typing import List, Optional, Dict, Any
 from pathlib import Path
@@ -12,19 +11,11 @@ import json
 from datetime import datetime
 import questionary
 
-# Add the groq infrastructure to path
-sys.path.append(str(Path.home() / "remember"))
-
 from commands.base_command import BaseCommand
+from core import llm_client
 from core.database import get_client, search_extractions
-
-# Import Groq infrastructure
-try:
-    from groq_client import GroqClient
-    from context_manager import ContextStrategy
-except ImportError:
-    print("❌ Groq infrastructure not found - ensure groq_client.py is in ~/remember/")
-    GroqClient = None
+from core.llm_cache import cache_key, get_llm_cache
+from core.summarization import RollingDigest, TreeSummarizer
 
 class LegalHandler(BaseCommand):
     """Universal legal document analysis handler"""
@@ -32,23 +23,32 @@ class LegalHandler(BaseCommand):
     def __init__(self):
         super().__init__()
         self.groq_client = None
+        self.use_cache = True
     
     def get_aliases(self) -> List[str]:
         return ["legal", "analyze", "process"]
     
     def execute(self, command_input: str) -> Optional[str]:
         """Execute legal analysis command"""
-        if not self._initialize_groq():
-            return self.format_error([
-                "❌ Groq client initialization failed",
-                "Check .env file and groq_client.py in ~/remember/"
-            ])
-        
         parts = command_input.strip().split()
         
-        if len(parts) == 1:
+        self.use_cache = "--no-cache" not in parts
+        warmup = "--warmup" in parts
+        parts = [p for p in parts if p not in ("--no-cache", "--warmup")]
+        
+        # Flags alone ("legal --warmup") are not a subcommand
+        if len(parts) < 2:
             return self._show_legal_help()
         
+        if parts[1].lower() == "cache":
+            return self._cache_command(parts[2:])
+        
+        if not self._initialize_groq(warmup):
+            return self.format_error([
+                "❌ Groq client initialization failed",
+                llm_client.health.error or "Check .env file and groq_client.py in ~/remember/"
+            ])
+        
         subcommand = parts[1].lower()
         
         if subcommand == "batch":
@@ -63,21 +63,30 @@ class LegalHandler(BaseCommand):
         else:
             return self._show_legal_help()
     
-    def _initialize_groq(self) -> bool:
-        """Initialize Groq client with error handling"""
-        if GroqClient is None:
-            return False
-        
-        try:
-            self.groq_client = GroqClient()
-            # Test connection with minimal request
-            success, response, debug = self.groq_client.simple_chat(
-                "Test", "Say OK"
-            )
-            return success
-        except Exception as e:
-            print(f"❌ Groq initialization error: {e}")
+    def _cache_command(self, args: List[str]) -> str:
+        """Show or clear the LLM response cache (no API access needed)"""
+        cache = get_llm_cache()
+        if args and args[0].lower() == "clear":
+            cache.clear()
+            return self.format_success(["🗑️ LLM response cache cleared"])
+        stats = cache.stats()
+        return self.format_info([
+            "⚡ LLM Response Cache",
+            f"📄 Entries: {stats['entries']:,}",
+            f"💾 Size: {stats['bytes'] / 1024 ** 2:.1f} MB of {stats['max_bytes'] / 1024 ** 2:.0f} MB",
+            f"🎯 Hits: {stats['hits']:,}",
+            f"📁 {cache.path}"
+        ])
+    
+    def _initialize_groq(self, warmup: bool = False) -> bool:
+        """Use the shared Groq client; probe only on --warmup or after a failure, else refresh in the background"""
+        self.groq_client = llm_client.get_groq_client()
+        if self.groq_client is None:
             return False
+        if warmup or llm_client.health.state == "failed":
+            return llm_client.probe()
+        llm_client.refresh_in_background()
+        return True
     
     def _batch_process_extractions(self) -> str:
         """Process all extracted documents through user-defined analysis"""
@@ -193,40 +202,52 @@ class LegalHandler(BaseCommand):
                     })
         
         elif "Batch summary" in processing_mode:
-            # Combine all documents, then analyze
-            combined_content = "\n\n---DOCUMENT SEPARATOR---\n\n".join(documents)
-            
-            batch_prompt = f"{analysis_prompt}\n\nAnalyze the following combined documents:\n\n{combined_content}"
-            
-            analysis = self._run_analysis(batch_prompt, "Provide comprehensive analysis of all documents.")
-            if analysis:
+            # Map each document (chunk) in parallel, then reduce in token-budgeted levels;
+            # cached calls mean a re-run after adding a document only recomputes its branch
+            summarizer = TreeSummarizer(
+                self._run_analysis,
+                map_prompt=f"{analysis_prompt}\n\nAnalyze this document. It is one of a collection; "
+                           f"your analysis will be combined with the others.",
+                reduce_prompt=f"{analysis_prompt}\n\nThe following are analyses of parts of a document collection, "
+                              f"separated by ---DOCUMENT SEPARATOR---. Combine them into one comprehensive analysis."
+            )
+            tree = summarizer.run(documents)
+            if tree["summary"]:
                 results.append({
                     'collection': collection_name,
                     'type': 'batch_summary',
                     'document_count': len(documents),
-                    'analysis': analysis,
+                    'analysis': tree["summary"],
+                    'reduce_levels': tree["levels"],
+                    'llm_calls': tree["calls"],
                     'timestamp': datetime.now().isoformat()
                 })
+            elif tree["chunks_missing"]:
+                print(f"⚠️ Batch summary of {collection_name} skipped: {tree['chunks_missing']} of {tree['chunks']} "
+                      f"chunks could not be analyzed. Re-run to retry them (finished chunks are cached).")
+            else:
+                print(f"⚠️ Batch summary of {collection_name} failed ({tree['failed']} of {tree['calls']} calls failed)")
         
         elif "Progressive" in processing_mode:
-            # Build context progressively
-            progressive_context = ""
+            # Build context progressively, in a digest re-summarized whenever it would outgrow its budget
+            digest = RollingDigest(self._run_analysis)
             
             for i, (doc, metadata) in enumerate(zip(documents, metadatas)):
                 print(f"🔄 Progressive analysis {i+1}/{len(documents)}: {metadata.get('title', 'Unknown')[:50]}...")
                 
-                context_prompt = f"{analysis_prompt}\n\nPrevious analysis context:\n{progressive_context}\n\nNew document to analyze:\n{doc}"
+                context_prompt = f"{analysis_prompt}\n\nPrevious analysis context:\n{digest.text}\n\nNew document to analyze:\n{doc}"
                 
                 analysis = self._run_analysis(context_prompt, "Analyze this document in context of previous analysis.")
                 if analysis:
-                    progressive_context += f"\n\nDocument {i+1} Analysis: {analysis}"
+                    digest.add(f"Document {i+1} Analysis: {analysis}")
                     
                     results.append({
                         'collection': collection_name,
                         'document_index': i,
                         'metadata': metadata,
                         'progressive_analysis': analysis,
-                        'cumulative_context': len(progressive_context),
+                        'context_tokens': digest.tokens,
+                        'context_compressions': digest.compressions,
                         'timestamp': datetime.now().isoformat()
                     })
         
@@ -238,18 +259,27 @@ class LegalHandler(BaseCommand):
             return None
         
         try:
-            success, responses, debugs = self.groq_client.auto_process_content(
-                content=content,
-                system_prompt=prompt
+            # Re-runs over unchanged documents are answered from the local response cache
+            key = cache_key(None, [{"role": "system", "content": prompt}, {"role": "user", "content": content}],
+                            kind="auto_process_content")
+            (success, responses, debugs), cached = get_llm_cache().cached_call(
+                key, None,
+                lambda: self.groq_client.auto_process_content(content=content, system_prompt=prompt),
+                use_cache=self.use_cache
             )
+            if cached:
+                print("⚡ Cached analysis")
             
             if success and responses:
+                if not cached:
+                    llm_client.health.mark_ok()
                 return "\n\n".join(responses)
             else:
                 print(f"⚠️ Analysis failed: {debugs}")
                 return None
                 
         except Exception as e:
+            llm_client.health.mark_failed(e)
             print(f"❌ Analysis error: {e}")
             return None
     
@@ -410,6 +440,9 @@ class LegalHandler(BaseCommand):
             "🏛️ Legal Handler Commands",
             "",
             "legal batch                Process all extracted documents",
+            "legal batch --no-cache     Same, but ask the model again for documents analyzed before",
+            "legal <command> --warmup   Check the Groq API (and report its latency) before starting",
+            "legal cache [clear]        Show or clear the cache of LLM responses",
             "legal analyze [query]      Analyze specific documents",
             "legal chat                 Interactive chat session",
             "",
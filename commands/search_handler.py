@@ -3,11 +3,19 @@
 Search extracted URL content
 """
 
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import questionary
 
 from commands.base_command import BaseCommand
-from core.database import search_extractions
+from core.database import search_extractions_timed
+from core.snippets import render_highlights
+
+SLOWEST_SESSIONS_SHOWN = 3
+SEARCH_MODE_FLAGS = {"--lexical": "lexical", "--vector": "vector"}
+FILTER_VALUE_FLAGS = {"--min-rating": "min_rating", "--session": "session", "--project": "project",
+                      "--after": "created_after", "--before": "created_before"}
+FILTER_SWITCHES = {"--analyzed": ("has_analysis", True), "--not-analyzed": ("has_analysis", False),
+                   "--chunks": ("is_chunk", True), "--no-chunks": ("is_chunk", False)}
 
 class SearchHandler(BaseCommand):
     """Handle search commands"""
@@ -18,6 +26,15 @@ class SearchHandler(BaseCommand):
     def execute(self, command_input: str) -> Optional[str]:
         """Execute search command"""
         parts = command_input.strip().split()
+        mode = "hybrid"
+        for flag, flag_mode in SEARCH_MODE_FLAGS.items():
+            if flag in parts:
+                parts.remove(flag)
+                mode = flag_mode
+        try:
+            parts, filters = self._parse_filters(parts)
+        except ValueError as e:
+            return self.format_error([str(e)])
         
         if len(parts) == 1:
             # Interactive mode
@@ -27,19 +44,43 @@ class SearchHandler(BaseCommand):
         else:
             query = " ".join(parts[1:])
         
-        return self._search(query)
+        return self._search(query, mode, filters)
+    
+    def _parse_filters(self, parts: List[str]) -> Tuple[List[str], Dict[str, Any]]:
+        """Pull filter flags out of the command; returns the remaining words and build_where keywords"""
+        remaining, filters = [], {}
+        words = iter(parts)
+        for word in words:
+            if word in FILTER_VALUE_FLAGS:
+                value = next(words, None)
+                if value is None:
+                    raise ValueError(f"{word} needs a value")
+                filters[FILTER_VALUE_FLAGS[word]] = value
+            elif word in FILTER_SWITCHES:
+                key, flag_value = FILTER_SWITCHES[word]
+                filters[key] = flag_value
+            else:
+                remaining.append(word)
+        if "min_rating" in filters:
+            if not filters["min_rating"].isdigit():
+                raise ValueError("--min-rating needs a number from 1 to 5")
+            filters["min_rating"] = int(filters["min_rating"])
+        return remaining, filters
     
-    def _search(self, query: str) -> str:
+    def _search(self, query: str, mode: str = "hybrid", filters: Optional[Dict[str, Any]] = None) -> str:
         """Perform search"""
         try:
-            results = search_extractions(query, limit=10)
+            outcome = search_extractions_timed(query, limit=10, mode=mode, filters=filters)
+            results = outcome["results"]
+            filter_msgs = [f"🎚️ Filters: " + ", ".join(f"{k}={v}" for k, v in filters.items())] if filters else []
             
             if not results:
-                return self.format_warning([f"No results found for: {query}"])
+                return self.format_warning([f"No results found for: {query}"] + filter_msgs)
             
             header_msgs = [
                 f"🔍 Search Results for: '{query}'",
-                f"📊 Found: {len(results)} results",
+                f"📊 Found: {len(results)} results" + (" (cached)" if outcome.get("cached") else ""),
+                *filter_msgs,
                 ""
             ]
             
@@ -53,11 +94,15 @@ class SearchHandler(BaseCommand):
                 result_msgs.extend([
                     f"#{i} ⭐{rating}/5 - {title}",
                     f"🔗 {url}",
-                    f"📄 {result['preview']}",
+                    f"📄 {render_highlights(result['preview'], result['highlights'])}",
                     ""
                 ])
             
-            all_msgs = header_msgs + result_msgs
+            slowest = list(outcome["timings"].items())[:SLOWEST_SESSIONS_SHOWN]
+            timing_msgs = [f"⏱️ {len(outcome['timings'])} sessions searched; slowest: " +
+                           ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in slowest)] if slowest else []
+            
+            all_msgs = header_msgs + result_msgs + timing_msgs
             return self.format_data(all_msgs)
             
         except Exception as e:
@@ -71,6 +116,17 @@ class SearchHandler(BaseCommand):
             "Usage:",
             "  search                Interactive search",
             "  search <query>        Direct search",
+            "  search --lexical <q>  Exact terms only (BM25, no embedding model -- fastest for citations)",
+            "  search --vector <q>   Semantic only",
+            "",
+            "Filters (combine freely; applied inside the database query):",
+            "  --min-rating N        Rating N or higher",
+            "  --session <id>        One extraction session",
+            "  --project <name>      A project's documents instead of sessions",
+            "  --after YYYY-MM-DD    Imported on or after the date",
+            "  --before YYYY-MM-DD   Imported on or before the date",
+            "  --analyzed / --not-analyzed   With or without a saved LLM analysis",
+            "  --chunks / --no-chunks        Only chunks, or only whole documents",
             "",
-            "Search through extracted URL content"
+            "Search through extracted URL content (default: BM25 + vector, fused by rank)"
         ])
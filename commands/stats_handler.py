@@ -23,6 +23,7 @@ class StatsHandler(BaseCommand):
                 "",
                 f"🗂️ Total Sessions: {stats['total_sessions']}",
                 f"🔗 Total URLs: {stats['total_urls']}",
+                f"🔤 Total Tokens: {stats['total_tokens']:,}",
                 "",
                 "⭐ Rating Distribution:",
                 f"  5 Stars: {stats['by_rating'][5]} URLs",
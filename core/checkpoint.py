@@ -0,0 +1,69 @@
+"""
+🔗 Remember - Session Checkpoints
+Write-ahead JSONL log of finished URLs so crashed extractions can resume
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Set
+
+class SessionCheckpoint:
+    """Append-only log with one line per completed URL (success or failure)"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def records(self) -> Iterator[Dict[str, Any]]:
+        """Replay the log line by line; a torn last line from a crash is skipped"""
+        if not self.path.exists():
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+    def succeeded_urls(self) -> Set[str]:
+        return {r["url"] for r in self.records() if r.get("status") == "success"}
+
+    def record(self, index: int, url: str, result: Optional[Dict[str, Any]], error: str = ""):
+        """Durably append one finished URL; safe to call from worker threads"""
+        entry = {
+            "index": index,
+            "url": url,
+            "status": "success" if result else "failed",
+            "at": datetime.now().isoformat()
+        }
+        if result:
+            entry["result"] = result
+        else:
+            entry["error"] = error or "extraction failed"
+
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def write_json(self, json_path: Path) -> int:
+        """Stream every successful result into a JSON array without holding them in memory"""
+        count = 0
+        tmp = Path(f"{json_path}.tmp")
+        with open(tmp, 'w', encoding='utf-8') as out:
+            out.write('[')
+            for r in self.records():
+                if r.get("status") != "success":
+                    continue
+                out.write(',\n' if count else '\n')
+                out.write(json.dumps(r["result"], indent=2))
+                count += 1
+            out.write('\n]\n' if count else ']\n')
+        os.replace(tmp, json_path)
+        return count
@@ -0,0 +1,150 @@
+"""
+🔗 Remember - Content Index
+Content/URL hash index per collection so imports skip duplicates and upsert changed pages in O(1)
+"""
+
+import hashlib
+import sqlite3
+import time
+import unicodedata
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+from core import sidecar
+
+BACKFILL_PAGE_SIZE = 500
+PENDING_STALE_SECONDS = 3600  # a claim this old belongs to an import that died mid-write
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS content_hashes (
+    collection   TEXT NOT NULL,
+    doc_id       TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    url_hash     TEXT,
+    PRIMARY KEY (collection, doc_id)
+);
+CREATE INDEX IF NOT EXISTS content_hashes_by_content ON content_hashes (collection, content_hash);
+CREATE INDEX IF NOT EXISTS content_hashes_by_url ON content_hashes (collection, url_hash);
+CREATE TABLE IF NOT EXISTS content_pending (
+    collection            TEXT NOT NULL,
+    doc_id                TEXT NOT NULL,
+    previous_content_hash TEXT,
+    previous_url_hash     TEXT,
+    claimed               REAL NOT NULL,
+    PRIMARY KEY (collection, doc_id)
+);
+"""
+
+def content_hash(content: str) -> str:
+    """sha256 of the text with Unicode and whitespace differences normalized away"""
+    normalized = " ".join(unicodedata.normalize("NFKC", content).split())
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+def url_hash(url: str) -> Optional[str]:
+    """sha256 of a URL with case-insensitive parts, fragment and trailing slash dropped"""
+    url = (url or "").strip()
+    if not url:
+        return None
+    parts = urlsplit(url)
+    normalized = urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip('/'), parts.query, ''))
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+class ContentIndex:
+    """Hash -> doc_id lookups for one collection, kept in the database's sidecar file"""
+
+    def __init__(self, db_path: Path, collection):
+        self.db_path = Path(db_path)
+        self.collection = collection
+        self.name = collection.name
+
+    def sync(self) -> bool:
+        """Rebuild from the collection if it drifted (first use, deletes, writes from elsewhere)
+
+        Returns True when a rebuild happened.
+        """
+        conn = sidecar.connect(self.db_path, SCHEMA)
+        indexed = conn.execute("SELECT COUNT(*) FROM content_hashes WHERE collection = ?", (self.name,)).fetchone()[0]
+        if indexed == self.collection.count():
+            return False
+
+        print(f"🔎 Indexing content hashes for {self.name}...")
+        with sidecar.transaction(self.db_path, SCHEMA) as conn:
+            conn.execute("DELETE FROM content_hashes WHERE collection = ?", (self.name,))
+            offset = 0
+            while True:
+                page = self.collection.get(include=["documents", "metadatas"], limit=BACKFILL_PAGE_SIZE, offset=offset)
+                if not page["ids"]:
+                    break
+                rows = []
+                for doc_id, document, metadata in zip(page["ids"], page["documents"], page["metadatas"]):
+                    metadata = metadata or {}
+                    rows.append((self.name, doc_id, metadata.get("content_hash") or content_hash(document or ""),
+                                 metadata.get("url_hash") or url_hash(metadata.get("url", ""))))
+                conn.executemany("INSERT OR REPLACE INTO content_hashes VALUES (?, ?, ?, ?)", rows)
+                offset += len(page["ids"])
+        return True
+
+    def doc_ids(self) -> Iterator[str]:
+        conn = sidecar.connect(self.db_path, SCHEMA)
+        for (doc_id,) in conn.execute("SELECT doc_id FROM content_hashes WHERE collection = ?", (self.name,)):
+            yield doc_id
+
+    def resolve(self, conn: sqlite3.Connection, chash: str, uhash: Optional[str]) -> Tuple[str, Optional[str]]:
+        """("skip", doc_id) for known content, ("update", doc_id) for a known URL, else ("new", None)"""
+        row = conn.execute("SELECT doc_id FROM content_hashes WHERE collection = ? AND content_hash = ? LIMIT 1",
+                           (self.name, chash)).fetchone()
+        if row:
+            return "skip", row[0]
+        if uhash:
+            row = conn.execute("SELECT doc_id FROM content_hashes WHERE collection = ? AND url_hash = ? LIMIT 1",
+                               (self.name, uhash)).fetchone()
+            if row:
+                return "update", row[0]
+        return "new", None
+
+    def record(self, conn: sqlite3.Connection, doc_id: str, chash: str, uhash: Optional[str]):
+        conn.execute("INSERT OR REPLACE INTO content_hashes VALUES (?, ?, ?, ?)", (self.name, doc_id, chash, uhash))
+
+    def claim(self, conn: sqlite3.Connection, doc_id: str, chash: str, uhash: Optional[str]):
+        """record() ahead of the Chroma write, remembering the previous row so a failed write can be undone
+
+        Concurrent imports see the claim at once and skip the content instead of
+        storing it twice.
+        """
+        previous = conn.execute("SELECT content_hash, url_hash FROM content_hashes WHERE collection = ? AND doc_id = ?",
+                                (self.name, doc_id)).fetchone() or (None, None)
+        conn.execute("INSERT OR IGNORE INTO content_pending VALUES (?, ?, ?, ?, ?)",
+                     (self.name, doc_id, previous[0], previous[1], time.time()))
+        self.record(conn, doc_id, chash, uhash)
+
+    def release(self, conn: sqlite3.Connection, doc_ids: Iterable[str]):
+        """The Chroma write landed; the claims are now plain rows"""
+        conn.executemany("DELETE FROM content_pending WHERE collection = ? AND doc_id = ?",
+                         [(self.name, doc_id) for doc_id in doc_ids])
+
+    def revert(self, conn: sqlite3.Connection, doc_ids: Iterable[str]):
+        """The Chroma write failed; put back what the claims replaced"""
+        for doc_id in doc_ids:
+            row = conn.execute("SELECT previous_content_hash, previous_url_hash FROM content_pending "
+                               "WHERE collection = ? AND doc_id = ?", (self.name, doc_id)).fetchone()
+            if row is None:
+                continue
+            if row[0] is None:
+                conn.execute("DELETE FROM content_hashes WHERE collection = ? AND doc_id = ?", (self.name, doc_id))
+            else:
+                self.record(conn, doc_id, row[0], row[1])
+        self.release(conn, doc_ids)
+
+    def recover(self) -> int:
+        """Revert claims left by an import that died between claiming and writing; returns how many"""
+        cutoff = time.time() - PENDING_STALE_SECONDS
+        with sidecar.transaction(self.db_path, SCHEMA) as conn:
+            stale = [doc_id for doc_id, in conn.execute(
+                "SELECT doc_id FROM content_pending WHERE collection = ? AND claimed < ?", (self.name, cutoff))]
+            self.revert(conn, stale)
+        return len(stale)
+
+    def batch(self):
+        """Short write transaction for one import batch's claims or its follow-up bookkeeping"""
+        return sidecar.transaction(self.db_path, SCHEMA)
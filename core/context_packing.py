@@ -0,0 +1,100 @@
+"""
+🔗 Remember - Context Packing
+Fit a document into one request by token count (context window and tokens/min budget), or split it into request-sized chunks
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from core.llm_scheduler import RESPONSE_TOKENS_ESTIMATE, rate_limits
+
+# Model context limits (in tokens) - Using CONTEXT WINDOW for chunking
+MODEL_CONTEXT_LIMITS = {
+    "moonshotai/kimi-k2-instruct": 131072,
+    "meta-llama/llama-4-scout-17b-16e-instruct": 131072,
+    "meta-llama/llama-4-maverick-17b-128e-instruct": 131072,
+    "deepseek-r1-distill-llama-70b": 131072,
+    "llama-3.3-70b-versatile": 131072,
+    "llama-3.1-8b-instant": 131072,
+    "gemma2-9b-it": 8192,
+    "compound-beta": 131072,
+    "compound-beta-mini": 131072,
+    "default": 8192  # Safe fallback
+}
+
+# Reserve tokens for system prompt, user prompt, and response generation
+TOKENS_RESERVED = 2000
+MESSAGE_OVERHEAD_TOKENS = 4  # role + separators per chat message
+# cl100k_base stands in for the Groq models' own tokenizers; keep 3% headroom for the difference
+TOKENIZER_SAFETY = 0.97
+CHARS_PER_TOKEN = 4  # only when tiktoken's encoding can't be loaded (offline first run)
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+        return tiktoken.encoding_for_model("gpt-3.5-turbo")
+    except Exception:
+        return None
+
+def count_tokens(text: str) -> int:
+    encoding = _encoding()
+    if encoding is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+def split_tokens(text: str, size: int) -> List[str]:
+    """Consecutive pieces of at most `size` tokens each"""
+    size = max(1, size)
+    encoding = _encoding()
+    if encoding is None:
+        step = size * CHARS_PER_TOKEN
+        return [text[i:i + step] for i in range(0, len(text), step)] or [""]
+    tokens = encoding.encode(text, disallowed_special=())
+    return [encoding.decode(tokens[i:i + size]) for i in range(0, len(tokens), size)] or [""]
+
+def truncate_tokens(text: str, size: int) -> str:
+    return split_tokens(text, size)[0]
+
+def tail_tokens(text: str, size: int) -> str:
+    """The last `size` tokens of text"""
+    size = max(1, size)
+    encoding = _encoding()
+    if encoding is None:
+        return text[-size * CHARS_PER_TOKEN:]
+    return encoding.decode(encoding.encode(text, disallowed_special=())[-size:])
+
+def context_limit(model: str) -> int:
+    return MODEL_CONTEXT_LIMITS.get(model, MODEL_CONTEXT_LIMITS["default"])
+
+def messages_tokens(messages: List[Dict[str, Any]]) -> int:
+    return sum(count_tokens(str(m.get("content") or "")) + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+def request_limit(model: str) -> int:
+    """Largest prompt one request may carry: the context window, but also what the tokens/min budget can ever admit"""
+    window = int(context_limit(model) * TOKENIZER_SAFETY) - TOKENS_RESERVED
+    per_minute = int(rate_limits(model)[1] * TOKENIZER_SAFETY) - RESPONSE_TOKENS_ESTIMATE
+    return min(window, per_minute)
+
+def content_budget(model: str, frame: List[Dict[str, Any]]) -> int:
+    """Tokens left for document text once the frame (master context, prompt, headers) and the reserve are in"""
+    return max(0, request_limit(model) - messages_tokens(frame))
+
+def pack_document(model: str, frame: List[Dict[str, Any]], document: str,
+                  chunk_frame: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """Whole document if it fits one request, else chunks that each fill one
+
+    frame is the message list with empty document text; chunk_frame (if the
+    per-part messages carry extra headers) sizes the chunks. Returns {"fits",
+    "content", "chunks", "budget", "document_tokens"}.
+    """
+    budget = content_budget(model, frame)
+    document_tokens = count_tokens(document)
+    if document_tokens <= budget:
+        return {"fits": True, "content": document, "chunks": [document], "budget": budget,
+                "document_tokens": document_tokens}
+    chunk_budget = content_budget(model, chunk_frame or frame)
+    if chunk_budget <= 0:
+        raise ValueError(f"Master context and prompt alone exceed the {request_limit(model):,}-token request limit of {model}")
+    return {"fits": False, "content": None, "chunks": split_tokens(document, chunk_budget), "budget": chunk_budget,
+            "document_tokens": document_tokens}
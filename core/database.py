@@ -1,22 +1,111 @@
 import chromadb
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Iterable, Tuple
 from datetime import datetime
-import hashlib
-import json
+import threading
+import time
 import tiktoken
 
+from core import sidecar
+from core.content_index import ContentIndex, content_hash, url_hash
+from core.doc_ids import IdAllocator, doc_sort_key, format_doc_id
+from core.lexical_index import LexicalIndex
+from core.rollups import CollectionRollup
+from core.search import search_collections, attach_previews
+from core.search_filters import build_where, uses_dates, backfill_created_ts, created_timestamp
+from core.json_stream import iter_json_records
+
 # Database path is now hardcoded for isolation
 DB_PATH = Path.home() / "remember_db"
+DB_ROOT = Path.home() / "remember" / ".db"  # per-topic databases used by the web UI
+IMPORT_BATCH_SIZE = 256  # documents per collection.add during streaming imports
+
+ImportProgress = Callable[[int, int, int], None]  # (documents imported, position, total) -- bytes for file imports
+
+class CachedClient:
+    """One PersistentClient per database path with its collection handles cached
+
+    Handles are dropped when a collection is created, deleted or the client is reset,
+    so a stale handle is never served. Everything else passes through to chromadb.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._client = chromadb.PersistentClient(path=str(path))
+        self._collections: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    def get_collection(self, name: str, **kwargs):
+        if kwargs:  # custom embedding functions etc. are not cached
+            return self._client.get_collection(name, **kwargs)
+        with self._lock:
+            if name not in self._collections:
+                self._collections[name] = self._client.get_collection(name)
+            return self._collections[name]
+
+    def get_or_create_collection(self, name: str, metadata: Optional[Dict] = None, **kwargs):
+        if kwargs:
+            return self._client.get_or_create_collection(name, metadata=metadata, **kwargs)
+        with self._lock:
+            if name not in self._collections:
+                self._collections[name] = self._client.get_or_create_collection(name, metadata=metadata)
+            return self._collections[name]
+
+    def create_collection(self, name: str, metadata: Optional[Dict] = None, **kwargs):
+        with self._lock:
+            self._collections.pop(name, None)
+            collection = self._client.create_collection(name, metadata=metadata, **kwargs)
+            sidecar.bump_version(self.path)
+            if not kwargs:
+                self._collections[name] = collection
+            return collection
+
+    def delete_collection(self, name: str):
+        with self._lock:
+            self._collections.pop(name, None)
+            self._client.delete_collection(name)
+            CollectionRollup.forget(self.path, name)
+            LexicalIndex(self.path).forget(name)
+            sidecar.bump_version(self.path)
+
+    def reset(self):
+        with self._lock:
+            self._collections.clear()
+            sidecar.bump_version(self.path)
+            return self._client.reset()
+
+    def mark_changed(self):
+        """Call after writing to a collection directly, so cached rankings, search cursors and the lexical index catch up"""
+        sidecar.bump_version(self.path)
 
-def get_client():
-    """Get ChromaDB client for the dedicated remember_db."""
-    DB_PATH.mkdir(exist_ok=True)
-    return chromadb.PersistentClient(path=str(DB_PATH))
+    def __getattr__(self, attr):
+        return getattr(self._client, attr)
 
-def get_or_create_collection(name: str, metadata: Optional[Dict] = None):
+_clients: Dict[Path, CachedClient] = {}
+_clients_lock = threading.Lock()
+
+def database_path(database: Optional[str] = None) -> Path:
+    """remember_db by default, a named database under ~/remember/.db, or an explicit path"""
+    if not database:
+        return DB_PATH
+    path = Path(database).expanduser()
+    return path if path.is_absolute() else DB_ROOT / database
+
+def get_client(database: Optional[str] = None) -> CachedClient:
+    """Get the shared ChromaDB client for remember_db (or a named .db/<name> database)."""
+    path = database_path(database)
+    client = _clients.get(path)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(path)
+            if client is None:
+                path.mkdir(parents=True, exist_ok=True)
+                client = _clients[path] = CachedClient(path)
+    return client
+
+def get_or_create_collection(name: str, metadata: Optional[Dict] = None, database: Optional[str] = None):
     """Get existing collection or create new one in the dedicated remember_db."""
-    client = get_client()
+    client = get_client(database)
     try:
         return client.get_collection(name)
     except Exception:
@@ -24,27 +113,16 @@ def get_or_create_collection(name: str, metadata: Optional[Dict] = None):
             name=name,
             metadata=metadata or {"created": datetime.now().isoformat()}
         )
-def import_extraction_session(json_file_path: str) -> Dict[str, Any]:
+
+def import_extraction_session(json_file_path: str, batch_size: int = IMPORT_BATCH_SIZE,
+                              progress: Optional[ImportProgress] = None) -> Dict[str, Any]:
     """Import JSON extraction results with structured vector IDs like doc_001, doc_002, etc."""
-    with open(json_file_path, 'r', encoding='utf-8') as f:
-        extraction_data = json.load(f)
-    
     session_id = Path(json_file_path).stem
     collection_name = f"extraction_{session_id}"
     collection = get_or_create_collection(collection_name)
-    
-    documents, metadatas, ids = [], [], []
-    doc_counter = 1
-    
-    for result in extraction_data:
-        full_content = result.get('content', '')
-        if not full_content:
-            continue
 
-        # Create structured vector ID: doc_001, doc_002, etc.
-        doc_id = f"doc_{doc_counter:03d}"
-        
-        metadata = {
+    def build_metadata(result: Dict, doc_id: str, content: str) -> Dict[str, Any]:
+        return {
             "url": str(result.get('url', '')),
             "title": str(result.get('title', 'No Title')),
             "rating": int(result.get('rating', 0)) if result.get('rating') is not None else 0,
@@ -53,45 +131,140 @@ def import_extraction_session(json_file_path: str) -> Dict[str, Any]:
             "created": datetime.now().isoformat(),
             "vector_id": doc_id  # Store the vector ID in metadata for reference
         }
-        
-        documents.append(full_content)
-        metadatas.append(metadata)
-        ids.append(doc_id)
-        doc_counter += 1
-    
-    if documents:
-        collection.add(documents=documents, metadatas=metadatas, ids=ids)
-        
-        # Update markdown files with vector ID headers
-        update_markdown_files_with_vector_ids(extraction_data, session_id)
-    
+
+    counts = stream_import(collection, json_file_path, build_metadata, session_id, batch_size, progress)
     return {
         "session_id": session_id,
-        "urls_imported": len(documents),
+        "urls_imported": len(counts["created"]) + len(counts["updated"]),
         "collection_name": collection_name,
-        "vector_ids_created": [f"doc_{i+1:03d}" for i in range(len(documents))]
+        "vector_ids_created": counts["created"],
+        "vector_ids_updated": counts["updated"],
+        "duplicates_skipped": counts["skipped"]
     }
 
-def update_markdown_files_with_vector_ids(extraction_data: List[Dict], session_id: str):
-    """Add vector ID headers to markdown files"""
-    doc_counter = 1
-    
-    for result in extraction_data:
-        markdown_file = result.get('markdown_file', '')
-        if not markdown_file or not Path(markdown_file).exists():
+def stream_import(collection, json_file_path: str,
+                  build_metadata: Callable[[Dict, str, str], Dict[str, Any]],
+                  header_label: str,
+                  batch_size: int = IMPORT_BATCH_SIZE,
+                  progress: Optional[ImportProgress] = None,
+                  db_path: Path = DB_PATH) -> Dict[str, Any]:
+    """Add a JSON/JSONL extraction dump to a collection in fixed-size batches
+
+    Only one batch of documents is held at a time, so multi-GB dumps import in
+    flat memory. Returns the import counts from import_records.
+    """
+    path = Path(json_file_path)
+    progress = progress or _print_import_progress(path.name)
+    return import_records(collection, iter_json_records(path), build_metadata,
+                          header_label, path.stat().st_size, batch_size, progress, db_path)
+
+def import_records(collection, records: Iterable[Tuple[Dict, int]],
+                   build_metadata: Callable[[Dict, str, str], Dict[str, Any]],
+                   header_label: Optional[str], total: int,
+                   batch_size: int = IMPORT_BATCH_SIZE,
+                   progress: Optional[ImportProgress] = None,
+                   db_path: Path = DB_PATH) -> Dict[str, Any]:
+    """Content-addressed import of (result, position) records
+
+    Unchanged content is skipped before it is embedded, a known URL with new
+    content is upserted under its existing vector ID, and anything else gets a
+    new doc_NNN from the collection's persistent counter. Lookups go to the
+    sidecar, never to the collection.
+    """
+    index = ContentIndex(db_path, collection)
+    index.recover()
+    rebuilt = index.sync()
+    allocator = IdAllocator(db_path, collection.name)
+    if rebuilt or not allocator.is_seeded():
+        allocator.seed(index.doc_ids(), force=rebuilt)
+    rollup = CollectionRollup(db_path, collection)
+    rollup.sync()
+    lexical = LexicalIndex(db_path)
+    lexical.sync(collection)
+    total = total or 1
+    created, updated, skipped = [], [], 0
+    pending: List[Tuple[Dict, str, str, Optional[str]]] = []
+
+    def flush(position: int):
+        nonlocal skipped
+        batch: Dict[str, Tuple[Dict, str, Dict[str, Any]]] = {}
+        new_ids = set()
+        # Hashes and IDs are claimed in a short transaction so concurrent imports can't both
+        # take one; the Chroma write (and its embedding) runs outside any sidecar lock, and a
+        # failed write reverts the claims
+        with index.batch() as conn:
+            for result, content, chash, uhash in pending:
+                action, doc_id = index.resolve(conn, chash, uhash)
+                if action == "skip":
+                    skipped += 1
+                    continue
+                if action == "new":
+                    # Create structured vector ID: doc_001, doc_002, etc.
+                    doc_id = format_doc_id(allocator.take(conn))
+                    new_ids.add(doc_id)
+                metadata = build_metadata(result, doc_id, content)
+                metadata.update(content_hash=chash, url_hash=uhash or "", created_ts=created_timestamp(metadata, int(time.time())))
+                batch[doc_id] = (result, content, metadata)  # a URL seen twice keeps its latest content
+                index.claim(conn, doc_id, chash, uhash)
+        pending.clear()
+
+        if batch:
+            try:
+                replaced = [doc_id for doc_id in batch if doc_id not in new_ids]
+                old_metadatas = collection.get(ids=replaced, include=["metadatas"])["metadatas"] if replaced else []
+                collection.upsert(ids=list(batch), documents=[b[1] for b in batch.values()],
+                                  metadatas=[b[2] for b in batch.values()])
+            except BaseException:
+                with index.batch() as conn:
+                    index.revert(conn, list(batch))
+                raise
+            with index.batch() as conn:
+                sidecar.bump_version(db_path, conn)
+                rollup.apply(conn, added=[b[2] for b in batch.values()], removed=old_metadatas)
+                for doc_id, (_, content, metadata) in batch.items():
+                    lexical.upsert(conn, collection.name, doc_id, metadata.get("title", ""), content)
+                index.release(conn, list(batch))
+
+        for doc_id, (result, _, _) in batch.items():
+            (created if doc_id in new_ids else updated).append(doc_id)
+            if header_label is not None:
+                # Update markdown files with vector ID headers once their batch is stored
+                add_vector_id_header(result, doc_id, header_label)
+        progress(len(created), position, total)
+
+    position = 0
+    for result, position in records:
+        full_content = result.get('content', '')
+        if not full_content:
             continue
-            
-        vector_id = f"doc_{doc_counter:03d}"
-        
-        try:
-            # Read current markdown content
-            with open(markdown_file, 'r', encoding='utf-8') as f:
-                current_content = f.read()
-            
-            # Check if vector ID header already exists
-            if f"Vector ID: {vector_id}" not in current_content:
-                # Add vector ID header at the top
-                header = f"""---
+        lite = {k: v for k, v in result.items() if k not in ('content', 'html_content')}
+        pending.append((lite, full_content, content_hash(full_content), url_hash(str(result.get('url', '')))))
+        if len(pending) >= batch_size:
+            flush(position)
+
+    flush(total)
+    return {"created": created, "updated": updated, "skipped": skipped}
+
+def _print_import_progress(label: str) -> ImportProgress:
+    def report(imported: int, bytes_read: int, total_bytes: int):
+        print(f"📥 {label}: {imported:,} documents imported ({min(100, bytes_read * 100 // total_bytes)}%)")
+    return report
+
+def add_vector_id_header(result: Dict, vector_id: str, session_id: str) -> bool:
+    """Prepend a vector ID header to one result's markdown file"""
+    markdown_file = result.get('markdown_file', '')
+    if not markdown_file or not Path(markdown_file).exists():
+        return False
+
+    try:
+        # Read current markdown content
+        with open(markdown_file, 'r', encoding='utf-8') as f:
+            current_content = f.read()
+
+        # Check if vector ID header already exists
+        if f"Vector ID: {vector_id}" not in current_content:
+            # Add vector ID header at the top
+            header = f"""---
 Vector ID: {vector_id}
 Title: {result.get('title', 'Unknown')}
 URL: {result.get('url', '')}
@@ -101,64 +274,77 @@ Imported: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 ---
 
 """
-                
-                # Write updated content
-                with open(markdown_file, 'w', encoding='utf-8') as f:
-                    f.write(header + current_content)
-                    
-                print(f"✅ Updated {markdown_file} with vector ID: {vector_id}")
-            
-            doc_counter += 1
-            
-        except Exception as e:
-            print(f"❌ Failed to update {markdown_file}: {e}")
-            continue
 
-def search_extractions(query: str, limit: int = 20) -> List[Dict[str, Any]]:
+            # Write updated content
+            with open(markdown_file, 'w', encoding='utf-8') as f:
+                f.write(header + current_content)
+
+            print(f"✅ Updated {markdown_file} with vector ID: {vector_id}")
+        return True
+
+    except Exception as e:
+        print(f"❌ Failed to update {markdown_file}: {e}")
+        return False
+
+def search_extractions(query: str, limit: int = 20, mode: str = "hybrid",
+                       filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
     """Search across all extraction sessions in remember_db."""
+    return search_extractions_timed(query, limit, mode, filters)["results"]
+
+def search_extractions_timed(query: str, limit: int = 20, mode: str = "hybrid",
+                             filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """search_extractions plus per-collection timings, to spot slow sessions
+
+    filters takes build_where's keywords (min_rating, session, project, created_after,
+    created_before, has_analysis, is_chunk). A session narrows the search to that
+    session's collection, a project to the project's collection; the rest become
+    a Chroma `where` clause.
+    """
+    filters = filters or {}
+    where = build_where(**filters)
     client = get_client()
-    collections = client.list_collections()
+    names = [c.name for c in client.list_collections()]
+    if filters.get("project"):
+        names = [n for n in names if n == f"project_{filters['project']}"]
+    else:
+        names = [n for n in names if n.startswith("extraction_")]
+        if filters.get("session"):
+            names = [n for n in names if n == f"extraction_{filters['session']}"]
+    collections = [client.get_collection(name) for name in names]
+    if uses_dates(where):
+        for collection in collections:
+            backfill_created_ts(DB_PATH, collection)
     
-    all_results = []
-    # If query is empty, fetch all documents by getting all items from collections
+    # If query is empty, return the first documents without a vector search
     if not query.strip():
-        for collection_info in collections:
-             if collection_info.name.startswith("extraction_"):
-                collection = client.get_collection(collection_info.name)
-                data = collection.get(include=["metadatas", "documents"])
-                for i, doc_id in enumerate(data['ids']):
-                    all_results.append({
-                        "id": doc_id,
-                        "metadata": data['metadatas'][i],
-                        "document": data['documents'][i],
-                        "relevance": 1.0
-                    })
-        return all_results[:limit]
-
-    # If there is a query, perform a vector search
-    for collection_info in collections:
-        if collection_info.name.startswith("extraction_"):
-            collection = client.get_collection(collection_info.name)
-            try:
-                search_results = collection.query(
-                    query_texts=[query],
-                    n_results=min(limit, 50),
-                    include=["metadatas", "documents", "distances"]
-                )
-                
-                if search_results and search_results["documents"]:
-                    for i, doc in enumerate(search_results["documents"][0]):
-                        all_results.append({
-                            "id": search_results["ids"][0][i],
-                            "document": doc,
-                            "metadata": search_results["metadatas"][0][i],
-                            "relevance": 1 - (search_results["distances"][0][i] or 1.0),
-                        })
-            except Exception as e:
-                print(f"Could not query collection {collection_info.name}: {e}")
-
-    all_results.sort(key=lambda x: x["relevance"], reverse=True)
-    return all_results[:limit]
+        all_results, timings = [], {}
+        for collection in collections:
+            if len(all_results) >= limit:
+                break
+            started = time.perf_counter()
+            data = collection.get(include=["metadatas", "documents"], limit=limit - len(all_results), where=where)
+            timings[collection.name] = time.perf_counter() - started
+            for i, doc_id in enumerate(data['ids']):
+                all_results.append({
+                    "id": doc_id,
+                    "metadata": data['metadatas'][i],
+                    "document": data['documents'][i],
+                    "relevance": 1.0,
+                    "collection": collection.name
+                })
+        attach_previews(all_results, query, mode="lexical")  # no query to embed: opening passages
+        return {"results": all_results, "timings": timings, "embed_seconds": 0.0, "errors": {}, "cached": False}
+
+    # BM25 fused with a parallel vector search (or either alone); repeats are served
+    # from the result cache until an import or delete bumps the version
+    outcome = search_collections(collections, query, limit, version=sidecar.database_version(DB_PATH),
+                                 mode=mode, db_path=DB_PATH, where=where)
+    attach_previews(outcome["results"], query, mode)
+    return outcome
+
+def collection_stats(collection, database: Optional[str] = None) -> Dict[str, Any]:
+    """Document count plus rating/token/analyzed rollups, served from the sidecar"""
+    return CollectionRollup(database_path(database), collection).get()
 
 def get_session_stats(session_id: str = None) -> Dict[str, Any]:
     """Get extraction session statistics"""
@@ -168,23 +354,19 @@ def get_session_stats(session_id: str = None) -> Dict[str, Any]:
     stats = {
         "total_sessions": 0,
         "total_urls": 0,
+        "total_tokens": 0,
         "by_rating": {5: 0, 4: 0, 3: 0, 2: 0, 1: 0}
     }
     
     for collection_info in collections:
         if collection_info.name.startswith("extraction_"):
-            collection = client.get_collection(collection_info.name)
-            all_data = collection.get()
+            rollup = collection_stats(client.get_collection(collection_info.name))
             
             stats["total_sessions"] += 1
-            if all_data["metadatas"]:
-                stats["total_urls"] += len(all_data["metadatas"])
-                
-                for metadata in all_data["metadatas"]:
-                    if metadata:
-                        rating = metadata.get("rating", 0)
-                        if rating in stats["by_rating"]:
-                            stats["by_rating"][rating] += 1
+            stats["total_urls"] += rollup["documents"]
+            stats["total_tokens"] += rollup["tokens"]
+            for rating, count in rollup["by_rating"].items():
+                stats["by_rating"][rating] += count
     
     return stats
 
@@ -218,8 +400,7 @@ def list_projects() -> List[Dict[str, Any]]:
             metadata = collection.metadata or {}
             
             # Get document count
-            all_data = collection.get()
-            doc_count = len(all_data["ids"]) if all_data["ids"] else 0
+            doc_count = collection.count()
             
             projects.append({
                 "name": project_name,
@@ -231,40 +412,28 @@ def list_projects() -> List[Dict[str, Any]]:
     
     return sorted(projects, key=lambda x: x["created"], reverse=True)
 
-def import_to_project(project_name: str, json_file_path: str) -> Dict[str, Any]:
+def import_to_project(project_name: str, json_file_path: str, batch_size: int = IMPORT_BATCH_SIZE,
+                      progress: Optional[ImportProgress] = None) -> Dict[str, Any]:
     """Import JSON extraction results into a specific project."""
-    with open(json_file_path, 'r', encoding='utf-8') as f:
-        extraction_data = json.load(f)
-    
     collection_name = f"project_{project_name}"
     collection = get_or_create_collection(collection_name, {
         "type": "project",
         "created": datetime.now().isoformat()
     })
-    
-    # Get existing document count to continue numbering
-    existing_data = collection.get()
-    doc_counter = len(existing_data["ids"]) + 1 if existing_data["ids"] else 1
-    
-    documents, metadatas, ids = [], [], []
-    
-    for result in extraction_data:
-        full_content = result.get('content', '')
-        if not full_content:
-            continue
 
-        # Create structured vector ID: doc_001, doc_002, etc.
-        doc_id = f"doc_{doc_counter:03d}"
-        
+    try:
+        encoding = tiktoken.encoding_for_model("gpt-3.5-turbo")
+    except Exception:
+        encoding = None
+
+    def build_metadata(result: Dict, doc_id: str, full_content: str) -> Dict[str, Any]:
         # Estimate token count
         try:
-            import tiktoken
-            encoding = tiktoken.encoding_for_model("gpt-3.5-turbo")
             token_count = len(encoding.encode(full_content))
-        except:
+        except Exception:
             token_count = len(full_content.split()) * 1.3  # Rough estimate
-        
-        metadata = {
+
+        return {
             "url": str(result.get('url', '')),
             "title": str(result.get('title', 'No Title')),
             "rating": int(result.get('rating', 0)) if result.get('rating') is not None else 0,
@@ -277,23 +446,15 @@ def import_to_project(project_name: str, json_file_path: str) -> Dict[str, Any]:
             "llm_response": "",  # Initially no LLM response (empty string, not None)
             "llm_response_saved": False
         }
-        
-        documents.append(full_content)
-        metadatas.append(metadata)
-        ids.append(doc_id)
-        doc_counter += 1
-    
-    if documents:
-        collection.add(documents=documents, metadatas=metadatas, ids=ids)
-        
-        # Update markdown files with vector ID headers (reuse existing function)
-        update_markdown_files_with_vector_ids(extraction_data, project_name)
-    
+
+    counts = stream_import(collection, json_file_path, build_metadata, project_name, batch_size, progress)
     return {
         "project_name": project_name,
-        "urls_imported": len(documents),
+        "urls_imported": len(counts["created"]) + len(counts["updated"]),
         "collection_name": collection_name,
-        "vector_ids_created": [f"doc_{i+doc_counter-len(documents):03d}" for i in range(len(documents))]
+        "vector_ids_created": counts["created"],
+        "vector_ids_updated": counts["updated"],
+        "duplicates_skipped": counts["skipped"]
     }
 
 def get_project_files(project_name: str) -> List[Dict[str, Any]]:
@@ -324,7 +485,7 @@ def get_project_files(project_name: str) -> List[Dict[str, Any]]:
                 "document": document
             })
         
-        return sorted(files, key=lambda x: x["vector_id"])
+        return sorted(files, key=lambda x: doc_sort_key(x["vector_id"]))
     except Exception as e:
         print(f"Error getting project files: {e}")
         return []
@@ -342,13 +503,16 @@ def save_llm_response(project_name: str, document_id: str, response: str) -> boo
         if not result["metadatas"]:
             return False
         
-        metadata = result["metadatas"][0]
+        old_metadata = result["metadatas"][0]
+        metadata = dict(old_metadata)
         metadata["llm_response"] = response
         metadata["llm_response_saved"] = True
         metadata["response_saved_at"] = datetime.now().isoformat()
         
         # Update the metadata
         collection.update(ids=[document_id], metadatas=[metadata])
+        CollectionRollup(DB_PATH, collection).adjust(added=[metadata], removed=[old_metadata])
+        client.mark_changed()
         return True
     except Exception as e:
         print(f"Error saving LLM response: {e}")
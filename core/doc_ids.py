@@ -0,0 +1,68 @@
+"""
+🔗 Remember - Document IDs
+Persistent doc_NNN counter per collection, so imports never scan a collection to number new vectors
+"""
+
+import re
+import sqlite3
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+
+from core import sidecar
+
+MIN_ID_DIGITS = 3  # doc_001 ... doc_999, then doc_1000 -- width grows, ordering uses doc_sort_key
+DOC_ID_PATTERN = re.compile(r'^doc_(\d+)$')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS doc_id_counters (
+    collection  TEXT PRIMARY KEY,
+    next_number INTEGER NOT NULL
+);
+"""
+
+def format_doc_id(number: int) -> str:
+    return f"doc_{number:0{MIN_ID_DIGITS}d}"
+
+def doc_number(doc_id: str) -> Optional[int]:
+    match = DOC_ID_PATTERN.match(doc_id or "")
+    return int(match.group(1)) if match else None
+
+def doc_sort_key(doc_id: str) -> Tuple[int, int, str]:
+    """Numeric order for doc_NNN IDs of any width; other IDs sort after them by name"""
+    number = doc_number(doc_id)
+    return (0, number, "") if number is not None else (1, 0, doc_id or "")
+
+class IdAllocator:
+    """Hands out doc_NNN IDs for one collection from a counter in the database's sidecar
+
+    Taking IDs inside a sidecar transaction serializes concurrent imports, so two
+    imports into the same collection never get the same number.
+    """
+
+    def __init__(self, db_path: Path, collection_name: str):
+        self.db_path = Path(db_path)
+        self.name = collection_name
+        sidecar.connect(self.db_path, SCHEMA)  # create the table before any transaction starts
+
+    def seed(self, existing_ids: Iterable[str], force: bool = False):
+        """Start the counter after the highest existing doc_NNN (or raise it if IDs appeared elsewhere)"""
+        with sidecar.transaction(self.db_path, SCHEMA) as conn:
+            current = self._current(conn)
+            if current is not None and not force:
+                return
+            highest = max((n for n in map(doc_number, existing_ids) if n is not None), default=0)
+            conn.execute("INSERT OR REPLACE INTO doc_id_counters VALUES (?, ?)",
+                         (self.name, max(highest + 1, current or 1)))
+
+    def is_seeded(self) -> bool:
+        return self._current(sidecar.connect(self.db_path, SCHEMA)) is not None
+
+    def take(self, conn: sqlite3.Connection, count: int = 1) -> int:
+        """Reserve count consecutive numbers inside the caller's transaction; returns the first"""
+        first = self._current(conn) or 1
+        conn.execute("INSERT OR REPLACE INTO doc_id_counters VALUES (?, ?)", (self.name, first + count))
+        return first
+
+    def _current(self, conn: sqlite3.Connection) -> Optional[int]:
+        row = conn.execute("SELECT next_number FROM doc_id_counters WHERE collection = ?", (self.name,)).fetchone()
+        return row[0] if row else None
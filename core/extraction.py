@@ -0,0 +1,387 @@
+"""
+🔗 Remember - Extraction Engine
+Concurrent URL extraction with per-host politeness and pooled proxy sessions
+"""
+
+import random
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.utils import get_encoding_from_headers
+
+from core.http_cache import HttpCache
+from core.parsing import DEFAULT_PARSE_WORKERS, ParsePool, extract_pdf_pages, parse_html, pdf_page_count
+
+RED, GREEN, BLUE, YELLOW, BOLD, RESET = '\033[91m', '\033[92m', '\033[94m', '\033[93m', '\033[1m', '\033[0m'
+
+DEFAULT_WORKERS = 8
+DEFAULT_PER_HOST = 2
+DEFAULT_HOST_DELAY = 1.0
+REQUEST_TIMEOUT = 30
+HOST_POOLS = 64  # distinct hosts each proxy session keeps warm connections for
+DEFAULT_MAX_PDF_PAGES = 1000
+PDF_PAGES_PER_JOB = 16
+PDF_SLOWEST_PAGES = 3
+PDF_PARSER = "parse_pdf_pages"  # cache key for stitched PDF text
+SPOOL_CHUNK_BYTES = 1024 * 1024
+
+class HostThrottle:
+    """Caps in-flight requests per host and spaces out request starts to the same host"""
+
+    def __init__(self, per_host: int = DEFAULT_PER_HOST, delay: float = DEFAULT_HOST_DELAY):
+        self.per_host = max(1, per_host)
+        self.delay = max(0.0, delay)
+        self._lock = threading.Lock()
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._next_start: Dict[str, float] = {}
+
+    @contextmanager
+    def hold(self, url: str):
+        """Block until this host has a free slot and its politeness delay has passed"""
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            slots = self._slots.setdefault(host, threading.BoundedSemaphore(self.per_host))
+
+        slots.acquire()
+        try:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start.get(host, 0.0))
+                self._next_start[host] = start + self.delay
+            if start > now:
+                time.sleep(start - now)
+            yield
+        finally:
+            slots.release()
+
+class ProxySessionPool:
+    """One keep-alive requests.Session per proxy tier, shared by every worker"""
+
+    def __init__(self, proxy_order: List[Tuple[str, Optional[str]]], pool_size: int):
+        self.sessions: Dict[str, requests.Session] = {}
+        for proxy_name, proxy_url in proxy_order:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=HOST_POOLS, pool_maxsize=max(1, pool_size))
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            if proxy_url:
+                session.proxies = {"http": proxy_url, "https": proxy_url}
+            self.sessions[proxy_name] = session
+
+    def get(self, proxy_name: str) -> requests.Session:
+        return self.sessions[proxy_name]
+
+    def close(self):
+        for session in self.sessions.values():
+            session.close()
+
+class ExtractionEngine:
+    """Bounded worker pool that runs the Local -> Mobile -> Residential fallback per URL"""
+
+    def __init__(self,
+                 content_dir: Path,
+                 proxy_order: List[Tuple[str, Optional[str]]],
+                 user_agents: List[str],
+                 workers: int = DEFAULT_WORKERS,
+                 per_host: int = DEFAULT_PER_HOST,
+                 host_delay: float = DEFAULT_HOST_DELAY,
+                 timeout: int = REQUEST_TIMEOUT,
+                 parse_workers: int = DEFAULT_PARSE_WORKERS,
+                 max_pdf_pages: Optional[int] = DEFAULT_MAX_PDF_PAGES,
+                 spool_dir: Optional[Path] = None,
+                 cache: Optional[HttpCache] = None,
+                 refresh: bool = False,
+                 verbose: bool = True):
+        self.content_dir = Path(content_dir)
+        self.proxy_order = proxy_order
+        self.user_agents = user_agents
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.parse_workers = max(1, parse_workers)
+        self.max_pdf_pages = max_pdf_pages
+        self.spool_dir = spool_dir
+        self.cache = cache
+        self.refresh = refresh
+        self.verbose = verbose
+        self.throttle = HostThrottle(per_host, host_delay)
+        self.sessions = ProxySessionPool(proxy_order, self.workers)
+
+    def run(self, urls: List[str],
+            on_result: Callable[[int, str, Optional[Dict]], None],
+            indexes: Optional[List[int]] = None,
+            total: Optional[int] = None) -> Tuple[int, List[str]]:
+        """Extract every URL, handing each finished result to on_result(index, url, result)
+
+        Results are not kept here, so memory stays flat however long urls.txt is.
+        indexes/total give each URL's position in the full list (for resumed sessions).
+        """
+        indexes = indexes or list(range(1, len(urls) + 1))
+        total = total or len(urls)
+        succeeded, failed = 0, []
+
+        def record(i: int, result: Optional[Dict]):
+            nonlocal succeeded
+            if result:
+                succeeded += 1
+            else:
+                failed.append(urls[i - 1])
+            on_result(indexes[i - 1], urls[i - 1], result)
+
+        try:
+            with ParsePool(self.parse_workers) as parser, ThreadPoolExecutor(max_workers=self.workers) as pool:
+                downloads = {pool.submit(self._download, parser, url, indexes[i - 1], total): i
+                             for i, url in enumerate(urls, 1)}
+                parses: Dict[Future, Tuple[int, Dict]] = {}
+                pending = set(downloads)
+
+                # Downloads hand raw bytes (or a spooled PDF) to the parse pool and move on;
+                # parsed output is finished here as soon as it lands, so both stages overlap
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        if future in downloads:
+                            i = downloads.pop(future)
+                            handoff = future.result()
+                            if handoff is None:
+                                record(i, None)
+                                continue
+                            handoff["remaining"] = len(handoff["futures"])
+                            for parse_future in handoff["futures"]:
+                                parses[parse_future] = (i, handoff)
+                                pending.add(parse_future)
+                        else:
+                            i, handoff = parses.pop(future)
+                            handoff["remaining"] -= 1
+                            tag = f"[{indexes[i - 1]}/{total}]"
+                            if handoff["kind"] == "pdf":
+                                result = self._advance_pdf(urls[i - 1], handoff, tag)
+                                if result is not False:
+                                    record(i, result)
+                            else:
+                                record(i, self._finish_html(urls[i - 1], handoff, tag))
+        finally:
+            self.sessions.close()
+            if self.cache:
+                self.cache.prune()
+
+        return succeeded, failed
+
+    def _download(self, parser: ParsePool, url: str, index: int = 1, total: int = 1) -> Optional[Dict]:
+        """Try each proxy tier in order; on success queue the body for parsing"""
+        tag = f"[{index}/{total}]"
+        self._log(f"\n{BLUE}--- Engaging URL {tag}: {url[:70]}... ---{RESET}")
+        cached = self.cache.lookup(url) if self.cache and not self.refresh else None
+
+        for attempt, (proxy_name, _) in enumerate(self.proxy_order):
+            self._log(f"{YELLOW}  -> {tag} Attempt {attempt + 1}/{len(self.proxy_order)} via {proxy_name}...{RESET}")
+            spooled = None
+            try:
+                headers = {'User-Agent': random.choice(self.user_agents)}
+                if cached:
+                    headers.update(self.cache.conditional_headers(cached))
+                with self.throttle.hold(url):
+                    response = self.sessions.get(proxy_name).get(url, timeout=self.timeout, headers=headers, stream=True)
+                    response.raise_for_status()
+                    content_type = response.headers.get('Content-Type', '').lower()
+                    if response.status_code == 304 and cached:
+                        response.close()
+                    elif 'application/pdf' in content_type:
+                        # PDFs go to disk in chunks instead of living in memory
+                        spooled = spool_to_file(response, self.spool_dir)
+                    else:
+                        body = response.content
+
+                if response.status_code == 304 and cached:
+                    self._log(f"{GREEN}   ♻️ {tag} Not modified, using cached copy{RESET}")
+                    return self._from_cache(parser, url, cached)
+
+                if spooled:
+                    return self._queue_pdf(parser, spooled, temporary=True, headers=dict(response.headers))
+                return self._queue_html(parser, content_type, body, headers=dict(response.headers))
+
+            except requests.RequestException as e:
+                self._log(f"{RED}   - {tag} Network Error: {e}{RESET}")
+                _discard(spooled)
+                time.sleep(1)
+            except Exception as e:
+                self._log(f"{RED}   - {tag} Critical Error: {e}{RESET}")
+                _discard(spooled)
+                break
+        return None
+
+    def _queue_html(self, parser: ParsePool, content_type: str, body: bytes,
+                    headers: Optional[Dict] = None) -> Dict:
+        # Header charset only; sniffing happens once, in the worker
+        encoding = get_encoding_from_headers({'content-type': content_type}) if 'charset' in content_type else None
+        return {"kind": "html", "parser": parse_html.__name__, "futures": [parser.submit(parse_html, body, encoding)],
+                "headers": headers, "body": body if headers else None}
+
+    def _queue_pdf(self, parser: ParsePool, path: Path, temporary: bool,
+                   headers: Optional[Dict] = None) -> Dict:
+        """Split a PDF on disk into page-range jobs, capped at max_pdf_pages"""
+        page_count = pdf_page_count(str(path))
+        pages = min(page_count, self.max_pdf_pages) if self.max_pdf_pages else page_count
+        futures = [parser.submit(extract_pdf_pages, str(path), start, min(start + PDF_PAGES_PER_JOB, pages))
+                   for start in range(0, pages, PDF_PAGES_PER_JOB)]
+        if not futures:
+            futures = [_completed([])]
+        return {"kind": "pdf", "parser": PDF_PARSER, "futures": futures, "path": path, "temporary": temporary,
+                "page_count": page_count, "pages": pages, "headers": headers, "body": path if headers else None}
+
+    def _from_cache(self, parser: ParsePool, url: str, cached: Dict) -> Optional[Dict]:
+        """Serve a 304 from the cache, re-parsing the stored body only if this parser never saw it"""
+        self.cache.mark_validated(url)
+        content_type = cached.get("content_type", "").lower()
+        is_pdf = 'application/pdf' in content_type
+        parsed = self.cache.load_parsed(url, PDF_PARSER if is_pdf else parse_html.__name__)
+
+        if is_pdf and parsed is not None:
+            # Replay the cached text as a single pseudo page so it takes the normal PDF path
+            return {"kind": "pdf", "parser": PDF_PARSER, "futures": [_completed([(1, parsed["content"], 0.0)])],
+                    "path": None, "temporary": False, "page_count": parsed.get("page_count", 0),
+                    "pages": parsed.get("pages", 0), "headers": None, "body": None, "from_cache": True}
+        if is_pdf:
+            path = self.cache.body_path(url)
+            return self._queue_pdf(parser, path, temporary=False) if path else None
+        if parsed is not None:
+            return {"kind": "html", "parser": parse_html.__name__, "futures": [_completed(parsed)],
+                    "headers": None, "body": None}
+        body = self.cache.load_body(url)
+        return self._queue_html(parser, content_type, body) if body is not None else None
+
+    def _store(self, url: str, handoff: Dict, parsed: Dict, tag: str):
+        if not self.cache:
+            return
+        try:
+            self.cache.store(url, handoff["parser"], parsed, handoff["headers"], handoff["body"])
+        except OSError as e:
+            self._log(f"{YELLOW}   - {tag} Cache write skipped: {e}{RESET}")
+
+    def _finish_html(self, url: str, handoff: Dict, tag: str) -> Optional[Dict]:
+        """Write the markdown file for a parsed page and build its JSON result"""
+        try:
+            parsed = handoff["futures"][0].result()
+        except Exception as e:
+            self._log(f"{RED}   - {tag} Critical Error: {e}{RESET}")
+            return None
+
+        self._store(url, handoff, parsed, tag)
+        title, content = parsed["title"], parsed["content"]
+        md_filepath = self._write_markdown(url, title, content)
+        self._log(f"{GREEN}✅ {tag} Success (HTML):{RESET} Saved {len(content):,} chars")
+        return {"url": url, "title": title, "rating": calculate_rating(len(content)),
+                "markdown_file": str(md_filepath), "content": content}
+
+    def _advance_pdf(self, url: str, handoff: Dict, tag: str):
+        """Stream finished page ranges into the markdown file in page order
+
+        Returns False while page ranges are still outstanding, then the JSON result
+        (or None if extraction failed).
+        """
+        title = f"[PDF] {Path(url).name}"
+        if handoff.get("failed"):
+            return False  # already reported; late page jobs are just drained
+
+        try:
+            if "md_file" not in handoff:
+                handoff.update(md_path=self.content_dir / clean_filename(url, "md"), written=0, parts=[], timings=[])
+                handoff["md_file"] = open(handoff["md_path"], 'w', encoding='utf-8')
+                handoff["md_file"].write(f"# {title}\n\n_Source: {url}_\n\n---\n\n")
+
+            futures = handoff["futures"]
+            while handoff["written"] < len(futures) and futures[handoff["written"]].done():
+                for page_number, text, seconds in futures[handoff["written"]].result():
+                    handoff["md_file"].write(text)
+                    handoff["parts"].append(text)
+                    handoff["timings"].append((page_number, seconds))
+                handoff["written"] += 1
+            if handoff["remaining"]:
+                return False
+        except Exception as e:
+            self._log(f"{RED}   - {tag} Critical Error: {e}{RESET}")
+            self._cancel_pdf(handoff)
+            return None
+
+        handoff["md_file"].close()
+        pdf_text = "".join(handoff["parts"])
+        self._store(url, handoff, {"content": pdf_text, "page_count": handoff["page_count"],
+                                   "pages": handoff["pages"]}, tag)
+        if handoff["temporary"]:
+            _discard(handoff["path"])
+
+        capped = f" (capped at {handoff['pages']} of {handoff['page_count']} pages)" if handoff["pages"] < handoff["page_count"] else ""
+        self._log(f"{GREEN}✅ {tag} Success (PDF):{RESET} Extracted {len(pdf_text):,} chars{capped}")
+        if not handoff.get("from_cache"):
+            self._log_page_timings(tag, handoff["timings"])
+        return {"url": url, "title": title, "rating": calculate_rating(len(pdf_text)),
+                "markdown_file": str(handoff["md_path"]), "content": pdf_text}
+
+    def _cancel_pdf(self, handoff: Dict):
+        """Drop a failed PDF: outstanding page jobs, the partial markdown and the temp file"""
+        handoff["failed"] = True
+        for future in handoff["futures"]:
+            future.cancel()
+        if "md_file" in handoff:
+            handoff["md_file"].close()
+        if handoff["temporary"]:
+            _discard(handoff["path"])
+
+    def _log_page_timings(self, tag: str, timings: List[Tuple[int, float]]):
+        if not timings:
+            return
+        total_seconds = sum(seconds for _, seconds in timings)
+        slowest = sorted(timings, key=lambda t: t[1], reverse=True)[:PDF_SLOWEST_PAGES]
+        self._log(f"   ⏱️ {tag} {len(timings)} pages in {total_seconds:.2f}s "
+                  f"(avg {total_seconds / len(timings) * 1000:.0f}ms/page); slowest: "
+                  + ", ".join(f"p.{page} {seconds * 1000:.0f}ms" for page, seconds in slowest))
+
+    def _log(self, message: str):
+        if self.verbose:
+            print(message)
+
+    def _write_markdown(self, url: str, title: str, content: str) -> Path:
+        md_filepath = self.content_dir / clean_filename(url, "md")
+        with open(md_filepath, 'w', encoding='utf-8') as f:
+            f.write(f"# {title}\n\n_Source: {url}_\n\n---\n\n{content}")
+        return md_filepath
+
+def spool_to_file(response: requests.Response, spool_dir: Optional[Path] = None) -> Path:
+    """Stream a response body into a temp file chunk by chunk"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf", dir=spool_dir) as f:
+        for chunk in response.iter_content(chunk_size=SPOOL_CHUNK_BYTES):
+            f.write(chunk)
+    return Path(f.name)
+
+def _discard(path: Optional[Path]):
+    if path:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+def _completed(result) -> Future:
+    future = Future()
+    future.set_result(result)
+    return future
+
+def clean_filename(url: str, extension: str) -> str:
+    clean = re.sub(r'^https?:\/\/', '', url).replace('/', '_')
+    clean = re.sub(r'[\\?%*:|"<>]', '', clean)
+    return f"{datetime.now().strftime('%Y%m%d%H%M%S')}_{clean[:70]}.{extension}"
+
+def calculate_rating(length: int) -> int:
+    if length > 8000: return 5;
+    if length > 4000: return 4;
+    if length > 1500: return 3;
+    if length > 500: return 2;
+    return 1
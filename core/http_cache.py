@@ -0,0 +1,150 @@
+"""
+🔗 Remember - HTTP Cache
+On-disk response cache with ETag/Last-Modified revalidation for repeat extractions
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+CACHE_DIR = Path.home() / "remember" / ".cache" / "http"
+DEFAULT_TTL_DAYS = 30
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3  # 2 GB of bodies + parsed text
+
+class HttpCache:
+    """Keyed by URL: meta (validators) + raw body + parsed text per parser"""
+
+    def __init__(self, root: Path = CACHE_DIR, ttl_days: float = DEFAULT_TTL_DAYS,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.ttl_seconds = ttl_days * 86400
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _paths(self, url: str) -> Dict[str, Path]:
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        folder = self.root / key[:2]
+        return {"folder": folder, "meta": folder / f"{key}.meta.json", "body": folder / f"{key}.body",
+                "stem": folder / key}
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return the stored meta for a URL, or None when missing or past its TTL"""
+        paths = self._paths(url)
+        try:
+            meta = json.loads(paths["meta"].read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        if time.time() - meta.get("validated_at", 0) > self.ttl_seconds or not paths["body"].exists():
+            return None
+        return meta
+
+    def conditional_headers(self, meta: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers for a cached entry"""
+        headers = {}
+        if meta and meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta and meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def load_body(self, url: str) -> Optional[bytes]:
+        try:
+            return self._paths(url)["body"].read_bytes()
+        except OSError:
+            return None
+
+    def body_path(self, url: str) -> Optional[Path]:
+        """Cached body on disk, for readers (like PyMuPDF) that open files directly"""
+        path = self._paths(url)["body"]
+        return path if path.exists() else None
+
+    def load_parsed(self, url: str, parser: str) -> Optional[Dict[str, Any]]:
+        """Parsed output of a given parser function, if that parser has seen this body"""
+        try:
+            return json.loads(Path(f"{self._paths(url)['stem']}.{parser}.json").read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+
+    def store(self, url: str, parser: str, parsed: Dict[str, Any],
+              headers: Optional[Dict[str, str]] = None, body: Union[bytes, Path, None] = None):
+        """Save parsed output; with headers + body (bytes or a spooled file), also replace the cached response"""
+        paths = self._paths(url)
+        paths["folder"].mkdir(parents=True, exist_ok=True)
+
+        if body is not None:
+            headers = {k.lower(): v for k, v in (headers or {}).items()}
+            if not headers.get("etag") and not headers.get("last-modified"):
+                return  # nothing to revalidate against next time
+            for stale in paths["folder"].glob(f"{paths['stem'].name}.parse_*.json"):
+                stale.unlink(missing_ok=True)  # parsed text of the previous body
+            _atomic_write(paths["body"], body)
+            meta = {
+                "url": url,
+                "etag": headers.get("etag"),
+                "last_modified": headers.get("last-modified"),
+                "content_type": headers.get("content-type", ""),
+                "stored_at": time.time(),
+                "validated_at": time.time(),
+                "last_used": time.time()
+            }
+            _atomic_write(paths["meta"], json.dumps(meta).encode('utf-8'))
+        elif not paths["meta"].exists():
+            return
+
+        _atomic_write(Path(f"{paths['stem']}.{parser}.json"), json.dumps(parsed).encode('utf-8'))
+
+    def mark_validated(self, url: str):
+        """Record a 304: the cached body is current as of now"""
+        paths = self._paths(url)
+        try:
+            meta = json.loads(paths["meta"].read_text(encoding='utf-8'))
+            meta["validated_at"] = meta["last_used"] = time.time()
+            _atomic_write(paths["meta"], json.dumps(meta).encode('utf-8'))
+        except (OSError, ValueError):
+            pass
+
+    def prune(self) -> int:
+        """Drop entries past the TTL, then least-recently-used ones until under max_bytes"""
+        now = time.time()
+        entries, removed = [], 0
+        for meta_path in self.root.glob("*/*.meta.json"):
+            stem = meta_path.name[:-len(".meta.json")]
+            files = list(meta_path.parent.glob(f"{stem}.*"))
+            try:
+                meta = json.loads(meta_path.read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                meta = {}
+            if now - meta.get("validated_at", 0) > self.ttl_seconds:
+                removed += _remove(files)
+                continue
+            size = sum(f.stat().st_size for f in files if f.exists())
+            entries.append((meta.get("last_used", 0), size, files))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, files in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            removed += _remove(files)
+            total -= size
+        return removed
+
+def _atomic_write(path: Path, data: Union[bytes, Path]):
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    if isinstance(data, Path):
+        shutil.copyfile(data, tmp)
+    else:
+        tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+def _remove(files) -> int:
+    for f in files:
+        try:
+            f.unlink()
+        except OSError:
+            pass
+    return 1
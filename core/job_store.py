@@ -0,0 +1,148 @@
+"""
+🔗 Remember - Job Store
+Durable batch-analysis jobs in the database's sidecar: per-document status, attempts and results
+"""
+
+import json
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from core import sidecar
+
+MAX_TASK_ATTEMPTS = 3  # a document that keeps killing the worker is failed on resume, not retried forever
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analysis_jobs (
+    job_id     TEXT PRIMARY KEY,
+    collection TEXT NOT NULL,
+    status     TEXT NOT NULL,
+    params     TEXT NOT NULL,
+    created    REAL NOT NULL,
+    updated    REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS analysis_tasks (
+    job_id   TEXT NOT NULL,
+    doc_id   TEXT NOT NULL,
+    title    TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    status   TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result   TEXT,
+    error    TEXT,
+    updated  REAL,
+    PRIMARY KEY (job_id, doc_id)
+);
+CREATE INDEX IF NOT EXISTS analysis_tasks_status ON analysis_tasks (job_id, status);
+"""
+
+class JobStore:
+    """Jobs for one database; every state change is written before the caller moves on
+
+    Task statuses: pending -> running -> done | failed. A task still marked
+    running after a restart was interrupted mid-call and is picked up again.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        sidecar.connect(self.db_path, SCHEMA)  # create the tables before any transaction starts
+
+    @staticmethod
+    def exists(db_path: Path) -> bool:
+        return sidecar.sidecar_path(db_path).exists()
+
+    def create(self, collection_name: str, params: Dict[str, Any], docs: Iterable[Dict[str, Any]]) -> str:
+        """New running job over docs ({"id", "title"}); returns its job ID
+
+        Documents still pending or running in another running job on the same
+        collection are left out, so concurrent jobs never pay for the same call.
+        """
+        job_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        with sidecar.transaction(self.db_path, SCHEMA) as conn:
+            claimed = {doc_id for doc_id, in conn.execute(
+                "SELECT t.doc_id FROM analysis_tasks t JOIN analysis_jobs j ON j.job_id = t.job_id "
+                "WHERE j.status = 'running' AND j.collection = ? AND t.status IN ('pending', 'running')",
+                (collection_name,))}
+            conn.execute("INSERT INTO analysis_jobs VALUES (?, ?, 'running', ?, ?, ?)",
+                         (job_id, collection_name, json.dumps(params), now, now))
+            conn.executemany("INSERT OR IGNORE INTO analysis_tasks (job_id, doc_id, title, position) VALUES (?, ?, ?, ?)",
+                             [(job_id, doc["id"], doc["title"], i) for i, doc in enumerate(docs)
+                              if doc["id"] not in claimed])
+        return job_id
+
+    def job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute("SELECT job_id, collection, status, params, created, updated FROM analysis_jobs "
+                                   "WHERE job_id = ?", (job_id,)).fetchone()
+        return self._job(row) if row else None
+
+    def jobs(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Newest first"""
+        sql = "SELECT job_id, collection, status, params, created, updated FROM analysis_jobs"
+        rows = self._conn().execute(sql + (" WHERE status = ?" if status else "") + " ORDER BY created DESC",
+                                    (status,) if status else ()).fetchall()
+        return [self._job(row) for row in rows]
+
+    def set_status(self, job_id: str, status: str):
+        self._conn().execute("UPDATE analysis_jobs SET status = ?, updated = ? WHERE job_id = ?",
+                             (status, time.time(), job_id))
+
+    def counts(self, job_id: str) -> Dict[str, int]:
+        counts = {"pending": 0, "running": 0, "done": 0, "failed": 0}
+        for status, count in self._conn().execute("SELECT status, COUNT(*) FROM analysis_tasks WHERE job_id = ? "
+                                                  "GROUP BY status", (job_id,)):
+            counts[status] = count
+        return counts
+
+    def resumable_tasks(self, job_id: str) -> List[Dict[str, Any]]:
+        """Pending and interrupted tasks in queue order; ones out of attempts are failed instead"""
+        conn = self._conn()
+        conn.execute("UPDATE analysis_tasks SET status = 'failed', error = 'Interrupted too many times', updated = ? "
+                     "WHERE job_id = ? AND status = 'running' AND attempts >= ?",
+                     (time.time(), job_id, MAX_TASK_ATTEMPTS))
+        rows = conn.execute("SELECT doc_id, title FROM analysis_tasks WHERE job_id = ? AND status IN ('pending', 'running') "
+                            "ORDER BY position", (job_id,)).fetchall()
+        return [{"id": doc_id, "title": title} for doc_id, title in rows]
+
+    def start_task(self, job_id: str, doc_id: str):
+        self._conn().execute("UPDATE analysis_tasks SET status = 'running', attempts = attempts + 1, updated = ? "
+                             "WHERE job_id = ? AND doc_id = ?", (time.time(), job_id, doc_id))
+
+    def complete_task(self, job_id: str, doc_id: str, result: Dict[str, Any]):
+        self._finish(job_id, doc_id, "done", json.dumps(result), None)
+
+    def fail_task(self, job_id: str, doc_id: str, error: str):
+        self._finish(job_id, doc_id, "failed", None, error)
+
+    def finished_tasks(self, job_id: str) -> List[Dict[str, Any]]:
+        """Done and failed tasks in completion order -- summaries only, cheap enough to poll"""
+        rows = self._conn().execute("SELECT doc_id, title, status, attempts, error, "
+                                    "json_extract(result, '$.character_count') FROM analysis_tasks "
+                                    "WHERE job_id = ? AND status IN ('done', 'failed') ORDER BY updated",
+                                    (job_id,)).fetchall()
+        return [{"id": doc_id, "title": title, "status": status, "attempts": attempts,
+                 "error": error, "characters": characters or 0}
+                for doc_id, title, status, attempts, error, characters in rows]
+
+    def results(self, job_id: str) -> List[Dict[str, Any]]:
+        """Full results of the done tasks, in completion order"""
+        rows = self._conn().execute("SELECT result FROM analysis_tasks WHERE job_id = ? AND status = 'done' "
+                                    "ORDER BY updated", (job_id,)).fetchall()
+        return [json.loads(result) for result, in rows]
+
+    def _finish(self, job_id: str, doc_id: str, status: str, result: Optional[str], error: Optional[str]):
+        now = time.time()
+        with sidecar.transaction(self.db_path, SCHEMA) as conn:
+            conn.execute("UPDATE analysis_tasks SET status = ?, result = ?, error = ?, updated = ? "
+                         "WHERE job_id = ? AND doc_id = ?", (status, result, error, now, job_id, doc_id))
+            conn.execute("UPDATE analysis_jobs SET updated = ? WHERE job_id = ?", (now, job_id))
+
+    def _conn(self):
+        return sidecar.connect(self.db_path, SCHEMA)
+
+    @staticmethod
+    def _job(row) -> Dict[str, Any]:
+        job_id, collection_name, status, params, created, updated = row
+        return {"job_id": job_id, "collection": collection_name, "status": status,
+                "params": json.loads(params), "created": created, "updated": updated}
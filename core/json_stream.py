@@ -0,0 +1,106 @@
+"""
+🔗 Remember - JSON Streaming
+Read extraction dumps (JSON arrays or JSONL) one record at a time with bounded memory
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, Tuple
+
+READ_CHUNK_CHARS = 1024 * 1024
+WHITESPACE = " \t\r\n"
+
+def iter_json_records(path: Path, chunk_chars: int = READ_CHUNK_CHARS) -> Iterator[Tuple[Dict[str, Any], int]]:
+    """Yield (record, bytes_read_so_far) from a JSON array or a JSONL file
+
+    The format is sniffed from the first non-blank character, so a .json file holding
+    JSONL (or the other way round) still imports. Checkpoint lines written by
+    SessionCheckpoint are unwrapped to their result; failed ones are skipped.
+    """
+    with open(path, 'rb') as raw:
+        first = raw.read(4096).lstrip()
+    if first.startswith(b'\xef\xbb\xbf'):
+        first = first[3:].lstrip()
+
+    records = _iter_array(path, chunk_chars) if first.startswith(b'[') else _iter_lines(path)
+    for record, position in records:
+        if not isinstance(record, dict):
+            continue
+        if "status" in record and "index" in record:
+            if record.get("status") != "success" or not isinstance(record.get("result"), dict):
+                continue
+            record = record["result"]
+        yield record, position
+
+def peek_json_record(path: Path) -> Any:
+    """First record of a dump (or None), without reading the rest of the file"""
+    try:
+        return next(iter_json_records(path))[0]
+    except (StopIteration, ValueError, OSError):
+        return None
+
+def _iter_lines(path: Path) -> Iterator[Tuple[Any, int]]:
+    with open(path, 'rb') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line), f.tell()
+            except ValueError as e:
+                raise ValueError(f"{path}: bad JSON on line {line_number}: {e}") from e
+
+def _iter_array(path: Path, chunk_chars: int) -> Iterator[Tuple[Any, int]]:
+    """Incrementally raw_decode the items of a top-level JSON array"""
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        buffer, pos, eof = "", 0, False
+
+        def fill(min_chars: int) -> bool:
+            """Append at least min_chars more text; False once the file is exhausted"""
+            nonlocal buffer, pos, eof
+            if eof:
+                return False
+            buffer, pos = buffer[pos:], 0  # drop everything already decoded
+            chunk = f.read(max(chunk_chars, min_chars))
+            if not chunk:
+                eof = True
+                return False
+            buffer += chunk
+            return True
+
+        def skip(chars: str):
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos] in chars:
+                    pos += 1
+                if pos < len(buffer) or not fill(chunk_chars):
+                    return
+
+        skip(WHITESPACE)
+        if pos >= len(buffer) or buffer[pos] != '[':
+            raise ValueError(f"{path}: expected a JSON array")
+        pos += 1
+
+        while True:
+            skip(WHITESPACE + ",")
+            if pos >= len(buffer):
+                raise ValueError(f"{path}: JSON array is not closed")
+            if buffer[pos] == ']':
+                return
+
+            # An item can span many chunks; grow the window until it decodes and is
+            # not cut off at the buffer edge
+            want = chunk_chars
+            while True:
+                try:
+                    item, end = decoder.raw_decode(buffer, pos)
+                    if end < len(buffer) or eof:
+                        break
+                except ValueError:
+                    if eof:
+                        raise ValueError(f"{path}: truncated or invalid JSON near byte {f.buffer.tell()}")
+                fill(want)
+                want *= 2
+            pos = end
+            yield item, f.buffer.tell()
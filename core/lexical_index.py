@@ -0,0 +1,97 @@
+"""
+🔗 Remember - Lexical Index
+BM25 full-text index (SQLite FTS5 in the sidecar) for exact terms like "AB 1482" that embeddings blur
+"""
+
+import re
+import sqlite3
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from core import sidecar
+
+REBUILD_PAGE_SIZE = 200
+TERM_PATTERN = re.compile(r'\w+', re.UNICODE)
+TITLE_WEIGHT, CONTENT_WEIGHT = 3.0, 1.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS lexical_docs (
+    id         INTEGER PRIMARY KEY,
+    collection TEXT NOT NULL,
+    doc_id     TEXT NOT NULL,
+    UNIQUE (collection, doc_id)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS lexical_fts USING fts5(
+    title, content, tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+def fts_query(query: str) -> Optional[str]:
+    """Quoted terms OR'd together, plus the whole query as a phrase so "Civil Code 1946.2" ranks exact hits first"""
+    terms = TERM_PATTERN.findall(query.lower())
+    if not terms:
+        return None
+    clauses = [f'"{term}"' for term in dict.fromkeys(terms)]
+    if len(terms) > 1:
+        clauses.insert(0, '"' + " ".join(terms) + '"')
+    return " OR ".join(clauses)
+
+class LexicalIndex:
+    """Per-database BM25 index; rows are keyed by (collection, doc_id) and replaced on re-import"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        sidecar.connect(self.db_path, SCHEMA)  # create the tables before any transaction starts
+
+    def upsert(self, conn: sqlite3.Connection, collection_name: str, doc_id: str, title: str, content: str):
+        """Index one document inside the caller's transaction"""
+        row = conn.execute("SELECT id FROM lexical_docs WHERE collection = ? AND doc_id = ?",
+                           (collection_name, doc_id)).fetchone()
+        if row:
+            conn.execute("DELETE FROM lexical_fts WHERE rowid = ?", (row[0],))
+            rowid = row[0]
+        else:
+            rowid = conn.execute("INSERT INTO lexical_docs (collection, doc_id) VALUES (?, ?)",
+                                 (collection_name, doc_id)).lastrowid
+        conn.execute("INSERT INTO lexical_fts (rowid, title, content) VALUES (?, ?, ?)", (rowid, title or "", content))
+
+    def forget(self, collection_name: str, conn: Optional[sqlite3.Connection] = None):
+        conn = conn or sidecar.connect(self.db_path, SCHEMA)
+        conn.execute("DELETE FROM lexical_fts WHERE rowid IN (SELECT id FROM lexical_docs WHERE collection = ?)",
+                     (collection_name,))
+        conn.execute("DELETE FROM lexical_docs WHERE collection = ?", (collection_name,))
+
+    def sync(self, collection) -> bool:
+        """Rebuild one collection's rows if they drifted from count() (first use, deletes); True if rebuilt"""
+        conn = sidecar.connect(self.db_path, SCHEMA)
+        indexed = conn.execute("SELECT COUNT(*) FROM lexical_docs WHERE collection = ?", (collection.name,)).fetchone()[0]
+        if indexed == collection.count():
+            return False
+
+        print(f"🔎 Building lexical index for {collection.name}...")
+        with sidecar.transaction(self.db_path, SCHEMA) as conn:
+            self.forget(collection.name, conn)
+            offset = 0
+            while True:
+                page = collection.get(include=["documents", "metadatas"], limit=REBUILD_PAGE_SIZE, offset=offset)
+                if not page["ids"]:
+                    break
+                for doc_id, document, metadata in zip(page["ids"], page["documents"], page["metadatas"]):
+                    self.upsert(conn, collection.name, doc_id, (metadata or {}).get("title", ""), document or "")
+                offset += len(page["ids"])
+        return True
+
+    def search(self, collection_names: Sequence[str], query: str, depth: int) -> List[Tuple[str, str, float]]:
+        """Best `depth` (collection, doc_id, score) by BM25 -- higher score is better"""
+        match = fts_query(query)
+        if not match or not collection_names:
+            return []
+        placeholders = ",".join("?" * len(collection_names))
+        rows = sidecar.connect(self.db_path, SCHEMA).execute(
+            f"SELECT d.collection, d.doc_id, bm25(lexical_fts, {TITLE_WEIGHT}, {CONTENT_WEIGHT}) AS score "
+            f"FROM lexical_fts JOIN lexical_docs d ON d.id = lexical_fts.rowid "
+            f"WHERE lexical_fts MATCH ? AND d.collection IN ({placeholders}) "
+            f"ORDER BY score LIMIT ?",
+            (match, *collection_names, depth)).fetchall()
+        # FTS5's bm25() is negative, smaller meaning more relevant
+        return [(name, doc_id, -score) for name, doc_id, score in rows]
@@ -0,0 +1,130 @@
+"""
+🔗 Remember - LLM Response Cache
+Content-addressed cache of successful LLM responses, keyed by model + messages + tools, LRU-bounded by size
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+CACHE_DIR = Path.home() / "remember" / ".cache" / "llm"
+CACHE_FILE = "llm_cache.sqlite3"
+BUSY_TIMEOUT_SECONDS = 30  # writes are single-row, so waits are short
+DEFAULT_MAX_BYTES = 512 * 1024 ** 2
+EVICT_TO = 0.9  # evict down to 90% of the cap so every insert near the limit doesn't trigger eviction
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key       TEXT PRIMARY KEY,
+    model     TEXT NOT NULL,
+    response  TEXT NOT NULL,
+    bytes     INTEGER NOT NULL,
+    created   REAL NOT NULL,
+    last_used REAL NOT NULL,
+    hits      INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS llm_cache_lru ON llm_cache (last_used);
+"""
+
+LLMOutcome = Tuple[bool, Any, Any]
+
+def cache_key(model: Optional[str], messages: List[Dict[str, Any]], tools: Optional[List[Dict]] = None,
+              **params: Any) -> str:
+    """SHA-256 of everything that shapes the answer; params name the call style (e.g. kind="function_call_chat")"""
+    payload = json.dumps({"model": model, "messages": messages, "tools": tools or [], "params": params},
+                         sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class LLMCache:
+    """One SQLite file shared by the web UI and CLI; only successful responses are stored"""
+
+    def __init__(self, root: Path = CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.path = self.root / CACHE_FILE
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._evict_lock = threading.Lock()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._conn().executescript(SCHEMA)
+        # Running size estimate (other processes write too), re-summed only when it crosses the cap
+        self._approx_bytes = self._conn().execute("SELECT COALESCE(SUM(bytes), 0) FROM llm_cache").fetchone()[0]
+
+    def _conn(self) -> sqlite3.Connection:
+        """This thread's connection (autocommit, WAL so readers never wait on a writer)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(str(self.path), timeout=BUSY_TIMEOUT_SECONDS,
+                                                      isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        conn = self._conn()
+        row = conn.execute("SELECT response FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        conn.execute("UPDATE llm_cache SET last_used = ?, hits = hits + 1 WHERE key = ?", (time.time(), key))
+        return json.loads(row[0])
+
+    def put(self, key: str, model: Optional[str], response: Any):
+        body = json.dumps(response, ensure_ascii=False, default=str)
+        now = time.time()
+        self._conn().execute(
+            "INSERT OR REPLACE INTO llm_cache (key, model, response, bytes, created, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+            (key, model or "", body, len(body.encode("utf-8")), now, now))
+        self._approx_bytes += len(body.encode("utf-8"))
+        if self._approx_bytes > self.max_bytes:
+            self._evict()
+
+    def cached_call(self, key: str, model: Optional[str], call: Callable[[], LLMOutcome],
+                    use_cache: bool = True) -> Tuple[LLMOutcome, bool]:
+        """(outcome, served_from_cache); a miss runs call() and stores the response if it succeeded"""
+        if use_cache:
+            response = self.get(key)
+            if response is not None:
+                return (True, response, {"cached": True}), True
+        outcome = call()
+        if outcome[0]:
+            self.put(key, model, outcome[1])
+        return outcome, False
+
+    def stats(self) -> Dict[str, Any]:
+        entries, size, hits = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(bytes), 0), COALESCE(SUM(hits), 0) FROM llm_cache").fetchone()
+        return {"entries": entries, "bytes": size, "hits": hits, "max_bytes": self.max_bytes}
+
+    def clear(self):
+        self._conn().execute("DELETE FROM llm_cache")
+        self._approx_bytes = 0
+
+    def _evict(self):
+        """Drop least recently used entries once the cache is over its byte cap"""
+        conn = self._conn()
+        with self._evict_lock:
+            total = conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM llm_cache").fetchone()[0]
+            excess, doomed = total - self.max_bytes * EVICT_TO, []
+            if total > self.max_bytes:
+                for key, size in conn.execute("SELECT key, bytes FROM llm_cache ORDER BY last_used"):
+                    if excess <= 0:
+                        break
+                    doomed.append((key,))
+                    excess -= size
+                conn.executemany("DELETE FROM llm_cache WHERE key = ?", doomed)
+            self._approx_bytes = conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM llm_cache").fetchone()[0]
+
+_cache: Optional[LLMCache] = None
+_cache_lock = threading.Lock()
+
+def get_llm_cache() -> LLMCache:
+    """Process-wide cache instance"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LLMCache()
+    return _cache
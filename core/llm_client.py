@@ -0,0 +1,105 @@
+"""
+🔗 Remember - LLM Client
+One lazily created GroqClient per process, with a cached health state instead of a probe per command
+"""
+
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+# Add the groq infrastructure to path
+sys.path.append(str(Path.home() / "remember"))
+
+try:
+    from groq_client import GroqClient
+except ImportError:
+    print("❌ Groq infrastructure not found - ensure groq_client.py is in ~/remember/")
+    GroqClient = None
+
+HEALTH_TTL_SECONDS = 300.0  # a known-good client is re-probed in the background after this long
+WARMUP_ENV = "REMEMBER_GROQ_WARMUP"  # "1" probes the API once at startup
+
+class ClientHealth:
+    """Last known state of the Groq API: unknown until probed or used, then ok / failed"""
+
+    def __init__(self):
+        self.state = "unknown"
+        self.error: Optional[str] = None
+        self.checked_at = 0.0
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def mark_ok(self):
+        self.state, self.error, self.checked_at = "ok", None, time.time()
+
+    def mark_failed(self, error: Any):
+        self.state, self.error, self.checked_at = "failed", str(error), time.time()
+
+    @property
+    def stale(self) -> bool:
+        return self.state != "ok" or time.time() - self.checked_at > HEALTH_TTL_SECONDS
+
+_client = None
+_client_lock = threading.Lock()
+health = ClientHealth()
+
+def get_groq_client():
+    """The shared GroqClient, created on first use; None if groq_client.py or its config is missing"""
+    global _client
+    if _client is None and GroqClient is not None:
+        with _client_lock:
+            if _client is None:
+                started = time.perf_counter()
+                try:
+                    _client = GroqClient()
+                except Exception as e:
+                    print(f"❌ Groq initialization error: {e}")
+                    health.mark_failed(e)
+                    return None
+                print(f"⚡ Groq client ready in {time.perf_counter() - started:.2f}s")
+    return _client
+
+def probe() -> bool:
+    """One minimal round-trip; updates and returns the health state"""
+    client = get_groq_client()
+    if client is None:
+        return False
+    started = time.perf_counter()
+    try:
+        success, response, debug = client.simple_chat("Test", "Say OK")
+    except Exception as e:
+        success, debug = False, e
+    latency = time.perf_counter() - started
+    if success:
+        health.mark_ok()
+        print(f"✅ Groq API responded in {latency:.2f}s")
+    else:
+        health.mark_failed(debug)
+        print(f"⚠️ Groq API probe failed after {latency:.2f}s: {debug}")
+    return success
+
+def refresh_in_background():
+    """Re-probe on a daemon thread if the cached state is stale; never blocks the caller"""
+    with health._lock:
+        if health._refreshing or not health.stale:
+            return
+        health._refreshing = True
+
+    def run():
+        try:
+            probe()
+        finally:
+            health._refreshing = False
+
+    threading.Thread(target=run, name="remember-groq-health", daemon=True).start()
+
+def warm_up(force: bool = False) -> bool:
+    """Create the client at startup; probe the API only if asked (force or REMEMBER_GROQ_WARMUP=1)"""
+    if get_groq_client() is None:
+        return False
+    if force or os.getenv(WARMUP_ENV) == "1":
+        return probe()
+    return True
@@ -0,0 +1,211 @@
+"""
+🔗 Remember - LLM Scheduler
+Run batch LLM calls concurrently under per-model request/token budgets, backing off on 429s
+"""
+
+import asyncio
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+ANALYSIS_CONCURRENCY = 4
+MAX_ANALYSIS_CONCURRENCY = 16
+MAX_RATE_LIMIT_RETRIES = 5
+BACKOFF_BASE_SECONDS = 2.0
+BACKOFF_MAX_SECONDS = 120.0
+CHARS_PER_TOKEN = 4  # budget estimate only; Groq counts the real tokens
+RESPONSE_TOKENS_ESTIMATE = 1024
+
+# (requests/min, tokens/min) per model -- Groq's free-tier limits; paid tiers can raise them
+# with REMEMBER_LLM_RPM / REMEMBER_LLM_TPM in ~/remember/.env
+MODEL_RATE_LIMITS = {
+    "moonshotai/kimi-k2-instruct": (60, 10000),
+    "meta-llama/llama-4-scout-17b-16e-instruct": (30, 30000),
+    "meta-llama/llama-4-maverick-17b-128e-instruct": (30, 6000),
+    "deepseek-r1-distill-llama-70b": (30, 6000),
+    "llama-3.3-70b-versatile": (30, 12000),
+    "llama-3.1-8b-instant": (30, 6000),
+    "gemma2-9b-it": (30, 15000),
+    "compound-beta": (15, 70000),
+    "compound-beta-mini": (15, 70000),
+    "default": (30, 6000)
+}
+
+RETRY_AFTER_PATTERN = re.compile(r'try again in (?:(\d+)m)?([\d.]+)s', re.IGNORECASE)
+
+LLMOutcome = Tuple[bool, Any, Any]  # (success, response, debug) -- the GroqClient convention
+
+def rate_limits(model: str) -> Tuple[float, float]:
+    """(requests/min, tokens/min) for a model, after the environment overrides"""
+    rpm, tpm = MODEL_RATE_LIMITS.get(model, MODEL_RATE_LIMITS["default"])
+    return float(os.getenv("REMEMBER_LLM_RPM", rpm)), float(os.getenv("REMEMBER_LLM_TPM", tpm))
+
+class TokenBucket:
+    """Refills at `per_minute`/60 per second up to one minute's worth; reservations may go into debt"""
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = float(per_minute)
+        self._level = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """Take `amount` now and return the seconds to wait before spending it
+
+        Callers queue by going into debt rather than polling, so waits are FIFO.
+        A request bigger than the whole bucket waits for a full bucket.
+        """
+        with self._lock:
+            self._refill()
+            self._level -= min(amount, self.capacity)
+            return max(0.0, -self._level / self.rate)
+
+    def drain(self):
+        """The server says we're out -- whatever we thought was left isn't"""
+        with self._lock:
+            self._refill()
+            self._level = min(self._level, 0.0)
+
+    def _refill(self):
+        now = time.monotonic()
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+class ModelBudget:
+    """Requests/min and tokens/min buckets for one model, plus a cooldown after 429s"""
+
+    def __init__(self, model: str):
+        rpm, tpm = rate_limits(model)
+        self.model = model
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self._cooldown_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: int) -> float:
+        with self._lock:
+            cooldown = max(0.0, self._cooldown_until - time.monotonic())
+        return max(cooldown, self.requests.reserve(1), self.tokens.reserve(tokens))
+
+    async def acquire(self, tokens: int):
+        await asyncio.sleep(self.reserve(tokens))
+
+    def wait(self, tokens: int):
+        """acquire() for worker threads making follow-up calls inside one scheduled item"""
+        time.sleep(self.reserve(tokens))
+
+    def penalize(self, retry_after: Optional[float], attempt: int):
+        """Pause every caller of this model; exponential with jitter unless the server named a delay"""
+        delay = retry_after if retry_after else min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt)
+        delay *= random.uniform(1.0, 1.25)
+        with self._lock:
+            self._cooldown_until = max(self._cooldown_until, time.monotonic() + delay)
+        self.requests.drain()
+        self.tokens.drain()
+
+_budgets: Dict[str, ModelBudget] = {}
+_budgets_lock = threading.Lock()
+
+def budget_for(model: str) -> ModelBudget:
+    """Process-wide budget per model, so concurrent batches share one allowance"""
+    with _budgets_lock:
+        if model not in _budgets:
+            _budgets[model] = ModelBudget(model)
+        return _budgets[model]
+
+def estimate_tokens(messages: Iterable[Dict[str, Any]], response_tokens: int = RESPONSE_TOKENS_ESTIMATE) -> int:
+    """Rough prompt + completion size for the tokens/min budget"""
+    return sum(len(str(m.get("content") or "")) for m in messages) // CHARS_PER_TOKEN + response_tokens
+
+def rate_limit_delay(outcome: LLMOutcome) -> Optional[float]:
+    """None if the call wasn't rate limited, else the server's suggested wait (0.0 when it gave none)"""
+    success, response, debug = outcome
+    if success:
+        return None
+    text = f"{debug} {response}"
+    if "429" not in text and "rate limit" not in text.lower():
+        return None
+    match = RETRY_AFTER_PATTERN.search(text)
+    return int(match.group(1) or 0) * 60 + float(match.group(2)) if match else 0.0
+
+class LLMScheduler:
+    """Keeps up to `concurrency` blocking LLM calls in flight on worker threads
+
+    The in-flight limit is adaptive: a 429 halves it and pauses the model's budget,
+    each clean response adds one back (up to `concurrency`).
+    """
+
+    def __init__(self, model: str, concurrency: int = ANALYSIS_CONCURRENCY):
+        self.budget = budget_for(model)
+        self.max_in_flight = max(1, min(concurrency, MAX_ANALYSIS_CONCURRENCY))
+        self.limit = self.max_in_flight
+        self.in_flight = 0
+        self.rate_limited = 0
+
+    async def run(self, items: Iterable[Any], call: Callable[[Any], LLMOutcome],
+                  token_estimate: Callable[[Any], int],
+                  on_result: Callable[[Any, bool, Any, Any], Awaitable[None]],
+                  should_continue: Callable[[], bool] = lambda: True,
+                  on_start: Optional[Callable[[Any], Awaitable[None]]] = None,
+                  cached: Optional[Callable[[Any], Optional[LLMOutcome]]] = None):
+        """call(item) runs on a worker thread; on_start(item) and on_result(item, success, response, debug) on the loop
+
+        Items not yet started when should_continue() turns False are skipped. An
+        outcome from cached(item) is delivered at once, with no slot or budget spent.
+        """
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Condition()
+        executor = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="remember-llm")
+
+        async def process(item):
+            hit = cached(item) if cached and should_continue() else None
+            if hit is not None:
+                if on_start:
+                    await on_start(item)
+                await on_result(item, *hit)
+                return
+            for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+                if not should_continue():
+                    return
+                async with slots:
+                    await slots.wait_for(lambda: self.in_flight < self.limit)
+                    self.in_flight += 1
+                try:
+                    await self.budget.acquire(token_estimate(item))
+                    if not should_continue():
+                        return
+                    if on_start:
+                        await on_start(item)
+                    try:
+                        outcome = await loop.run_in_executor(executor, call, item)
+                    except Exception as e:
+                        outcome = (False, None, str(e))
+                finally:
+                    async with slots:
+                        self.in_flight -= 1
+                        slots.notify_all()
+
+                retry_after = rate_limit_delay(outcome)
+                async with slots:
+                    if retry_after is None:
+                        self.limit = min(self.max_in_flight, self.limit + 1)
+                    else:
+                        self.limit = max(1, self.limit // 2)
+                        self.rate_limited += 1
+                    slots.notify_all()
+                if retry_after is None:
+                    await on_result(item, *outcome)
+                    return
+                print(f"⏳ {self.budget.model} rate limited; {self.limit} in flight, retry {attempt + 1}")
+                self.budget.penalize(retry_after, attempt)
+            await on_result(item, False, None, f"Rate limited {MAX_RATE_LIMIT_RETRIES + 1} times; giving up")
+
+        try:
+            await asyncio.gather(*(process(item) for item in items))
+        finally:
+            executor.shutdown(wait=False)
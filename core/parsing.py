@@ -0,0 +1,121 @@
+"""
+🔗 Remember - Parse Stage
+CPU-heavy HTML/PDF parsing that runs in worker processes, fed raw bytes by the download stage
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+from bs4 import BeautifulSoup, UnicodeDammit
+from readability import Document
+
+DEFAULT_PARSE_WORKERS = os.cpu_count() or 2
+QUEUE_DEPTH_PER_WORKER = 4  # parse jobs allowed to wait per worker before downloads block
+
+def decode_body(body: bytes, encoding: Optional[str] = None) -> str:
+    """Decode a raw response body once, trusting the header charset before sniffing"""
+    dammit = UnicodeDammit(body, [encoding] if encoding else [])
+    return (dammit.unicode_markup or body.decode('utf-8', errors='replace')).replace('\x00', '')
+
+def parse_html(body: bytes, encoding: Optional[str] = None) -> Dict[str, Any]:
+    """Readability main-content extraction with a stripped-page fallback (ExtractHandler style)"""
+    clean_content = decode_body(body, encoding)
+    doc = Document(clean_content)
+    title = doc.title()
+    best_content = BeautifulSoup(doc.summary(), 'html.parser').get_text(separator='\n', strip=True)
+
+    if not best_content or len(best_content) < 100:
+        soup = BeautifulSoup(clean_content, 'html.parser')
+        [tag.decompose() for tag in soup(["script", "style", "nav", "header", "footer", "aside", "form"])]
+        best_content = soup.get_text(separator='\n', strip=True)
+
+    return {"title": title, "content": best_content}
+
+def parse_article(body: bytes, encoding: Optional[str] = None) -> Dict[str, Any]:
+    """Readability summary plus token estimate (extract_urls.py style)"""
+    content = decode_body(body, encoding)
+    doc = Document(content)
+    title = doc.title() or "Untitled"  # Ensure title is never None
+    main_content = doc.summary() or content  # Fallback to raw content if summary fails
+
+    soup = BeautifulSoup(main_content, 'html.parser')
+    clean_text = soup.get_text() or "No content extracted"  # Ensure content is never empty
+
+    return {
+        "title": title,
+        "content": clean_text,
+        "html_content": main_content,
+        "token_count": estimate_tokens(clean_text)
+    }
+
+def pdf_page_count(path: str) -> int:
+    """Open a PDF from disk (MuPDF reads pages lazily) just to count its pages"""
+    doc = fitz.open(path)
+    try:
+        return doc.page_count
+    finally:
+        doc.close()
+
+def extract_pdf_pages(path: str, start: int, stop: int) -> List[Tuple[int, str, float]]:
+    """Text of pages [start, stop) as (page_number, text, seconds) -- one page-range job"""
+    doc = fitz.open(path)
+    try:
+        pages = []
+        for page_index in range(start, stop):
+            page_started = time.perf_counter()
+            text = doc[page_index].get_text()
+            pages.append((page_index + 1, text, time.perf_counter() - page_started))
+        return pages
+    finally:
+        doc.close()
+
+def estimate_tokens(text: str) -> int:
+    """Token count via tiktoken, falling back to a word-based estimate"""
+    try:
+        import tiktoken
+        encoding = tiktoken.encoding_for_model("gpt-3.5-turbo")
+        return len(encoding.encode(text))
+    except Exception:
+        return int(len(text.split()) * 1.3)  # Rough estimate
+
+class ParsePool:
+    """Process pool behind a bounded queue: submitters block once too many parses are waiting"""
+
+    def __init__(self, workers: int = DEFAULT_PARSE_WORKERS, queue_depth: Optional[int] = None):
+        self.workers = max(1, workers)
+        self.queue_depth = queue_depth or self.workers * QUEUE_DEPTH_PER_WORKER
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        self._slots = threading.BoundedSemaphore(self.queue_depth)
+        self._async_slots: Optional[asyncio.Semaphore] = None
+
+    def submit(self, fn: Callable, *args) -> Future:
+        """Queue a parse job from a thread, waiting while the queue is full"""
+        self._slots.acquire()
+        try:
+            future = self.executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """Queue a parse job from the event loop without blocking it"""
+        if self._async_slots is None:
+            self._async_slots = asyncio.Semaphore(self.queue_depth)
+        async with self._async_slots:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
@@ -0,0 +1,73 @@
+"""
+🔗 Remember - Progress Feed
+Numbered progress events for one job, fanned out to Server-Sent Events subscribers
+"""
+
+import asyncio
+import json
+import uuid
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Tuple
+
+FEED_MAX_EVENTS = 2000  # replay window for reconnects; older clients get a fresh snapshot
+HEARTBEAT_SECONDS = 15.0
+SSE_HEARTBEAT = ": keepalive\n\n"
+
+Event = Tuple[int, str, Dict[str, Any]]
+
+class ProgressFeed:
+    """Append-only event log with an epoch, so an ID from before a restart is never mistaken for a current one
+
+    Publish from the event loop thread; subscribers wake on each publish.
+    """
+
+    def __init__(self, max_events: int = FEED_MAX_EVENTS):
+        self.epoch = uuid.uuid4().hex[:8]
+        self.events: Deque[Event] = deque(maxlen=max_events)
+        self.last_id = 0
+        self.closed = False
+        self._wakeup = asyncio.Event()
+
+    def publish(self, event: str, data: Dict[str, Any]):
+        self.last_id += 1
+        self.events.append((self.last_id, event, data))
+        self._wakeup.set()
+        self._wakeup = asyncio.Event()
+
+    def close(self, event: str = "end", data: Optional[Dict[str, Any]] = None):
+        self.publish(event, data or {})
+        self.closed = True
+
+    def event_id(self, number: int) -> str:
+        return f"{self.epoch}-{number}"
+
+    def resume_point(self, last_event_id: Optional[str]) -> Optional[int]:
+        """Event number to replay after, or None if the client needs a snapshot first"""
+        if not last_event_id or "-" not in last_event_id:
+            return None
+        epoch, _, number = last_event_id.partition("-")
+        if epoch != self.epoch or not number.isdigit():
+            return None
+        oldest = self.events[0][0] if self.events else self.last_id + 1
+        return int(number) if int(number) >= oldest - 1 else None
+
+    async def follow(self, after: int, heartbeat: float = HEARTBEAT_SECONDS) -> AsyncIterator[Optional[Event]]:
+        """Events numbered above `after`, as they arrive; None marks an idle heartbeat"""
+        while True:
+            wakeup = self._wakeup
+            fresh = [e for e in self.events if e[0] > after]
+            for event in fresh:
+                yield event
+                after = event[0]
+            if self.closed and after >= self.last_id:
+                return
+            if not fresh:
+                try:
+                    await asyncio.wait_for(wakeup.wait(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+
+def sse_message(event: str, data: Dict[str, Any], event_id: Optional[str] = None) -> str:
+    lines = [f"id: {event_id}"] if event_id else []
+    lines += [f"event: {event}", f"data: {json.dumps(data)}"]
+    return "\n".join(lines) + "\n\n"
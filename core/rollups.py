@@ -0,0 +1,187 @@
+"""
+🔗 Remember - Collection Rollups
+Per-collection document/token/rating totals kept in the sidecar, so stats never page through documents
+"""
+
+import json
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Set
+
+from core import sidecar
+
+REBUILD_PAGE_SIZE = 1000
+RATINGS = (5, 4, 3, 2, 1)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS collection_rollups (
+    collection TEXT PRIMARY KEY,
+    documents  INTEGER NOT NULL,
+    tokens     INTEGER NOT NULL,
+    characters INTEGER NOT NULL,
+    analyzed   INTEGER NOT NULL,
+    ratings    TEXT NOT NULL
+);
+"""
+
+ANALYZED_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyzed_sources (
+    source_document_id TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS analyzed_sources_state (
+    id            INTEGER PRIMARY KEY CHECK (id = 1),
+    analysis_rows INTEGER NOT NULL
+);
+"""
+
+def empty_rollup() -> Dict[str, Any]:
+    return {"documents": 0, "tokens": 0, "characters": 0, "analyzed": 0,
+            "by_rating": {rating: 0 for rating in RATINGS}}
+
+class CollectionRollup:
+    """Running totals for one collection, adjusted by imports and rebuilt if they drift from count()"""
+
+    def __init__(self, db_path: Path, collection):
+        self.db_path = Path(db_path)
+        self.collection = collection
+        self.name = collection.name
+        sidecar.connect(self.db_path, SCHEMA)  # create the table before any transaction starts
+
+    @staticmethod
+    def forget(db_path: Path, collection_name: str):
+        sidecar.connect(db_path, SCHEMA).execute("DELETE FROM collection_rollups WHERE collection = ?",
+                                                 (collection_name,))
+
+    def get(self) -> Dict[str, Any]:
+        """Current totals; a rollup that disagrees with the native count is rebuilt first"""
+        rollup = self._load(sidecar.connect(self.db_path, SCHEMA))
+        if rollup is None or rollup["documents"] != self.collection.count():
+            rollup = self.rebuild()
+        return rollup
+
+    def sync(self):
+        self.get()
+
+    def rebuild(self) -> Dict[str, Any]:
+        """Recount from metadata only (no documents or embeddings), a page at a time"""
+        rollup = empty_rollup()
+        offset = 0
+        while True:
+            page = self.collection.get(include=["metadatas"], limit=REBUILD_PAGE_SIZE, offset=offset)
+            if not page["ids"]:
+                break
+            _add(rollup, page["metadatas"], 1)
+            offset += len(page["ids"])
+        with sidecar.transaction(self.db_path, SCHEMA) as conn:
+            self._save(conn, rollup)
+        return rollup
+
+    def apply(self, conn: sqlite3.Connection, added: Iterable[Dict] = (), removed: Iterable[Dict] = ()):
+        """Adjust totals inside the caller's transaction (e.g. an import batch)"""
+        rollup = self._load(conn) or empty_rollup()
+        _add(rollup, added, 1)
+        _add(rollup, removed, -1)
+        self._save(conn, rollup)
+
+    def adjust(self, added: Iterable[Dict] = (), removed: Iterable[Dict] = ()):
+        """apply() in a transaction of its own"""
+        with sidecar.transaction(self.db_path, SCHEMA) as conn:
+            self.apply(conn, added, removed)
+
+    def _load(self, conn: sqlite3.Connection) -> Optional[Dict[str, Any]]:
+        row = conn.execute("SELECT documents, tokens, characters, analyzed, ratings FROM collection_rollups "
+                           "WHERE collection = ?", (self.name,)).fetchone()
+        if not row:
+            return None
+        ratings = {int(k): v for k, v in json.loads(row[4]).items()}
+        return {"documents": row[0], "tokens": row[1], "characters": row[2], "analyzed": row[3],
+                "by_rating": {rating: ratings.get(rating, 0) for rating in RATINGS}}
+
+    def _save(self, conn: sqlite3.Connection, rollup: Dict[str, Any]):
+        conn.execute("INSERT OR REPLACE INTO collection_rollups VALUES (?, ?, ?, ?, ?, ?)",
+                     (self.name, rollup["documents"], rollup["tokens"], rollup["characters"], rollup["analyzed"],
+                      json.dumps(rollup["by_rating"])))
+
+class AnalyzedSources:
+    """Distinct source documents that have an analysis in any of the database's analysis collections
+
+    The table is current while the analysis collections' native count() matches
+    the one recorded when it was last written; otherwise (deletes, writes from
+    elsewhere) it is rebuilt from their metadata.
+    """
+
+    def __init__(self, db_path: Path, client, collection_names: Iterable[str]):
+        self.db_path = Path(db_path)
+        self.client = client
+        self.collection_names = sorted(collection_names)
+        sidecar.connect(self.db_path, ANALYZED_SCHEMA)  # create the tables before any transaction starts
+
+    def ids(self) -> Set[str]:
+        self.sync()
+        conn = sidecar.connect(self.db_path, ANALYZED_SCHEMA)
+        return {source_id for source_id, in conn.execute("SELECT source_document_id FROM analyzed_sources")}
+
+    def count(self) -> int:
+        self.sync()
+        return sidecar.connect(self.db_path, ANALYZED_SCHEMA).execute(
+            "SELECT COUNT(*) FROM analyzed_sources").fetchone()[0]
+
+    def record(self, source_document_id: str):
+        """Call after adding an analysis row for source_document_id"""
+        rows = self._analysis_rows()
+        with sidecar.transaction(self.db_path, ANALYZED_SCHEMA) as conn:
+            conn.execute("INSERT OR IGNORE INTO analyzed_sources VALUES (?)", (source_document_id,))
+            conn.execute("INSERT OR REPLACE INTO analyzed_sources_state VALUES (1, ?)", (rows,))
+
+    def sync(self):
+        row = sidecar.connect(self.db_path, ANALYZED_SCHEMA).execute(
+            "SELECT analysis_rows FROM analyzed_sources_state WHERE id = 1").fetchone()
+        rows = self._analysis_rows()
+        if row is None or row[0] != rows:
+            self.rebuild(rows)
+
+    def rebuild(self, rows: int):
+        """Re-read source IDs from metadata only, a page at a time"""
+        source_ids = set()
+        for collection in self._collections():
+            offset = 0
+            while True:
+                page = collection.get(include=["metadatas"], limit=REBUILD_PAGE_SIZE, offset=offset)
+                if not page["ids"]:
+                    break
+                source_ids.update(m["source_document_id"] for m in page["metadatas"]
+                                  if m and "source_document_id" in m)
+                offset += len(page["ids"])
+        with sidecar.transaction(self.db_path, ANALYZED_SCHEMA) as conn:
+            conn.execute("DELETE FROM analyzed_sources")
+            conn.executemany("INSERT INTO analyzed_sources VALUES (?)", [(source_id,) for source_id in source_ids])
+            conn.execute("INSERT OR REPLACE INTO analyzed_sources_state VALUES (1, ?)", (rows,))
+
+    def _collections(self):
+        collections = []
+        for name in self.collection_names:
+            try:
+                collections.append(self.client.get_collection(name))
+            except Exception:
+                pass  # not created until the first analysis is stored
+        return collections
+
+    def _analysis_rows(self) -> int:
+        return sum(collection.count() for collection in self._collections())
+
+def _add(rollup: Dict[str, Any], metadatas: Iterable[Optional[Dict]], sign: int):
+    for metadata in metadatas:
+        metadata = metadata or {}
+        rollup["documents"] += sign
+        rollup["tokens"] += sign * _int(metadata.get("token_count"))
+        rollup["characters"] += sign * _int(metadata.get("character_count"))
+        rollup["analyzed"] += sign * bool(metadata.get("llm_response_saved"))
+        rating = _int(metadata.get("rating"))
+        if rating in rollup["by_rating"]:
+            rollup["by_rating"][rating] += sign
+
+def _int(value) -> int:
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
@@ -0,0 +1,294 @@
+"""
+🔗 Remember - Search Executor
+Embed a query once, query collections concurrently, and merge hits with a bounded top-k heap
+"""
+
+import heapq
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from core.lexical_index import LexicalIndex
+from core.search_filters import where_key
+from core.snippets import build_previews
+
+SEARCH_WORKERS = 8
+MAX_RESULTS_PER_COLLECTION = 50
+EMBEDDING_CACHE_SIZE = 1024
+RESULT_CACHE_SIZE = 512
+RESULT_CACHE_TTL = 15 * 60  # seconds; the database version already catches imports and deletes
+LEXICAL_FILTER_OVERFETCH = 4  # BM25 can't see metadata, so filtered lexical ranking checks extra candidates
+RRF_K = 60  # reciprocal-rank fusion constant from Cormack et al.; damps the weight of top ranks
+SEARCH_MODES = ("hybrid", "vector", "lexical")
+
+_pool: Optional[ThreadPoolExecutor] = None
+_embedder = None
+_lock = threading.Lock()
+_lexical_synced = set()  # (db_path, collection, version) already checked against count()
+
+def _executor() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="remember-search")
+    return _pool
+
+class ResultCache:
+    """Small LRU of search results with a TTL; keys carry the database version"""
+
+    def __init__(self, max_entries: int = RESULT_CACHE_SIZE, ttl: float = RESULT_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+RESULT_CACHE = ResultCache()
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.split())
+
+def embed_query(query: str) -> List[float]:
+    """Embed with Chroma's default model -- the one every Remember collection was built with"""
+    return list(_cached_embedding(normalize_query(query)))
+
+def embed_passages(texts: List[str]) -> List[List[float]]:
+    """Uncached batch embedding for snippet passages"""
+    return [[float(x) for x in vector] for vector in _get_embedder()(texts)]
+
+def _get_embedder():
+    global _embedder
+    if _embedder is None:
+        with _lock:
+            if _embedder is None:
+                from chromadb.utils import embedding_functions
+                _embedder = embedding_functions.DefaultEmbeddingFunction()
+    return _embedder
+
+@lru_cache(maxsize=EMBEDDING_CACHE_SIZE)
+def _cached_embedding(query: str) -> Tuple[float, ...]:
+    return tuple(float(x) for x in _get_embedder()([query])[0])
+
+def search_collections(collections: Sequence[Any], query: str, limit: int = 20,
+                       embedding: Optional[List[float]] = None,
+                       version: Optional[int] = None,
+                       mode: str = "vector", db_path: Optional[Path] = None,
+                       where: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Vector, lexical or hybrid search across collections
+
+    Returns {"results": top-`limit` hits by relevance, "timings": seconds per
+    collection, "embed_seconds": ..., "errors": {collection: message}, "cached": bool}.
+    Lexical and hybrid modes need db_path for the BM25 index; `where` is a Chroma
+    metadata filter (see core.search_filters.build_where).
+    """
+    outcome = rank_documents(collections, query, limit, db_path, version, mode, embedding,
+                             per_collection=min(limit, MAX_RESULTS_PER_COLLECTION), where=where)
+    outcome["results"] = hydrate(collections, outcome.pop("ranked"))
+    return outcome
+
+def rank_documents(collections: Sequence[Any], query: str, depth: int,
+                   db_path: Optional[Path] = None, version: Optional[int] = None,
+                   mode: str = "hybrid", embedding: Optional[List[float]] = None,
+                   per_collection: Optional[int] = None,
+                   where: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """rank_collections for any mode; hybrid fuses BM25 and vector ranks with RRF
+
+    The lexical mode never touches the embedding model.
+    """
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Unknown search mode: {mode}")
+    if mode == "vector" or db_path is None:
+        return rank_collections(collections, query, depth, embedding, version, per_collection, where)
+
+    key = None
+    if version is not None:
+        key = (mode, normalize_query(query), depth, tuple(sorted(c.name for c in collections)),
+               where_key(where), version)
+        ranked = RESULT_CACHE.get(key)
+        if ranked is not None:
+            return {"ranked": ranked, "timings": {}, "embed_seconds": 0.0, "errors": {}, "cached": True}
+
+    lexical = lexical_ranking(collections, query, depth, db_path, version, where)
+
+    if mode == "lexical":
+        outcome = {"ranked": lexical, "timings": {}, "embed_seconds": 0.0, "errors": {}, "cached": False}
+    else:
+        outcome = rank_collections(collections, query, depth, embedding, None, per_collection, where)
+        outcome["ranked"] = reciprocal_rank_fusion([lexical, outcome["ranked"]], depth)
+
+    if key is not None and not outcome["errors"]:
+        RESULT_CACHE.put(key, outcome["ranked"])
+    return outcome
+
+def lexical_ranking(collections: Sequence[Any], query: str, depth: int,
+                    db_path: Path, version: Optional[int] = None,
+                    where: Optional[Dict[str, Any]] = None) -> List[Tuple[str, str, float]]:
+    index = LexicalIndex(db_path)
+    for collection in collections:
+        marker = (str(db_path), collection.name, version)
+        if version is None or marker not in _lexical_synced:
+            index.sync(collection)
+            _lexical_synced.add(marker)
+    if not where:
+        return index.search([c.name for c in collections], query, depth)
+    candidates = index.search([c.name for c in collections], query, depth * LEXICAL_FILTER_OVERFETCH)
+    return filter_ranked(collections, candidates, where)[:depth]
+
+def filter_ranked(collections: Sequence[Any], ranked: List[Tuple[str, str, float]],
+                  where: Dict[str, Any]) -> List[Tuple[str, str, float]]:
+    """Keep ranked IDs whose metadata matches `where` -- one ID-only get per collection"""
+    by_name = {c.name: c for c in collections}
+    wanted: Dict[str, List[str]] = {}
+    for name, doc_id, _ in ranked:
+        wanted.setdefault(name, []).append(doc_id)
+    matching = set()
+    for name, ids in wanted.items():
+        matching.update((name, doc_id) for doc_id in by_name[name].get(ids=ids, where=where, include=[])["ids"])
+    return [entry for entry in ranked if (entry[0], entry[1]) in matching]
+
+def reciprocal_rank_fusion(rankings: Sequence[List[Tuple[str, str, float]]], depth: int,
+                           k: int = RRF_K) -> List[Tuple[str, str, float]]:
+    """Sum of 1 / (k + rank) across rankings; scores are comparable whatever each ranker's scale"""
+    scores: Dict[Tuple[str, str], float] = {}
+    for ranking in rankings:
+        for rank, (name, doc_id, _) in enumerate(ranking, 1):
+            scores[(name, doc_id)] = scores.get((name, doc_id), 0.0) + 1.0 / (k + rank)
+    fused = heapq.nlargest(depth, scores.items(), key=lambda item: item[1])
+    return [(name, doc_id, score) for (name, doc_id), score in fused]
+
+def rank_collections(collections: Sequence[Any], query: str, depth: int,
+                     embedding: Optional[List[float]] = None,
+                     version: Optional[int] = None,
+                     per_collection: Optional[int] = None,
+                     where: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Top-`depth` (collection, id, relevance) triples, best first -- IDs and distances only
+
+    With a database version, the ranking is cached; later pages and repeats reuse it
+    until an import or delete bumps the version. `where` is applied by Chroma itself.
+    """
+    key = None
+    if version is not None:
+        key = (normalize_query(query), depth, tuple(sorted(c.name for c in collections)),
+               where_key(where), version)
+        ranked = RESULT_CACHE.get(key)
+        if ranked is not None:
+            return {"ranked": ranked, "timings": {}, "embed_seconds": 0.0, "errors": {}, "cached": True}
+
+    started = time.perf_counter()
+    embedding = embedding if embedding is not None else embed_query(query)
+    embed_seconds = time.perf_counter() - started
+
+    per_collection = per_collection or depth
+    futures = {_executor().submit(_query_one, collection, embedding, per_collection, where): collection.name
+               for collection in collections}
+
+    # Min-heap of the best `depth` hits so far; sequence numbers keep ties off the IDs
+    top: List = []
+    timings, errors = {}, {}
+    seq = 0
+    for future in as_completed(futures):
+        name = futures[future]
+        try:
+            hits, seconds = future.result()
+        except Exception as e:
+            errors[name] = str(e)
+            print(f"Could not query collection {name}: {e}")
+            continue
+        timings[name] = seconds
+        for doc_id, relevance in hits:
+            seq += 1
+            entry = (relevance, -seq, name, doc_id)
+            if len(top) < depth:
+                heapq.heappush(top, entry)
+            elif entry > top[0]:
+                heapq.heapreplace(top, entry)
+
+    ranked = [(name, doc_id, relevance) for relevance, _, name, doc_id in sorted(top, reverse=True)]
+    if key is not None and not errors:
+        RESULT_CACHE.put(key, ranked)
+    return {
+        "ranked": ranked,
+        "timings": dict(sorted(timings.items(), key=lambda t: t[1], reverse=True)),
+        "embed_seconds": embed_seconds,
+        "errors": errors,
+        "cached": False
+    }
+
+def hydrate(collections: Sequence[Any], ranked: List[Tuple[str, str, float]]) -> List[Dict[str, Any]]:
+    """Fetch documents and metadata for ranked IDs, keeping rank order (missing IDs are dropped)"""
+    by_name = {c.name: c for c in collections}
+    wanted: Dict[str, List[str]] = {}
+    for name, doc_id, _ in ranked:
+        wanted.setdefault(name, []).append(doc_id)
+
+    fetched = {}
+    for name, ids in wanted.items():
+        data = by_name[name].get(ids=ids, include=["metadatas", "documents"])
+        for i, doc_id in enumerate(data["ids"]):
+            fetched[(name, doc_id)] = (data["documents"][i], data["metadatas"][i])
+
+    results = []
+    for name, doc_id, relevance in ranked:
+        if (name, doc_id) in fetched:
+            document, metadata = fetched[(name, doc_id)]
+            results.append({"id": doc_id, "document": document, "metadata": metadata or {},
+                            "relevance": relevance, "collection": name})
+    return results
+
+def attach_previews(results: List[Dict[str, Any]], query: str, mode: str = "hybrid",
+                    drop_documents: bool = False) -> List[Dict[str, Any]]:
+    """Set "preview" and "highlights" on each hit from its best passage
+
+    Passages are re-scored against the query vector unless the search was lexical,
+    so lexical searches never load the embedding model. With drop_documents, the
+    full text is removed once the preview is built.
+    """
+    use_vectors = mode != "lexical"
+    previews = build_previews([hit["document"] for hit in results], query,
+                              embed=embed_passages if use_vectors else None,
+                              query_embedding=embed_query(query) if use_vectors and results else None)
+    for hit, preview in zip(results, previews):
+        hit["preview"] = preview["snippet"]
+        hit["highlights"] = preview["highlights"]
+        if drop_documents:
+            hit.pop("document", None)
+    return results
+
+def _query_one(collection, embedding: List[float], n_results: int, where: Optional[Dict[str, Any]] = None):
+    started = time.perf_counter()
+    available = collection.count()
+    hits = []
+    if available:
+        search_results = collection.query(
+            query_embeddings=[embedding],
+            n_results=min(n_results, available),
+            where=where,
+            include=["distances"]
+        )
+        if search_results and search_results["ids"]:
+            for i, doc_id in enumerate(search_results["ids"][0]):
+                distance = search_results["distances"][0][i]
+                hits.append((doc_id, 1 - (distance if distance is not None else 1.0)))
+    return hits, time.perf_counter() - started
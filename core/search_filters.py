@@ -0,0 +1,109 @@
+"""
+🔗 Remember - Search Filters
+Structured filters compiled to a Chroma `where` clause, so filtering happens inside the query
+"""
+
+import json
+from datetime import datetime, time as day_time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from core import sidecar
+
+BACKFILL_PAGE_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS created_ts_backfill (
+    collection TEXT PRIMARY KEY,
+    documents  INTEGER NOT NULL
+);
+"""
+
+def created_timestamp(metadata: Dict[str, Any], default: int = 0) -> int:
+    """Epoch seconds from the ISO "created" field -- Chroma range operators only compare numbers
+
+    Without a usable date the document gets `default`: 0 (never "after" any
+    date) for old documents, the import time for new ones.
+    """
+    try:
+        return int(datetime.fromisoformat(str(metadata["created"])).timestamp())
+    except (KeyError, ValueError):
+        return default
+
+def parse_date(value: str, end_of_day: bool = False) -> int:
+    """ISO date or datetime to epoch seconds; a bare date as `before` covers that whole day"""
+    parsed = datetime.fromisoformat(value.strip())
+    if end_of_day and len(value.strip()) <= 10:
+        parsed = datetime.combine(parsed.date(), day_time.max)
+    return int(parsed.timestamp())
+
+def build_where(min_rating: Optional[int] = None, session: Optional[str] = None,
+                project: Optional[str] = None, created_after: Optional[str] = None,
+                created_before: Optional[str] = None, has_analysis: Optional[bool] = None,
+                is_chunk: Optional[bool] = None) -> Optional[Dict[str, Any]]:
+    """Chroma `where` for the given filters, or None when there are none
+
+    Dates are ISO strings. A False flag also matches documents that never had the
+    field (extraction sessions carry no llm_response_saved, unchunked docs no is_chunk).
+    Raises ValueError on an unparseable date.
+    """
+    clauses = []
+    if min_rating is not None:
+        clauses.append({"rating": {"$gte": int(min_rating)}})
+    if session:
+        clauses.append({"session": session})
+    if project:
+        clauses.append({"project": project})
+    if created_after:
+        clauses.append({"created_ts": {"$gte": parse_date(created_after)}})
+    if created_before:
+        clauses.append({"created_ts": {"$lte": parse_date(created_before, end_of_day=True)}})
+    if has_analysis is not None:
+        clauses.append({"llm_response_saved": True} if has_analysis else {"llm_response_saved": {"$ne": True}})
+    if is_chunk is not None:
+        clauses.append({"is_chunk": True} if is_chunk else {"is_chunk": {"$ne": True}})
+
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+def where_key(where: Optional[Dict[str, Any]]) -> str:
+    """Stable cache-key form of a where clause"""
+    return json.dumps(where, sort_keys=True) if where else ""
+
+def uses_dates(where: Optional[Dict[str, Any]]) -> bool:
+    return "created_ts" in where_key(where)
+
+def backfill_created_ts(db_path: Path, collection) -> int:
+    """Stamp created_ts on documents imported before it existed; returns how many were updated
+
+    Runs once per collection size (tracked in the sidecar), and bumps the database
+    version when it changes anything so cached filtered rankings are dropped.
+    """
+    conn = sidecar.connect(db_path, SCHEMA)
+    row = conn.execute("SELECT documents FROM created_ts_backfill WHERE collection = ?",
+                       (collection.name,)).fetchone()
+    count = collection.count()
+    if row and row[0] == count:
+        return 0
+
+    updated, offset = 0, 0
+    while True:
+        page = collection.get(include=["metadatas"], limit=BACKFILL_PAGE_SIZE, offset=offset)
+        if not page["ids"]:
+            break
+        stale = [(doc_id, metadata or {}) for doc_id, metadata in zip(page["ids"], page["metadatas"])
+                 if "created_ts" not in (metadata or {})]
+        if stale:
+            collection.update(ids=[doc_id for doc_id, _ in stale],
+                              metadatas=[{**metadata, "created_ts": created_timestamp(metadata)}
+                                         for _, metadata in stale])
+            updated += len(stale)
+        offset += len(page["ids"])
+
+    conn.execute("INSERT OR REPLACE INTO created_ts_backfill (collection, documents) VALUES (?, ?)",
+                 (collection.name, count))
+    if updated:
+        print(f"🗓️ Added created_ts to {updated} documents in {collection.name}")
+        sidecar.bump_version(db_path)
+    return updated
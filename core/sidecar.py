@@ -0,0 +1,73 @@
+"""
+🔗 Remember - Sidecar Store
+Small SQLite file kept next to each ChromaDB directory for indexes and counters Chroma can't answer cheaply
+"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+SIDECAR_NAME = "remember_sidecar.sqlite3"
+BUSY_TIMEOUT_SECONDS = 300  # writers queue behind an import batch that is still embedding
+
+VERSION_SCHEMA = """
+CREATE TABLE IF NOT EXISTS database_version (
+    id      INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL
+);
+"""
+
+_local = threading.local()
+_schemas_lock = threading.Lock()
+_schemas_applied = set()
+
+def sidecar_path(db_path: Path) -> Path:
+    return Path(db_path) / SIDECAR_NAME
+
+def connect(db_path: Path, schema: str) -> sqlite3.Connection:
+    """This thread's connection to a database's sidecar, with the caller's tables created"""
+    path = sidecar_path(db_path)
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+
+    conn = connections.get(path)
+    if conn is None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(path), timeout=BUSY_TIMEOUT_SECONDS, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(VERSION_SCHEMA)  # every writer may bump the version mid-transaction
+        connections[path] = conn
+
+    key = (path, schema)
+    if key not in _schemas_applied:
+        with _schemas_lock:
+            conn.executescript(schema)
+            _schemas_applied.add(key)
+    return conn
+
+@contextmanager
+def transaction(db_path: Path, schema: str) -> Iterator[sqlite3.Connection]:
+    """BEGIN IMMEDIATE ... COMMIT, rolled back if the block raises"""
+    conn = connect(db_path, schema)
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+def database_version(db_path: Path) -> int:
+    """Bumped by every import and collection create/delete; cache keys include it"""
+    row = connect(db_path, VERSION_SCHEMA).execute("SELECT version FROM database_version WHERE id = 1").fetchone()
+    return row[0] if row else 0
+
+def bump_version(db_path: Path, conn: Optional[sqlite3.Connection] = None):
+    """Invalidate caches keyed on the version; pass conn to bump inside an open transaction"""
+    conn = conn or connect(db_path, VERSION_SCHEMA)
+    conn.execute("INSERT INTO database_version VALUES (1, 1) "
+                 "ON CONFLICT(id) DO UPDATE SET version = version + 1")
@@ -0,0 +1,118 @@
+"""
+🔗 Remember - Snippet Engine
+Pick the passage of a hit that best answers the query (term positions + passage vectors) and highlight it
+"""
+
+import math
+import re
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+PASSAGE_CHARS = 320
+CANDIDATE_PASSAGES = 4  # per document, re-scored with vectors when an embedder is given
+PHRASE_BONUS = 2.0
+VECTOR_WEIGHT = 2.0
+TERM_PATTERN = re.compile(r'\w+', re.UNICODE)
+SENTENCE_END = re.compile(r'(?<=[.!?;:])\s+')
+STOPWORDS = {"the", "and", "for", "that", "with", "this", "from", "are", "was", "what", "how", "does", "under"}
+
+Embedder = Callable[[List[str]], List[List[float]]]
+
+def query_terms(query: str) -> List[str]:
+    terms = [t for t in TERM_PATTERN.findall(query.lower()) if (len(t) > 2 or t.isdigit()) and t not in STOPWORDS]
+    return list(dict.fromkeys(terms))
+
+def split_passages(text: str, size: int = PASSAGE_CHARS) -> List[Tuple[int, int]]:
+    """(start, end) spans of roughly `size` chars, cut at sentence ends where possible"""
+    spans, start = [], 0
+    boundaries = [m.end() for m in SENTENCE_END.finditer(text)] + [len(text)]
+    for boundary in boundaries:
+        while boundary - start > size * 1.5:  # one very long sentence: hard cut at a space
+            cut = text.rfind(" ", start + size // 2, start + size) + 1 or start + size
+            spans.append((start, cut))
+            start = cut
+        if boundary - start >= size or boundary == len(text):
+            if boundary > start:
+                spans.append((start, boundary))
+            start = boundary
+    return spans
+
+def build_previews(documents: Sequence[str], query: str, embed: Optional[Embedder] = None,
+                   query_embedding: Optional[List[float]] = None) -> List[Dict]:
+    """One {"snippet", "highlights", "score"} per document, highlights as [start, end) offsets into the snippet
+
+    All candidate passages across documents go to the embedder in a single call.
+    """
+    terms = query_terms(query)
+    phrase = " ".join(TERM_PATTERN.findall(query.lower()))
+    candidates = []
+    for document in documents:
+        text = " ".join((document or "").split())
+        positions = _term_positions(text, terms)
+        scored = [(_lexical_score(text, span, positions, phrase), span) for span in split_passages(text)]
+        if not scored:
+            candidates.append((text, []))
+            continue
+        top = sorted(scored, key=lambda s: s[0], reverse=True)[:CANDIDATE_PASSAGES] if positions else scored[:1]
+        candidates.append((text, top))
+
+    if embed and query_embedding:
+        flat = [text[span[0]:span[1]] for text, top in candidates for _, span in top]
+        vectors = iter(embed(flat)) if flat else iter(())
+        candidates = [(text, [(score + VECTOR_WEIGHT * _cosine(query_embedding, next(vectors)), span)
+                              for score, span in top]) for text, top in candidates]
+
+    previews = []
+    for text, top in candidates:
+        if not top:
+            previews.append({"snippet": text[:PASSAGE_CHARS], "highlights": [], "score": 0.0})
+            continue
+        score, (start, end) = max(top, key=lambda s: s[0])
+        snippet = ("…" if start else "") + text[start:end].strip() + ("…" if end < len(text) else "")
+        previews.append({"snippet": snippet, "highlights": _highlights(snippet, terms), "score": round(score, 4)})
+    return previews
+
+def render_highlights(snippet: str, highlights: List[List[int]], left: str = "[", right: str = "]") -> str:
+    """Wrap highlighted spans for plain-text output (the CLI)"""
+    out, last = [], 0
+    for start, end in highlights:
+        out.extend([snippet[last:start], left, snippet[start:end], right])
+        last = end
+    out.append(snippet[last:])
+    return "".join(out)
+
+def _term_positions(text: str, terms: List[str]) -> Dict[str, List[int]]:
+    lowered = text.lower()
+    positions = {}
+    for term in terms:
+        found = [m.start() for m in re.finditer(rf'\b{re.escape(term)}\b', lowered)]
+        if found:
+            positions[term] = found
+    return positions
+
+def _lexical_score(text: str, span: Tuple[int, int], positions: Dict[str, List[int]], phrase: str) -> float:
+    """Distinct terms count most (weighted toward terms rare in this document), repeats a little"""
+    start, end = span
+    score = 0.0
+    for term, found in positions.items():
+        hits = sum(1 for p in found if start <= p < end)
+        if hits:
+            score += 1.0 / (1.0 + math.log(len(found))) + 0.1 * (hits - 1)
+    if phrase and " " in phrase and phrase in text[start:end].lower():
+        score += PHRASE_BONUS
+    return score
+
+def _highlights(snippet: str, terms: List[str]) -> List[List[int]]:
+    spans = sorted([m.start(), m.end()] for term in terms
+                   for m in re.finditer(rf'\b{re.escape(term)}\b', snippet, re.IGNORECASE))
+    merged: List[List[int]] = []
+    for span in spans:
+        if merged and span[0] <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], span[1])
+        else:
+            merged.append(span)
+    return merged
+
+def _cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
@@ -0,0 +1,137 @@
+"""
+🔗 Remember - Summarization
+Hierarchical map-reduce over many documents: parallel per-chunk maps, then token-budgeted reduce levels
+"""
+
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from core.context_packing import content_budget, count_tokens, split_tokens, tail_tokens, truncate_tokens
+
+SUMMARY_CONCURRENCY = 4
+# Average reduce fan-in: a group closes after an item whose hash is 0 mod this (or when the budget is full),
+# so boundaries depend on content, not position, and inserting a document only disturbs its own branch
+GROUP_BOUNDARY = 4
+PART_SEPARATOR = "\n\n---DOCUMENT SEPARATOR---\n\n"
+DIGEST_BUDGET_TOKENS = 1500  # progressive analysis carries at most this much prior context per call
+DIGEST_PROMPT = ("Condense these running notes from a document-by-document analysis to at most {words} words. "
+                 "Keep the key facts, parties, dates, amounts and findings that connect documents; drop repetition.")
+
+# summarize(content, system_prompt) -> text or None; blocking, and expected to cache its own responses
+Summarize = Callable[[str, str], Optional[str]]
+
+def _closes_group(text: str) -> bool:
+    return int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:8], 16) % GROUP_BOUNDARY == 0
+
+def group_by_budget(items: List[str], budget: int) -> List[List[str]]:
+    """Consecutive groups whose joined size stays within `budget` tokens"""
+    groups: List[List[str]] = []
+    current: List[str] = []
+    used = 0
+    for item in items:
+        size = count_tokens(item) + count_tokens(PART_SEPARATOR)
+        if current and used + size > budget:
+            groups.append(current)
+            current, used = [], 0
+        current.append(item)
+        used += size
+        if len(current) > 1 and _closes_group(item):
+            groups.append(current)
+            current, used = [], 0
+    if current:
+        groups.append(current)
+    return groups
+
+class TreeSummarizer:
+    """Map every chunk of every document, then reduce level by level until one summary is left
+
+    Each call's input is exactly what its branch depends on, so with a caching
+    summarize() a re-run after adding a document hits the cache everywhere but
+    along that document's path to the root.
+    """
+
+    def __init__(self, summarize: Summarize, map_prompt: str, reduce_prompt: str,
+                 model: str = "default", concurrency: int = SUMMARY_CONCURRENCY):
+        self.summarize = summarize
+        self.map_prompt = map_prompt
+        self.reduce_prompt = reduce_prompt
+        self.concurrency = max(1, concurrency)
+        self.map_budget = content_budget(model, [{"role": "system", "content": map_prompt}])
+        self.reduce_budget = content_budget(model, [{"role": "system", "content": reduce_prompt}])
+        if min(self.map_budget, self.reduce_budget) <= 0:
+            raise ValueError(f"Prompt alone exceeds the request limit of {model}")
+
+    def run(self, documents: List[str]) -> Dict[str, Any]:
+        """{"summary", "levels", "calls", "failed", "chunks", "chunks_missing"}
+
+        summary is None if any call failed: a summary missing a chunk would
+        silently leave part of the collection out.
+        """
+        chunks = [chunk for doc in documents if doc and doc.strip()
+                  for chunk in split_tokens(doc, self.map_budget)]
+        stats = {"levels": 0, "calls": 0, "failed": 0, "chunks": len(chunks), "chunks_missing": 0}
+        print(f"🗺️ Map: {len(chunks)} chunks from {len(documents)} documents")
+        items = self._level(chunks, self.map_prompt, stats)
+        stats["chunks_missing"] = sum(1 for item in items if not item)
+        if stats["chunks_missing"]:
+            return {"summary": None, **stats}
+
+        # Each input is capped at half the budget so every group holds at least two and each level shrinks
+        item_cap = self.reduce_budget // 2 - count_tokens(PART_SEPARATOR)
+        while len(items) > 1:
+            items = [truncate_tokens(item, item_cap) for item in items]
+            groups = group_by_budget(items, self.reduce_budget)
+            print(f"🔻 Reduce level {stats['levels'] + 1}: {len(items)} summaries in {len(groups)} groups")
+            merged = iter(self._level([PART_SEPARATOR.join(group) for group in groups if len(group) > 1],
+                                      self.reduce_prompt, stats))
+            items = [group[0] if len(group) == 1 else next(merged) for group in groups]
+            stats["levels"] += 1
+            if not all(items):
+                # A lost branch would silently drop documents from the summary; stop instead
+                return {"summary": None, **stats}
+
+        return {"summary": items[0] if items else None, **stats}
+
+    def _level(self, inputs: List[str], prompt: str, stats: Dict[str, int]) -> List[Optional[str]]:
+        """summarize() over inputs in parallel, results in input order (failures as None)"""
+        if not inputs:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(inputs)),
+                                thread_name_prefix="remember-summary") as executor:
+            results = list(executor.map(lambda content: self.summarize(content, prompt), inputs))
+        stats["calls"] += len(inputs)
+        stats["failed"] += sum(1 for result in results if not result)
+        return results
+
+class RollingDigest:
+    """Running context for progressive analysis, kept under a fixed token budget
+
+    Each analysis is appended; when the digest would overflow it is
+    re-summarized to about half the budget, so every prompt carries a
+    bounded amount of history however many documents came before.
+    """
+
+    def __init__(self, summarize: Summarize, budget_tokens: int = DIGEST_BUDGET_TOKENS):
+        self.summarize = summarize
+        self.budget = budget_tokens
+        self.text = ""
+        self.compressions = 0
+
+    @property
+    def tokens(self) -> int:
+        return count_tokens(self.text)
+
+    def add(self, entry: str):
+        candidate = f"{self.text}\n\n{entry}".strip()
+        self.text = candidate if count_tokens(candidate) <= self.budget else self._compress(candidate)
+
+    def _compress(self, text: str) -> str:
+        self.compressions += 1
+        print(f"🗜️ Compressing progressive context ({count_tokens(text):,} tokens)")
+        words = self.budget * 3 // 8  # ~0.75 words per token, aiming at half the budget
+        digest = self.summarize(text, DIGEST_PROMPT.format(words=words))
+        if digest:
+            return truncate_tokens(digest, self.budget)
+        # Summarizing failed: keep the newest notes rather than grow past the budget
+        return tail_tokens(text, self.budget)
@@ -5,68 +5,146 @@ Extracts content from URLs and saves in Remember-compatible format
 """
 
 import sys
+import argparse
 import asyncio
 import aiohttp
-import json
 from pathlib import Path
 from datetime import datetime
+from urllib.parse import urlparse
+import re
 import time
-from bs4 import BeautifulSoup
-from readability import Document
-import tiktoken
 
-async def extract_url_content(session, url):
-    """Extract content from a single URL."""
+sys.path.insert(0, str(Path(__file__).parent.absolute()))
+
+from core.checkpoint import SessionCheckpoint
+from core.http_cache import HttpCache
+from core.parsing import ParsePool, parse_article
+
+DEFAULT_CONCURRENCY = 1
+DEFAULT_DOMAIN_DELAY = 1.0
+DNS_CACHE_TTL = 300
+
+async def extract_url_content(session, parse_pool, url, cache=None, refresh=False):
+    """Download a single URL and hand the raw body to the parse pool."""
     try:
         print(f"🔗 Extracting: {url}")
         
-        async with session.get(url, timeout=30) as response:
-            if response.status == 200:
-                content = await response.text()
-                
-                # Use readability to extract main content
-                doc = Document(content)
-                title = doc.title() or "Untitled"  # Ensure title is never None
-                main_content = doc.summary() or content  # Fallback to raw content if summary fails
-                
-                # Clean up the content with BeautifulSoup
-                soup = BeautifulSoup(main_content, 'html.parser')
-                clean_text = soup.get_text() or "No content extracted"  # Ensure content is never empty
-                
-                # Estimate token count
-                try:
-                    encoding = tiktoken.encoding_for_model("gpt-3.5-turbo")
-                    token_count = len(encoding.encode(clean_text))
-                except:
-                    token_count = len(clean_text.split()) * 1.3  # Rough estimate
-                
-                return {
-                    "url": url,
-                    "title": title,
-                    "content": clean_text,
-                    "html_content": main_content,
-                    "character_count": len(clean_text),
-                    "token_count": int(token_count),
-                    "rating": 3,  # Default rating
-                    "extracted_at": datetime.now().isoformat(),
-                    "status": "success"
-                }
-            else:
-                print(f"❌ HTTP {response.status} for {url}")
-                return {"url": url, "status": "failed", "error": f"HTTP {response.status}"}
+        cached = cache.lookup(url) if cache and not refresh else None
+        headers = cache.conditional_headers(cached) if cached else {}
+        
+        status, body, charset, response_headers = await _download(session, url, headers)
+        if status != 200 and not (status == 304 and cached):
+            print(f"❌ HTTP {status} for {url}")
+            return {"url": url, "status": "failed", "error": f"HTTP {status}"}
+        
+        parsed = None
+        if body is None:
+            # Not modified: reuse the parsed text, or re-parse the cached body if needed
+            print(f"♻️ Not modified, using cached copy: {url}")
+            cache.mark_validated(url)
+            parsed = cache.load_parsed(url, parse_article.__name__)
+            if parsed is None:
+                body = await asyncio.to_thread(cache.load_body, url)
+                if body is not None:
+                    charset = _charset(cached.get("content_type", ""))
+                else:
+                    # Pruned since it was validated: fetch the page in full instead
+                    print(f"♻️ Cached body missing, downloading again: {url}")
+                    status, body, charset, response_headers = await _download(session, url)
+                    if status != 200:
+                        print(f"❌ HTTP {status} for {url}")
+                        return {"url": url, "status": "failed", "error": f"HTTP {status}"}
+        
+        if parsed is None:
+            # Readability, BeautifulSoup and token counting run in a worker process
+            parsed = await parse_pool.run(parse_article, body, charset)
+            if cache:
+                await asyncio.to_thread(cache.store, url, parse_article.__name__, parsed, response_headers,
+                                        body if response_headers else None)
+        
+        return {
+            "url": url,
+            "title": parsed["title"],
+            "content": parsed["content"],
+            "html_content": parsed["html_content"],
+            "character_count": len(parsed["content"]),
+            "token_count": int(parsed["token_count"]),
+            "rating": 3,  # Default rating
+            "extracted_at": datetime.now().isoformat(),
+            "status": "success"
+        }
                 
     except Exception as e:
         print(f"❌ Error extracting {url}: {e}")
         return {"url": url, "status": "failed", "error": str(e)}
 
+async def _download(session, url, headers=None):
+    """(status, body, charset, headers); everything but the status is None unless it's a 200"""
+    async with session.get(url, timeout=30, headers=headers or {}) as response:
+        if response.status != 200:
+            return response.status, None, None, None
+        return response.status, await response.read(), response.charset, dict(response.headers)
+
+def _charset(content_type: str):
+    """Charset parameter of a Content-Type header, if any."""
+    for param in content_type.split(';')[1:]:
+        key, _, value = param.strip().partition('=')
+        if key.lower() == 'charset' and value:
+            return value.strip('"\' ')
+    return None
+
+class DomainRateLimiter:
+    """Spaces out request starts per domain so concurrency never hammers a single site."""
+    
+    def __init__(self, delay: float):
+        self.delay = max(0.0, delay)
+        self._next_start = {}
+    
+    async def wait(self, url: str):
+        domain = urlparse(url).netloc.lower()
+        now = asyncio.get_running_loop().time()
+        start = max(now, self._next_start.get(domain, 0.0))
+        self._next_start[domain] = start + self.delay
+        if start > now:
+            await asyncio.sleep(start - now)
+
+def write_markdown(session_dir: Path, index: int, result: dict) -> Path:
+    """Write one extracted page; numbering follows the URL's position in the input file."""
+    md_filename = f"extracted_{index:03d}_{result['title'][:50].replace('/', '_').replace(':', '_')}.md"
+    md_file = session_dir / md_filename
+    
+    with open(md_file, 'w', encoding='utf-8') as f:
+        f.write(f"# {result['title']}\n\n")
+        f.write(f"**URL:** [{result['url']}]({result['url']})\n")
+        f.write(f"**Extracted:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        f.write(f"**Characters:** {result['character_count']:,}\n")
+        f.write(f"**Tokens:** ~{result['token_count']:,}\n")
+        f.write(f"**Rating:** {'⭐' * result['rating']}\n\n")
+        f.write("---\n\n")
+        f.write(result['content'])
+    
+    return md_file
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Extract content from URLs and save in Remember-compatible format",
+        epilog="Example: python extract_urls.py /home/flintx/remember/urls.txt --concurrency 16")
+    parser.add_argument("urls_file", help="path to a urls.txt file (one URL per line, # for comments)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"URLs in flight at once (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--domain-delay", type=float, default=DEFAULT_DOMAIN_DELAY,
+                        help=f"seconds between requests to the same domain (default: {DEFAULT_DOMAIN_DELAY})")
+    parser.add_argument("--resume", metavar="SESSION",
+                        help="continue session_<timestamp>: skip URLs that succeeded, retry failures")
+    parser.add_argument("--refresh", action="store_true",
+                        help="ignore the HTTP cache and re-download every URL")
+    return parser.parse_args()
+
 async def main():
     """Main extraction function."""
-    if len(sys.argv) != 2:
-        print("Usage: python extract_urls.py <path_to_urls.txt>")
-        print("Example: python extract_urls.py /home/flintx/remember/urls.txt")
-        sys.exit(1)
-    
-    urls_file = Path(sys.argv[1])
+    args = parse_args()
+    concurrency = max(1, args.concurrency)
+    urls_file = Path(args.urls_file)
     
     if not urls_file.exists():
         print(f"❌ URLs file not found: {urls_file}")
@@ -80,82 +158,101 @@ async def main():
         print("❌ No URLs found in file")
         sys.exit(1)
     
-    print(f"📋 Found {len(urls)} URLs to extract")
+    print(f"📋 Found {len(urls)} URLs to extract ({concurrency} at a time)")
     
     # Create output directories
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     extractions_dir = Path.home() / "remember" / "extractions"
     extractions_dir.mkdir(exist_ok=True)
     
+    if args.resume:
+        match = re.search(r'(\d{8}_\d{6})', args.resume)
+        timestamp = match.group(1) if match else None
+        if not timestamp or not (extractions_dir / f"session_{timestamp}" / "checkpoint.jsonl").exists():
+            print(f"❌ No checkpoint found for session: {args.resume}")
+            sys.exit(1)
+    else:
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    
     session_dir = extractions_dir / f"session_{timestamp}"
     session_dir.mkdir(exist_ok=True)
     
     # Output files
     json_file = extractions_dir / f"extraction_{timestamp}.json"
+    checkpoint = SessionCheckpoint(session_dir / "checkpoint.jsonl")
+    
+    # On resume, URLs that already succeeded are skipped; earlier failures are retried
+    done = checkpoint.succeeded_urls()
+    todo = [(i, url) for i, url in enumerate(urls, 1) if url not in done]
+    if args.resume:
+        print(f"♻️ Resuming session_{timestamp}: {len(done)} done, {len(todo)} to go")
+    
+    counts = {"successful": 0, "failed": 0}
+    started = time.time()
+    
+    def record(i: int, result: dict):
+        """Persist a finished URL right away: markdown file plus a checkpoint line."""
+        if result["status"] != "success":
+            counts["failed"] += 1
+            checkpoint.record(i, result["url"], None, result.get("error", ""))
+            print(f"❌ [{i}/{len(urls)}] Failed: {result.get('error', 'Unknown error')}")
+            return
+        
+        try:
+            md_file = write_markdown(session_dir, i, result)
+        except OSError as e:
+            counts["failed"] += 1
+            checkpoint.record(i, result["url"], None, f"Could not write markdown: {e}")
+            print(f"❌ [{i}/{len(urls)}] Could not write markdown: {e}")
+            return
+        
+        counts["successful"] += 1
+        checkpoint.record(i, result["url"], {
+            "url": result["url"],
+            "title": result["title"],
+            "content": result["content"],
+            "markdown_file": str(md_file),
+            "rating": result["rating"],
+            "extracted_at": result["extracted_at"]
+        })
+        
+        print(f"✅ [{i}/{len(urls)}] Extracted: {result['title'][:60]}...")
+        print(f"   📊 {result['character_count']:,} chars, ~{result['token_count']:,} tokens")
+        print(f"   📄 Saved to: {md_file.name}")
+    
+    cache = HttpCache()
+    semaphore = asyncio.Semaphore(concurrency)
+    rate_limiter = DomainRateLimiter(args.domain_delay)
     
-    extraction_results = []
-    successful = 0
-    failed = 0
+    async def process_url(i: int, url: str):
+        # The domain slot is reserved only once a concurrency slot is held: reserved earlier,
+        # same-domain tasks whose turns passed while queued would all start back to back
+        async with semaphore:
+            await rate_limiter.wait(url)
+            result = await extract_url_content(session, parse_pool, url, cache, args.refresh)
+        record(i, result)
     
     # Extract content
-    async with aiohttp.ClientSession() as session:
-        for i, url in enumerate(urls, 1):
-            print(f"\n[{i}/{len(urls)}] Processing {url}")
-            
-            result = await extract_url_content(session, url)
-            extraction_results.append(result)
-            
-            if result["status"] == "success":
-                successful += 1
-                
-                # Create individual markdown file
-                md_filename = f"extracted_{i:03d}_{result['title'][:50].replace('/', '_').replace(':', '_')}.md"
-                md_file = session_dir / md_filename
-                
-                with open(md_file, 'w', encoding='utf-8') as f:
-                    f.write(f"# {result['title']}\n\n")
-                    f.write(f"**URL:** [{result['url']}]({result['url']})\n")
-                    f.write(f"**Extracted:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                    f.write(f"**Characters:** {result['character_count']:,}\n")
-                    f.write(f"**Tokens:** ~{result['token_count']:,}\n")
-                    f.write(f"**Rating:** {'⭐' * result['rating']}\n\n")
-                    f.write("---\n\n")
-                    f.write(result['content'])
-                
-                # Update result with markdown file path for Remember import
-                result["markdown_file"] = str(md_file)
-                
-                print(f"✅ Extracted: {result['title'][:60]}...")
-                print(f"   📊 {result['character_count']:,} chars, ~{result['token_count']:,} tokens")
-                print(f"   📄 Saved to: {md_file.name}")
-                
-            else:
-                failed += 1
-                print(f"❌ Failed: {result.get('error', 'Unknown error')}")
-            
-            # Small delay between requests
-            await asyncio.sleep(1)
-    
-    # Save JSON file for Remember import
-    remember_format = []
-    for result in extraction_results:
-        if result["status"] == "success":
-            remember_format.append({
-                "url": result["url"],
-                "title": result["title"],
-                "content": result["content"],
-                "markdown_file": result["markdown_file"],
-                "rating": result["rating"],
-                "extracted_at": result["extracted_at"]
-            })
-    
-    with open(json_file, 'w', encoding='utf-8') as f:
-        json.dump(remember_format, f, indent=2)
+    connector = aiohttp.TCPConnector(limit=concurrency, ttl_dns_cache=DNS_CACHE_TTL)
+    try:
+        with ParsePool() as parse_pool:
+            async with aiohttp.ClientSession(connector=connector) as session:
+                async with asyncio.TaskGroup() as tasks:
+                    for i, url in todo:
+                        tasks.create_task(process_url(i, url))
+    finally:
+        # Assembled by streaming the checkpoint, so results never pile up in memory
+        json_count = checkpoint.write_json(json_file)
+        cache.prune()
+    
+    elapsed = max(time.time() - started, 1e-6)
     
     # Results summary
     print(f"\n🎉 Extraction Complete!")
-    print(f"📊 Results: {successful} successful, {failed} failed out of {len(urls)} total")
-    print(f"💾 JSON saved to: {json_file}")
+    print(f"📊 Results: {counts['successful']} successful, {counts['failed']} failed out of {len(todo)} attempted")
+    print(f"⏱️ Elapsed: {elapsed:.1f}s ({len(todo) / elapsed:.2f} URLs/sec)")
+    print(f"💾 JSON saved to: {json_file} ({json_count} of {len(urls)} URLs)")
+    if counts['failed']:
+        print(f"🔁 Retry failures: python extract_urls.py {urls_file} --resume session_{timestamp}")
     print(f"📁 Markdown files in: {session_dir}")
     print(f"\n📥 To import into Remember:")
     print(f"   1. Switch to Projects mode")
@@ -8,13 +8,14 @@ import sys
 import os
 import asyncio
 from pathlib import Path
-from fastapi import FastAPI, HTTPException, Query, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Query, BackgroundTasks, Request
 from fastapi.responses import HTMLResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import uvicorn
 import json
-from typing import List, Dict, Optional, Any
+import base64
+from typing import List, Dict, Optional, Any, Tuple
 from datetime import datetime
 import chromadb
 import logging
@@ -33,22 +34,18 @@ from rich.panel import Panel
 from rich import print as rprint
 import inquirer
 
-# Model context limits (in tokens) - Using CONTEXT WINDOW for chunking
-MODEL_CONTEXT_LIMITS = {
-    "moonshotai/kimi-k2-instruct": 131072,
-    "meta-llama/llama-4-scout-17b-16e-instruct": 131072,
-    "meta-llama/llama-4-maverick-17b-128e-instruct": 131072,
-    "deepseek-r1-distill-llama-70b": 131072,
-    "llama-3.3-70b-versatile": 131072,
-    "llama-3.1-8b-instant": 131072,
-    "gemma2-9b-it": 8192,
-    "compound-beta": 131072,
-    "compound-beta-mini": 131072,
-    "default": 8192  # Safe fallback
-}
-
-# Reserve tokens for system prompt, user prompt, and response generation
-TOKENS_RESERVED = 2000
+# Finished documents listed in the batch overlay
+BATCH_RECENT_DOCS = 15
+
+# URLs extract_urls.py keeps in flight when building a new database
+EXTRACTION_CONCURRENCY = 16
+
+# /api/search paging: ranking depth is fixed so every page reuses one cached ranking
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_PAGE_SIZE = 100
+SEARCH_DEPTH = 500
+SEARCH_STREAM_CHUNK = 10
+ANALYSIS_COLLECTIONS = {"llm_responses", "analyses"}
 
 # Global variable to store selected database
 SELECTED_DATABASE = None
@@ -77,15 +74,13 @@ def check_database_status(db_dir_name: str):
     if chroma_db.exists() or collections_dir.exists():
         try:
             # Try to connect and get collection count
-            client = chromadb.PersistentClient(path=str(db_path))
+            client = get_client(db_dir_name)
             collections = client.list_collections()
             doc_count = 0
             
             for collection_info in collections:
                 try:
-                    collection = client.get_collection(collection_info.name)
-                    all_data = collection.get()
-                    doc_count += len(all_data["ids"]) if all_data["ids"] else 0
+                    doc_count += client.get_collection(collection_info.name).count()
                 except:
                     continue
             
@@ -250,7 +245,8 @@ def create_new_database():
         
         try:
             result = subprocess.run([
-                sys.executable, str(extract_script), str(new_url_filepath)
+                sys.executable, str(extract_script), str(new_url_filepath),
+                "--concurrency", str(EXTRACTION_CONCURRENCY)
             ], capture_output=True, text=True, cwd=Path.home() / "remember")
             
             if result.returncode == 0:
@@ -362,7 +358,7 @@ def create_database_for_directory(db_name: str):
         db_path.mkdir(parents=True, exist_ok=True)
         
         # Create ChromaDB client for this specific directory
-        client = chromadb.PersistentClient(path=str(db_path))
+        client = get_client(db_name)
         
         # Create a main collection for this legal topic
         collection_name = f"documents_{db_name}"
@@ -464,8 +460,20 @@ def select_database():
 sys.path.insert(0, str(Path(__file__).parent.absolute()))
 
 try:
-    from groq_client import GroqClient
-    from core.database import get_client, import_extraction_session, get_or_create_collection, import_to_project
+    from core.database import get_client, import_extraction_session, get_or_create_collection, import_to_project, import_records, collection_stats
+    from core.json_stream import peek_json_record
+    from core.database import database_path, DB_ROOT
+    from core.search import SEARCH_MODES, rank_documents, hydrate, attach_previews
+    from core.search_filters import build_where, uses_dates, backfill_created_ts
+    from core.llm_scheduler import ANALYSIS_CONCURRENCY, LLMScheduler, estimate_tokens
+    from core.job_store import JobStore
+    from core.progress_feed import ProgressFeed, SSE_HEARTBEAT, sse_message
+    from core.llm_cache import cache_key, get_llm_cache
+    from core.context_packing import (MODEL_CONTEXT_LIMITS, TOKENS_RESERVED, content_budget, pack_document,
+                                      truncate_tokens)
+    from core.sidecar import database_version
+    from core.rollups import AnalyzedSources
+    from core.llm_client import get_groq_client, warm_up
     from commands.legal_handler import LegalHandler
     from mcp_server import get_mcp_tools, execute_mcp_tool
 except ImportError as e:
@@ -480,23 +488,15 @@ app = FastAPI(title="Remember - Legal AI War Room", version="1.0.0")
 app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
 
 # Initialize Remember system
-groq_client = GroqClient()
+groq_client = get_groq_client()  # shared with legal_handler; REMEMBER_GROQ_WARMUP=1 probes it at startup
+if groq_client is None:
+    print("❌ Groq client initialization failed - check .env file and groq_client.py in ~/remember/")
+    sys.exit(1)
 legal_handler = LegalHandler()
 
-# Global batch processing state
-batch_state = {
-    "active": False,
-    "total_docs": 0,
-    "current_index": 0,
-    "processed_docs": [],
-    "current_doc": "",
-    "success_count": 0,
-    "failed_count": 0,
-    "start_time": None,
-    "current_model": "",
-    "selected_contexts": [],
-    "analysis_results": []
-}
+# Live state of batch jobs started by this process, by job ID ("latest" aliases the newest);
+# everything durable -- tasks, attempts, results -- lives in each database's JobStore
+batch_jobs: Dict[str, Dict[str, Any]] = {}
 
 # Setup logging
 logs_dir = Path.home() / "remember" / "llm_logs"
@@ -529,6 +529,7 @@ def log_llm_interaction(interaction_type: str, data: Any, session_id: str = None
     
     with open(session_log, 'a', encoding='utf-8') as f:
         f.write(f"{json.dumps(log_entry, indent=2)}\n{'='*80}\n")
+    return session_id
 
 @app.get("/", response_class=HTMLResponse)
 async def serve_remember_ui():
@@ -963,7 +964,9 @@ async def serve_remember_ui():
     <script>
         let currentDatabase = null;
         let selectedFiles = [];
-        let batchInterval = null;
+        let batchEvents = null;
+        let batchView = null;
+        let batchJobId = null;
         
         // Initialize app
         document.addEventListener('DOMContentLoaded', function() {
@@ -1177,6 +1180,7 @@ async def serve_remember_ui():
             modalHtml += '<div style="margin-bottom: 20px;"><strong style="color: #00ff00;">Edit Custom Prompt:</strong><textarea id="batch-prompt-editor" style="width: 100%; height: 100px; background: #333; color: #00ff00; border: 1px solid #555; padding: 10px; border-radius: 4px; font-family: inherit; font-size: 12px; margin-top: 5px; resize: vertical;">' + prompt + '</textarea></div>';
             modalHtml += '<div style="margin-bottom: 20px;"><strong style="color: #00ff00;">System Message Preview (Master Context):</strong><pre style="background: #2a2a2a; color: #ccc; padding: 10px; border-radius: 4px; margin-top: 5px; font-size: 10px; max-height: 150px; overflow-y: auto; white-space: pre-wrap;">' + masterContextContent.trim() + '</pre></div>';
             modalHtml += '<div style="margin-bottom: 20px;"><strong style="color: #00ff00;">User Message Template (What LLM Will Receive):</strong><pre id="llm-message-preview" style="background: #2a2a2a; color: #00ff00; padding: 10px; border-radius: 4px; margin-top: 5px; font-size: 10px; max-height: 120px; overflow-y: auto; white-space: pre-wrap;"></pre></div>';
+            modalHtml += '<div style="margin-bottom: 20px;"><label style="color: #ccc; font-size: 12px; cursor: pointer;"><input type="checkbox" id="batch-use-cache" checked style="margin-right: 6px;">⚡ Reuse cached answers for documents already analyzed with this exact prompt and model</label></div>';
             modalHtml += '<div style="text-align: center;"><button onclick="confirmBatchAnalysis()" style="padding: 10px 20px; background: #00aa00; color: white; border: none; border-radius: 4px; cursor: pointer; margin-right: 10px;">🚀 Start Analysis</button>';
             modalHtml += '<button onclick="closeBatchConfirmation()" style="padding: 10px 20px; background: #666; color: white; border: none; border-radius: 4px; cursor: pointer;">Cancel</button></div></div>';
             modal.innerHTML = modalHtml;
@@ -1216,6 +1220,7 @@ async def serve_remember_ui():
         async function confirmBatchAnalysis() {
             // Get the edited prompt from the textarea
             const editedPrompt = document.getElementById('batch-prompt-editor').value.trim() || '';
+            const useCache = document.getElementById('batch-use-cache').checked;
             
             // Update the main input field with the edited prompt
             document.getElementById('user-input').value = editedPrompt;
@@ -1236,12 +1241,14 @@ async def serve_remember_ui():
                         provider: document.getElementById('provider-select').value,
                         master_contexts: getSelectedMasterContexts(),
                         prompt: editedPrompt,
-                        reanalyze_files: getReAnalysisFiles()
+                        reanalyze_files: getReAnalysisFiles(),
+                        use_cache: useCache
                     })
                 });
                 
                 const data = await response.json();
                 if (data.success) {
+                    batchJobId = data.job_id;
                     startBatchTracking();
                 } else {
                     alert('Error: ' + data.error);
@@ -1255,71 +1262,89 @@ async def serve_remember_ui():
         }
         
         function startBatchTracking() {
-            batchInterval = setInterval(updateBatchProgress, 1000);
-        }
-        
-        async function updateBatchProgress() {
-            try {
-                const response = await fetch('/api/batch_progress');
-                const progress = await response.json();
+            // Server-Sent Events: one snapshot, then only what changed; EventSource
+            // reconnects on its own and resumes from the last event it saw
+            batchEvents = new EventSource('/api/batch_events?job_id=' + batchJobId);
+            batchEvents.addEventListener('snapshot', function(e) {
+                batchView = JSON.parse(e.data);
+                renderBatchProgress();
+            });
+            batchEvents.addEventListener('started', function(e) {
+                const data = JSON.parse(e.data);
+                batchView.current_doc = data.title;
+                batchView.progress.in_flight = data.in_flight;
+                renderBatchProgress();
+            });
+            batchEvents.addEventListener('finished', function(e) {
+                const data = JSON.parse(e.data);
+                batchView.progress = data.progress;
+                batchView.recent.push(data.doc);
+                if (batchView.recent.length > 15) batchView.recent.shift();
+                renderBatchProgress();
+            });
+            batchEvents.addEventListener('end', async function(e) {
+                const data = JSON.parse(e.data);
+                stopBatchTracking();
+                hideBatchOverlay();
                 
-                if (!progress.active) {
-                    clearInterval(batchInterval);
-                    hideBatchOverlay();
-                    
-                    addMessage('system', '✅ Batch analysis completed!');
+                const progress = data.progress || (batchView && batchView.progress);
+                addMessage('system', data.status === 'completed' ? '✅ Batch analysis completed!' : '⏹️ Batch analysis ' + data.status);
+                if (progress) {
                     addMessage('system', '📊 Results: ' + progress.success_count + '/' + progress.total_docs + ' successful');
-                    
-                    await loadFiles(); // Refresh file list
-                    return;
                 }
                 
-                // Update progress display
-                const percentage = Math.round((progress.current_index / progress.total_docs) * 100);
-                
-                document.getElementById('batch-current').textContent = progress.current_index;
-                document.getElementById('batch-total').textContent = progress.total_docs;
-                document.getElementById('batch-success').textContent = progress.success_count;
-                document.getElementById('batch-failed').textContent = progress.failed_count;
-                
-                document.getElementById('current-doc-text').textContent = progress.current_doc || 'Processing...';
-                document.getElementById('batch-progress-bar').style.width = percentage + '%';
-                document.getElementById('batch-progress-text').textContent = percentage + '%';
-                
-                // Update model and contexts display
-                document.getElementById('batch-model').textContent = progress.current_model || 'Unknown';
-                document.getElementById('batch-contexts').textContent = progress.selected_contexts && progress.selected_contexts.length > 0 
-                    ? progress.selected_contexts.join(', ') 
-                    : 'Default Legal Analysis';
-                
-                // Update recent documents list
-                updateRecentDocsList(progress.processed_docs);
-                
-                // Update time stats
-                const elapsed = Math.floor((Date.now() - progress.start_time) / 1000);
-                document.getElementById('batch-elapsed').textContent = elapsed + 's';
-                document.getElementById('batch-saved').textContent = progress.success_count;
-                
-                // Calculate ETA
-                if (progress.current_index > 0) {
-                    const avgTimePerDoc = elapsed / progress.current_index;
-                    const remaining = progress.total_docs - progress.current_index;
-                    const etaSeconds = Math.round(avgTimePerDoc * remaining);
-                    document.getElementById('batch-eta').textContent = etaSeconds + 's';
-                }
-                
-            } catch (error) {
-                console.error('Error updating batch progress:', error);
+                await loadFiles(); // Refresh file list
+            });
+        }
+        
+        function stopBatchTracking() {
+            if (batchEvents) {
+                batchEvents.close();
+                batchEvents = null;
+            }
+        }
+        
+        function renderBatchProgress() {
+            const progress = batchView.progress;
+            
+            // Update progress display
+            const percentage = progress.total_docs ? Math.round((progress.current_index / progress.total_docs) * 100) : 0;
+            
+            document.getElementById('batch-current').textContent = progress.current_index;
+            document.getElementById('batch-total').textContent = progress.total_docs;
+            document.getElementById('batch-success').textContent = progress.success_count;
+            document.getElementById('batch-failed').textContent = progress.failed_count;
+            
+            document.getElementById('current-doc-text').textContent = (batchView.current_doc || 'Processing...') +
+                (progress.in_flight > 1 ? ' (+' + (progress.in_flight - 1) + ' more in flight)' : '');
+            document.getElementById('batch-progress-bar').style.width = percentage + '%';
+            document.getElementById('batch-progress-text').textContent = percentage + '%';
+            
+            // Update model and contexts display
+            document.getElementById('batch-model').textContent = batchView.current_model || 'Unknown';
+            document.getElementById('batch-contexts').textContent = batchView.selected_contexts && batchView.selected_contexts.length > 0 
+                ? batchView.selected_contexts.join(', ') 
+                : 'Default Legal Analysis';
+            
+            // Update recent documents list
+            updateRecentDocsList(batchView.recent, progress.current_index);
+            
+            // Update time stats (server-side throughput, so resumed jobs estimate correctly)
+            document.getElementById('batch-elapsed').textContent = progress.elapsed_seconds + 's' +
+                (progress.docs_per_minute ? ' · ' + progress.docs_per_minute + ' docs/min' : '') +
+                ' · ' + progress.tokens_used.toLocaleString() + ' tokens' +
+                (progress.cache_hits ? ' · ' + progress.cache_hits + ' cached' : '');
+            document.getElementById('batch-saved').textContent = progress.success_count;
+            if (progress.eta_seconds !== null) {
+                document.getElementById('batch-eta').textContent = progress.eta_seconds + 's';
             }
         }
         
-        function updateRecentDocsList(processedDocs) {
+        function updateRecentDocsList(recent, finishedCount) {
             const recentList = document.getElementById('recent-docs-list');
             const moreCount = document.getElementById('more-docs-count');
             
-            // Show last 15 documents
-            const recent = processedDocs.slice(-15);
-            const older = processedDocs.length - recent.length;
+            const older = finishedCount - recent.length;
             
             recentList.innerHTML = '';
             recent.forEach(doc => {
@@ -1344,8 +1369,8 @@ async def serve_remember_ui():
         
         function cancelBatch() {
             if (confirm('Are you sure you want to cancel the batch analysis?')) {
-                fetch('/api/cancel_batch', { method: 'POST' });
-                clearInterval(batchInterval);
+                fetch('/api/cancel_batch' + (batchJobId ? '?job_id=' + batchJobId : ''), { method: 'POST' });
+                stopBatchTracking();
                 hideBatchOverlay();
                 addMessage('system', '❌ Batch analysis cancelled');
             }
@@ -1775,15 +1800,30 @@ async def serve_remember_ui():
             
             try {
                 const response = await fetch('/api/search?query=' + encodeURIComponent(query) + '&database=' + currentDatabase);
-                const results = await response.json();
+                const data = await response.json();
+                if (!response.ok) throw new Error(data.detail || response.statusText);
                 
-                addMessage('system', '🔍 Found ' + results.length + ' documents matching "' + query + '"');
+                addMessage('system', '🔍 Top ' + data.results.length + ' of ' + data.total_ranked + ' documents matching "' + query + '"');
+                data.results.slice(0, 5).forEach(function(hit) {
+                    addMessage('system', '📄 ' + hit.title + ' (' + hit.id + ')\n' + markHighlights(hit.snippet, hit.highlights));
+                });
                 
             } catch (error) {
                 addMessage('system', '❌ Search error: ' + error.message);
             }
         }
         
+        function markHighlights(snippet, highlights) {
+            // Offsets are code points (server side); Array.from keeps emoji from shifting them
+            const chars = Array.from(snippet);
+            let out = '', last = 0;
+            (highlights || []).forEach(function(span) {
+                out += chars.slice(last, span[0]).join('') + '«' + chars.slice(span[0], span[1]).join('') + '»';
+                last = span[1];
+            });
+            return out + chars.slice(last).join('');
+        }
+        
         async function refreshFiles() {
             if (currentDatabase) {
                 await loadFiles();
@@ -1990,6 +2030,10 @@ async def debug_database_status():
 @app.get("/api/databases")
 async def get_databases():
     """Get available databases"""
+    # Chroma and sidecar reads throughout; keep them off the event loop
+    return await asyncio.to_thread(_database_listing)
+
+def _database_listing() -> List[Dict[str, Any]]:
     try:
         if SELECTED_DATABASE:
             # Return the selected database info
@@ -2033,15 +2077,15 @@ async def get_databases():
         client = get_client(SELECTED_DATABASE)
         collections = client.list_collections()
         
-        total_docs = 0
+        total_docs, total_tokens, total_analyzed = 0, 0, 0
         for collection in collections:
             try:
-                # Get collection and count documents
-                coll = client.get_collection(collection.name)
-                result = coll.get()
-                count = len(result['ids']) if result['ids'] else 0
-                total_docs += count
-                logger.info(f"Collection {collection.name}: {count} documents")
+                # Native count plus sidecar rollups -- never pages through the documents
+                rollup = collection_stats(client.get_collection(collection.name), SELECTED_DATABASE)
+                total_docs += rollup["documents"]
+                total_tokens += rollup["tokens"]
+                total_analyzed += rollup["analyzed"]  # CLI project docs with a saved LLM response
+                logger.info(f"Collection {collection.name}: {rollup['documents']} documents")
             except Exception as e:
                 logger.error(f"Error counting documents in {collection.name}: {e}")
                 continue
@@ -2050,7 +2094,9 @@ async def get_databases():
         databases = [{
             "name": SELECTED_DATABASE,
             "collections": len(collections),
-            "documents": total_docs
+            "documents": total_docs,
+            "tokens": total_tokens,
+            "analyzed": total_analyzed + _analyzed_sources(client).count()
         }]
         
         logger.info(f"Returning database info: {databases}")
@@ -2095,23 +2141,8 @@ async def get_files_with_analysis_status(database_name: str):
         # Get all documents
         results = collection.get(include=['documents', 'metadatas'])
         
-        # Check for analysis collection
-        analysis_collection = None
-        try:
-            analysis_collection = client.get_collection("llm_responses")
-        except:
-            pass
-        
         # Get list of analyzed document IDs
-        analyzed_ids = set()
-        if analysis_collection:
-            try:
-                analysis_results = analysis_collection.get(include=['metadatas'])
-                for metadata in analysis_results['metadatas']:
-                    if metadata and 'source_document_id' in metadata:
-                        analyzed_ids.add(metadata['source_document_id'])
-            except:
-                pass
+        analyzed_ids = _analyzed_source_ids(client)
         
         files = []
         for i, doc_id in enumerate(results['ids']):
@@ -2130,6 +2161,13 @@ async def get_files_with_analysis_status(database_name: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _analyzed_sources(client) -> AnalyzedSources:
+    """Source documents with an analysis in any of the database's analysis collections (sidecar-backed)"""
+    return AnalyzedSources(client.path, client, ANALYSIS_COLLECTIONS)
+
+def _analyzed_source_ids(client) -> set:
+    return _analyzed_sources(client).ids()
+
 @app.get("/api/master_contexts")
 async def get_master_contexts():
     """Get master context files from selected database directory"""
@@ -2167,6 +2205,8 @@ class BatchAnalysisRequest(BaseModel):
     prompt: str = ""
     master_contexts: List[str] = []
     reanalyze_files: List[str] = []
+    concurrency: int = ANALYSIS_CONCURRENCY
+    use_cache: bool = True  # False re-asks the model even when an identical request was answered before
 
 class ChunkDocumentsRequest(BaseModel):
     database: str
@@ -2174,203 +2214,309 @@ class ChunkDocumentsRequest(BaseModel):
 
 @app.post("/api/start_batch_analysis")
 async def start_batch_analysis(request: BatchAnalysisRequest):
-    """Start batch analysis process"""
+    """Queue a batch analysis job in the database's job store and start working it"""
     try:
-        # Reset batch state
-        batch_state.update({
-            "active": True,
-            "total_docs": 0,
-            "current_index": 0,
-            "processed_docs": [],
-            "current_doc": "",
-            "success_count": 0,
-            "failed_count": 0,
-            "start_time": time.time(),
-            "current_model": request.provider,
-            "selected_contexts": request.master_contexts,
-            "analysis_results": []
-        })
-        
-        # Get files to process from selected database
-        client = get_client(SELECTED_DATABASE)
+        database = SELECTED_DATABASE
+        client = get_client(database)
         
         # Try to get the main documents collection for this database
-        collections = client.list_collections()
+        collections = [c for c in client.list_collections() if c.name not in ANALYSIS_COLLECTIONS]
         if not collections:
-            raise HTTPException(status_code=400, detail=f"No collections found in database {SELECTED_DATABASE}")
+            raise HTTPException(status_code=400, detail=f"No collections found in database {database}")
         
-        # Use the first collection found (should be the documents collection)
+        # Use the first collection found (should be the documents collection);
+        # titles only -- the worker loads document text when the job runs
         collection = client.get_collection(collections[0].name)
-        results = collection.get(include=['documents', 'metadatas'])
+        results = collection.get(include=['metadatas'])
         
-        # Get analysis collection
-        analysis_collection = None
-        try:
-            analysis_collection = client.get_collection("llm_responses")
-        except:
-            analysis_collection = client.create_collection("llm_responses")
-        
-        # Get analyzed document IDs
-        analyzed_ids = set()
-        try:
-            analysis_results = analysis_collection.get(include=['metadatas'])
-            for metadata in analysis_results['metadatas']:
-                if metadata and 'source_document_id' in metadata:
-                    analyzed_ids.add(metadata['source_document_id'])
-        except:
-            pass
+        # Documents already analyzed, by this batch flow or by saved LLM responses
+        analyzed_ids = _analyzed_source_ids(client)
         
-        # Build processing queue
+        # Build processing queue: unprocessed documents, then re-analysis files
         processing_queue = []
-        
-        # Add unprocessed documents
         for i, doc_id in enumerate(results['ids']):
-            if doc_id not in analyzed_ids:
+            if doc_id not in analyzed_ids or doc_id in request.reanalyze_files:
                 metadata = results['metadatas'][i] if results['metadatas'] else {}
-                processing_queue.append({
-                    "id": doc_id,
-                    "title": metadata.get('title', f'Document {i+1}'),
-                    "content": results['documents'][i] if results['documents'] else '',
-                    "metadata": metadata
-                })
-        
-        # Add re-analysis files
-        for file_id in request.reanalyze_files:
-            if file_id in results['ids']:
-                idx = results['ids'].index(file_id)
-                metadata = results['metadatas'][idx] if results['metadatas'] else {}
-                processing_queue.append({
-                    "id": file_id,
-                    "title": metadata.get('title', f'Document {idx+1}'),
-                    "content": results['documents'][idx] if results['documents'] else '',
-                    "metadata": metadata
-                })
-        
-        batch_state["total_docs"] = len(processing_queue)
-        
-        # Start background processing
-        asyncio.create_task(process_batch_documents(processing_queue, request))
-        
-        return {"success": True, "total_docs": len(processing_queue)}
+                processing_queue.append({"id": doc_id, "title": metadata.get('title', f'Document {i+1}')})
         
+        store = await asyncio.to_thread(JobStore, database_path(database))
+        job_id = await asyncio.to_thread(store.create, collection.name, {
+            "database": database,
+            "provider": request.provider,
+            "prompt": request.prompt,
+            "master_contexts": request.master_contexts,
+            "concurrency": request.concurrency,
+            "use_cache": request.use_cache
+        }, processing_queue)
+        counts = await asyncio.to_thread(store.counts, job_id)
+        await _launch_batch_job(database, job_id)
+        
+        # Documents another running job already has queued are left to that job
+        return {"success": True, "job_id": job_id, "total_docs": sum(counts.values()),
+                "already_queued": len(processing_queue) - sum(counts.values())}
+        
+    except HTTPException:
+        raise
     except Exception as e:
-        batch_state["active"] = False
         raise HTTPException(status_code=500, detail=str(e))
 
-async def process_batch_documents(processing_queue: List[Dict], request: BatchAnalysisRequest):
-    """Background task to process documents"""
+async def _launch_batch_job(database: str, job_id: str):
+    counts = await asyncio.to_thread(lambda: JobStore(database_path(database)).counts(job_id))
+    batch_jobs[job_id] = {"job_id": job_id, "database": database, "active": True,
+                          "current_doc": "", "in_flight": 0, "rate_limited": 0, "tokens_used": 0, "cache_hits": 0,
+                          "started_at": time.time(), "finished_at_start": counts["done"] + counts["failed"],
+                          "feed": ProgressFeed()}
+    batch_jobs["latest"] = batch_jobs[job_id]
+    asyncio.create_task(process_batch_documents(database, job_id))
+
+def _load_master_contexts(database: str, names: List[str]) -> str:
+    contexts_dir = database_path(database) / "master_context"
+    content = ""
+    for context_name in names:
+        context_file = contexts_dir / f"{context_name}.txt"
+        if context_file.exists():
+            content += f"\n\n{context_file.read_text(encoding='utf-8')}"
+    if not content:
+        logger.warning("No master context content found - using empty context")
+    return content
+
+def _load_documents(collection, tasks: List[Dict]) -> List[Dict]:
+    """Document text and metadata for a job's remaining tasks, in queue order"""
+    data = collection.get(ids=[task["id"] for task in tasks], include=['documents', 'metadatas'])
+    found = {doc_id: (data['documents'][i], data['metadatas'][i] or {}) for i, doc_id in enumerate(data['ids'])}
+    return [{**task, "content": found[task["id"]][0] or '', "metadata": found[task["id"]][1]}
+            for task in tasks if task["id"] in found]
+
+async def process_batch_documents(database: str, job_id: str):
+    """Work a job's pending documents; the same call resumes it after a restart
+
+    Job store calls go through threads: an import can hold the sidecar's write
+    lock for a while, and waiting on it must not stall the event loop.
+    """
+    store = await asyncio.to_thread(JobStore, database_path(database))
+    job = await asyncio.to_thread(store.job, job_id)
+    params = job["params"]
+    live = batch_jobs[job_id]
     try:
-        # Load master contexts from selected database directory
-        master_context_content = ""
-        if request.master_contexts and SELECTED_DATABASE:
-            contexts_dir = Path.home() / "remember" / ".db" / SELECTED_DATABASE / "master_context"
-            for context_name in request.master_contexts:
-                context_file = contexts_dir / f"{context_name}.txt"
-                if context_file.exists():
-                    content = context_file.read_text(encoding='utf-8')
-                    master_context_content += f"\n\n{content}"
-        
-        if not master_context_content:
-            logger.warning("No master context content found - using empty context")
-            master_context_content = ""
-        
-        for i, doc in enumerate(processing_queue):
-            if not batch_state["active"]:
-                break
-                
-            batch_state["current_index"] = i + 1
-            batch_state["current_doc"] = doc["title"]
-            
-            try:
-                # Get document vector ID
-                vector_id = doc.get('id', 'unknown')
-                
-                # Use custom prompt if provided, otherwise use default
-                user_prompt = request.prompt.strip() if request.prompt.strip() else f"Please analyze this legal document: {doc['title']}"
-                
-                # Prepare messages for LLM with vector ID and custom prompt
-                messages = [
-                    {"role": "system", "content": master_context_content.strip()},
-                    {"role": "user", "content": f"{user_prompt}\n\nDocument Vector ID: {vector_id}\nTitle: {doc['title']}\n\nDocument content:\n{doc['content'][:8000]}"}  # Limit content size
-                ]
-                
-                # Get MCP tools
-                tools = get_mcp_tools()
-                
-                # Log the API request
+        master_context_content = _load_master_contexts(database, params["master_contexts"])
+        collection = get_client(database).get_collection(job["collection"])
+        tasks = await asyncio.to_thread(store.resumable_tasks, job_id)
+        docs = await asyncio.to_thread(_load_documents, collection, tasks)
+        for missing in {t["id"] for t in tasks} - {d["id"] for d in docs}:
+            await asyncio.to_thread(store.fail_task, job_id, missing, "Document no longer in collection")
+        tools = get_mcp_tools()
+        
+        def analysis_messages(doc: Dict, content: str, part: Optional[Tuple[int, int]] = None) -> List[Dict]:
+            # Use custom prompt if provided, otherwise use default
+            prompt = params["prompt"].strip()
+            user_prompt = prompt if prompt else f"Please analyze this legal document: {doc['title']}"
+            label = f"Document content (part {part[0]} of {part[1]})" if part else "Document content"
+            return [
+                {"role": "system", "content": master_context_content.strip()},
+                {"role": "user", "content": f"{user_prompt}\n\nDocument Vector ID: {doc.get('id', 'unknown')}\nTitle: {doc['title']}\n\n{label}:\n{content}"}
+            ]
+        
+        def reduce_messages(doc: Dict, partials: List[str]) -> List[Dict]:
+            frame = analysis_messages(doc, "")
+            frame[1]["content"] += (f"(The document was too long for one request, so it was analyzed in {len(partials)} parts. "
+                                    f"Combine the partial analyses below into one analysis of the whole document.)\n\n")
+            joined = "\n\n".join(f"--- Part {i} analysis ---\n{text}" for i, text in enumerate(partials, 1))
+            frame[1]["content"] += truncate_tokens(joined, content_budget(params["provider"], frame))
+            return frame
+        
+        # Token-exact packing: the whole document when it fits the model's window after the
+        # master context, prompt and reserve; otherwise window-sized parts, analyzed then combined
+        packings: Dict[str, Dict] = {}
+        
+        def packing(doc: Dict) -> Dict:
+            if doc["id"] not in packings:
+                try:
+                    packings[doc["id"]] = pack_document(params["provider"], analysis_messages(doc, ""), doc["content"],
+                                                        chunk_frame=analysis_messages(doc, "", (9999, 9999)))
+                except ValueError as e:
+                    packings[doc["id"]] = {"fits": True, "content": "", "chunks": [""], "error": str(e)}
+            return packings[doc["id"]]
+        
+        def first_request(doc: Dict) -> List[Dict]:
+            packed = packing(doc)
+            if packed["fits"]:
+                return analysis_messages(doc, packed["content"])
+            return analysis_messages(doc, packed["chunks"][0], (1, len(packed["chunks"])))
+        
+        # Identical (model, messages, tools) requests are answered from the response cache
+        cache = get_llm_cache()
+        use_cache = params.get("use_cache", True)
+        
+        def response_key(doc: Dict) -> str:
+            kind = "function_call_chat" if packing(doc)["fits"] else "map_reduce"
+            return cache_key(params["provider"], analysis_messages(doc, doc["content"]), tools, kind=kind)
+        
+        def cached_analysis(doc: Dict):
+            response = cache.get(response_key(doc)) if use_cache else None
+            return (True, response, {"cached": True}) if response is not None else None
+        
+        # Tokenizing every document and the cache lookups are too slow for the event loop:
+        # done once up front on a thread, so the scheduler's hooks are dict lookups
+        estimates: Dict[str, int] = {}
+        hits: Dict[str, Tuple[bool, Any, Any]] = {}
+        
+        def prepare(docs: List[Dict]):
+            for doc in docs:
+                estimates[doc["id"]] = estimate_tokens(first_request(doc))
+                hit = cached_analysis(doc)
+                if hit is not None:
+                    hits[doc["id"]] = hit
+        
+        def llm_call(doc: Dict, messages: List[Dict]):
+            """One logged, cached request (a retried document reuses the parts it already finished)"""
+            vector_id = doc.get('id', 'unknown')
+            
+            def call():
                 session_id = log_llm_interaction("llm_request", {
-                    "model": request.provider,
+                    "model": params["provider"],
                     "messages": messages,
                     "tools": tools,
                     "document_vector_id": vector_id,
                     "document_title": doc['title']
-                })
+                }, f"{vector_id}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}")
                 
-                # Make LLM call
                 success, response, debug = groq_client.function_call_chat(
                     messages=messages,
                     tools=tools,
-                    model=request.provider
+                    model=params["provider"]
                 )
                 
-                # Log the API response
                 log_llm_interaction("llm_response", {
                     "success": success,
                     "response": response,
                     "debug": debug,
                     "document_vector_id": vector_id,
-                    "model": request.provider
+                    "model": params["provider"]
                 }, session_id)
-                
-                if success:
-                    # Auto-save analysis
-                    await auto_save_analysis(doc, response, request.database)
-                    
-                    batch_state["processed_docs"].append({
-                        "title": doc["title"],
-                        "success": True,
-                        "characters": len(response) if isinstance(response, str) else 0
-                    })
-                    batch_state["success_count"] += 1
-                    
-                else:
-                    batch_state["processed_docs"].append({
-                        "title": doc["title"],
-                        "success": False,
-                        "error": str(debug)[:100],
-                        "characters": 0
-                    })
-                    batch_state["failed_count"] += 1
-                
-            except Exception as e:
-                batch_state["processed_docs"].append({
-                    "title": doc["title"],
-                    "success": False,
-                    "error": str(e)[:100],
-                    "characters": 0
-                })
-                batch_state["failed_count"] += 1
-            
-            # Small delay between documents
-            await asyncio.sleep(2)
+                return success, response, debug
+            
+            key = cache_key(params["provider"], messages, tools, kind="function_call_chat")
+            return cache.cached_call(key, params["provider"], call, use_cache)[0]
+        
+        def analyze(doc: Dict):
+            """Runs on a scheduler worker thread, never on the event loop"""
+            packed = packing(doc)
+            if packed.get("error"):
+                return False, None, packed["error"]
+            if packed["fits"]:
+                return llm_call(doc, first_request(doc))
+            
+            # Map: each part on its own (the scheduler already budgeted the first request)
+            partials = []
+            for i, chunk in enumerate(packed["chunks"], 1):
+                messages = analysis_messages(doc, chunk, (i, len(packed["chunks"])))
+                if i > 1:
+                    scheduler.budget.wait(estimate_tokens(messages))
+                success, response, debug = llm_call(doc, messages)
+                if not success:
+                    return success, response, debug
+                partials.append(_response_text(response))
+            
+            # Reduce: one request over the partial analyses
+            messages = reduce_messages(doc, partials)
+            scheduler.budget.wait(estimate_tokens(messages))
+            success, response, debug = llm_call(doc, messages)
+            if success:
+                cache.put(response_key(doc), params["provider"], response)
+            return success, response, debug
+        
+        async def started(doc: Dict):
+            await asyncio.to_thread(store.start_task, job_id, doc["id"])
+            live["current_doc"] = doc["title"]
+            live["in_flight"] = scheduler.in_flight
+            live["feed"].publish("started", {"id": doc["id"], "title": doc["title"], "in_flight": scheduler.in_flight})
+        
+        async def finished(doc: Dict, success: bool, response: Any, debug: Any):
+            live["in_flight"] = scheduler.in_flight
+            live["rate_limited"] = scheduler.rate_limited
+            if isinstance(debug, dict) and debug.get("cached"):
+                live["cache_hits"] += 1
+            else:
+                live["tokens_used"] += _usage_tokens(response) or estimates[doc["id"]]
+            characters, error = 0, None
+            if success:
+                try:
+                    # Written to disk, the job store and the analyses collection before the next result
+                    analysis = await auto_save_analysis(doc, response, job)
+                    await asyncio.to_thread(store.complete_task, job_id, doc["id"], analysis)
+                    await asyncio.to_thread(store_analysis, database, analysis)
+                    characters = analysis["character_count"]
+                except Exception as e:
+                    success, error = False, str(e)[:100]
+            else:
+                error = str(debug)[:100]
+            if not success:
+                await asyncio.to_thread(store.fail_task, job_id, doc["id"], error)
+            progress = await asyncio.to_thread(_batch_metrics, store, job_id, live)
+            live["feed"].publish("finished", {
+                "doc": {"id": doc["id"], "title": doc["title"], "success": success, "characters": characters, "error": error},
+                "progress": progress
+            })
         
-        # Save final JSON and import to MCP when batch processing completes
-        await finalize_batch_analysis()
+        # Several calls in flight under the model's requests/min and tokens/min budget;
+        # 429s shrink the in-flight limit and pause the model instead of failing documents
+        await asyncio.to_thread(prepare, docs)
+        scheduler = LLMScheduler(params["provider"], params["concurrency"])
+        await scheduler.run(docs, analyze, lambda doc: estimates[doc["id"]],
+                            finished, should_continue=lambda: live["active"], on_start=started,
+                            cached=lambda doc: hits.pop(doc["id"], None))
         
-        batch_state["active"] = False
+        if live["active"]:
+            await asyncio.to_thread(store.set_status, job_id, "completed")
+            # Save final JSON when batch processing completes
+            await finalize_batch_analysis(database, await asyncio.to_thread(store.job, job_id))
         
     except Exception as e:
         print(f"Batch processing error: {e}")
-        batch_state["active"] = False
+        await asyncio.to_thread(store.set_status, job_id, "failed")
+    finally:
+        live["active"] = False
+        status = (await asyncio.to_thread(store.job, job_id))["status"]
+        progress = await asyncio.to_thread(_batch_metrics, store, job_id, live)
+        live["feed"].close("end", {"status": status, "progress": progress})
+
+def _usage_tokens(response: Any) -> Optional[int]:
+    """Tokens the provider reported for a call, when the response carries its usage block"""
+    if isinstance(response, dict):
+        return (response.get("usage") or {}).get("total_tokens")
+    return None
+
+def _batch_metrics(store: JobStore, job_id: str, live: Dict) -> Dict[str, Any]:
+    """Counts plus throughput and ETA for this run (a resumed job's earlier work doesn't skew the rate)"""
+    counts = store.counts(job_id)
+    finished = counts["done"] + counts["failed"]
+    total = sum(counts.values())
+    elapsed = time.time() - live.get("started_at", time.time())
+    rate = (finished - live.get("finished_at_start", finished)) / elapsed if elapsed > 0 else 0.0
+    return {
+        "total_docs": total,
+        "current_index": finished,
+        "success_count": counts["done"],
+        "failed_count": counts["failed"],
+        "in_flight": live.get("in_flight", 0),
+        "rate_limited": live.get("rate_limited", 0),
+        "tokens_used": live.get("tokens_used", 0),
+        "cache_hits": live.get("cache_hits", 0),
+        "elapsed_seconds": round(elapsed),
+        "docs_per_minute": round(rate * 60, 2),
+        "eta_seconds": round((total - finished) / rate) if rate > 0 else None
+    }
 
-async def finalize_batch_analysis():
-    """Save comprehensive JSON file and import analysis results to MCP"""
+async def finalize_batch_analysis(database: str, job: Dict):
+    """Save a comprehensive JSON file of the job's analyses (each one is already in ChromaDB)"""
     try:
-        if not SELECTED_DATABASE or not batch_state.get('analysis_results'):
+        store = await asyncio.to_thread(JobStore, database_path(database))
+        analyses = await asyncio.to_thread(store.results, job["job_id"])
+        if not analyses:
             return
+        counts = await asyncio.to_thread(store.counts, job["job_id"])
         
-        db_path = Path.home() / "remember" / ".db" / SELECTED_DATABASE
-        analysis_dir = db_path / "analysis"
+        analysis_dir = database_path(database) / "analysis"
         analysis_dir.mkdir(exist_ok=True)
         
         # Create comprehensive JSON file with all analysis results
@@ -2381,15 +2527,16 @@ async def finalize_batch_analysis():
         # Prepare final JSON data
         final_json_data = {
             "batch_info": {
-                "database": SELECTED_DATABASE,
+                "job_id": job["job_id"],
+                "database": database,
                 "generated_at": datetime.now().isoformat(),
-                "model_used": batch_state.get('current_model', 'Unknown'),
-                "master_contexts": batch_state.get('selected_contexts', []),
-                "total_analyses": len(batch_state['analysis_results']),
-                "success_count": batch_state.get('success_count', 0),
-                "failed_count": batch_state.get('failed_count', 0)
+                "model_used": job["params"]["provider"],
+                "master_contexts": job["params"]["master_contexts"],
+                "total_analyses": len(analyses),
+                "success_count": counts["done"],
+                "failed_count": counts["failed"]
             },
-            "analyses": batch_state['analysis_results']
+            "analyses": analyses
         }
         
         # Save JSON file
@@ -2398,89 +2545,67 @@ async def finalize_batch_analysis():
         
         print(f"📄 Saved batch analysis JSON: {json_filename}")
         
-        # Import analysis results to MCP (ChromaDB)
-        client = get_client(SELECTED_DATABASE)
-        
-        # Create analysis collection if it doesn't exist
-        try:
-            analysis_collection = client.get_collection("analyses")
-        except:
-            analysis_collection = client.create_collection("analyses", metadata={
-                "type": "legal_analyses",
-                "created": datetime.now().isoformat()
-            })
-        
-        # Prepare data for ChromaDB import
-        if batch_state['analysis_results']:
-            documents = []
-            metadatas = []
-            ids = []
-            
-            for analysis in batch_state['analysis_results']:
-                documents.append(analysis['content'])
-                metadatas.append({
-                    "title": analysis['title'],
-                    "source_document_id": analysis['source_document_id'],
-                    "analysis_id": analysis['analysis_id'],
-                    "database": analysis['database'],
-                    "master_contexts": json.dumps(analysis['master_contexts']),
-                    "model_used": analysis['model_used'],
-                    "character_count": analysis['character_count'],
-                    "generated_at": analysis['generated_at'],
-                    "markdown_file": analysis['markdown_file'],
-                    "type": "legal_analysis"
-                })
-                ids.append(analysis['analysis_id'])
-            
-            # Import to ChromaDB
-            analysis_collection.add(
-                documents=documents,
-                metadatas=metadatas,
-                ids=ids
-            )
-            
-            print(f"🚀 Imported {len(batch_state['analysis_results'])} analyses to ChromaDB")
-        
-        # Clear the batch analysis results
-        batch_state['analysis_results'] = []
-        
     except Exception as e:
         print(f"Error finalizing batch analysis: {e}")
 
-async def auto_save_analysis(doc: Dict, analysis: str, database: str):
-    """Save analysis to selected database's analysis folder and prepare for JSON compilation"""
-    try:
-        # Extract content from response if it's a complex object
-        if isinstance(analysis, dict):
-            content = analysis.get('choices', [{}])[0].get('message', {}).get('content', str(analysis))
-        else:
-            content = str(analysis)
-        
-        # Get the selected database directory
-        if not SELECTED_DATABASE:
-            print("No selected database for analysis saving")
-            return
-            
-        db_path = Path.home() / "remember" / ".db" / SELECTED_DATABASE
-        analysis_dir = db_path / "analysis"
-        analysis_dir.mkdir(exist_ok=True)
-        
-        # Generate unique analysis ID and filename
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        analysis_id = f"analysis_{doc['id']}_{timestamp}"
-        filename = f"{analysis_id}.md"
-        
-        # Create markdown content with master context info
-        master_contexts_used = batch_state.get("selected_contexts", [])
-        master_context_str = ", ".join(master_contexts_used) if master_contexts_used else "Default Legal Analysis"
-        
-        markdown_content = f"""# Legal Analysis - {doc['title']}
+def store_analysis(database: str, analysis: Dict):
+    """Add one finished analysis to the database's analyses collection"""
+    client = get_client(database)
+    analysis_collection = client.get_or_create_collection("analyses", metadata={
+        "type": "legal_analyses",
+        "created": datetime.now().isoformat()
+    })
+    analysis_collection.upsert(
+        documents=[analysis['content']],
+        metadatas=[{
+            "title": analysis['title'],
+            "source_document_id": analysis['source_document_id'],
+            "analysis_id": analysis['analysis_id'],
+            "database": analysis['database'],
+            "master_contexts": json.dumps(analysis['master_contexts']),
+            "model_used": analysis['model_used'],
+            "character_count": analysis['character_count'],
+            "generated_at": analysis['generated_at'],
+            "markdown_file": analysis['markdown_file'],
+            "type": "legal_analysis"
+        }],
+        ids=[analysis['analysis_id']]
+    )
+    _analyzed_sources(client).record(analysis['source_document_id'])
+    client.mark_changed()
+
+def _response_text(response: Any) -> str:
+    """Message text of a chat response, whether it came back as a dict or a string"""
+    # Extract content from response if it's a complex object
+    if isinstance(response, dict):
+        return response.get('choices', [{}])[0].get('message', {}).get('content', str(response))
+    return str(response)
+
+async def auto_save_analysis(doc: Dict, analysis: Any, job: Dict) -> Dict:
+    """Save analysis to the job's database analysis folder; returns the record for the job store"""
+    content = _response_text(analysis)
+    
+    database = job["params"]["database"]
+    model_used = job["params"]["provider"]
+    analysis_dir = database_path(database) / "analysis"
+    analysis_dir.mkdir(exist_ok=True)
+    
+    # Generate unique analysis ID and filename
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    analysis_id = f"analysis_{doc['id']}_{timestamp}"
+    filename = f"{analysis_id}.md"
+    
+    # Create markdown content with master context info
+    master_contexts_used = job["params"]["master_contexts"]
+    master_context_str = ", ".join(master_contexts_used) if master_contexts_used else "Default Legal Analysis"
+    
+    markdown_content = f"""# Legal Analysis - {doc['title']}
 
 **Generated:** {datetime.now().isoformat()}
 **Source Document:** {doc['id']}
-**Database:** {SELECTED_DATABASE}
+**Database:** {database}
 **Master Context Used:** {master_context_str}
-**Model Used:** {batch_state.get('current_model', 'Unknown')}
+**Model Used:** {model_used}
 
 ## Analysis
 
@@ -2492,63 +2617,158 @@ async def auto_save_analysis(doc: Dict, analysis: str, database: str):
 - Vector ID: {doc['id']}
 - Original Length: {len(doc.get('content', ''))} characters
 """
-        
-        # Save markdown file
-        md_file_path = analysis_dir / filename
-        with open(md_file_path, 'w', encoding='utf-8') as f:
-            f.write(markdown_content)
-        
-        # Store analysis data for JSON compilation (we'll collect these and save at the end)
-        analysis_data = {
-            "analysis_id": analysis_id,
-            "source_document_id": doc['id'],
-            "title": f"Legal Analysis - {doc['title']}",
-            "content": content,
-            "markdown_file": str(md_file_path),
-            "database": SELECTED_DATABASE,
-            "master_contexts": master_contexts_used,
-            "model_used": batch_state.get('current_model', 'Unknown'),
-            "character_count": len(content),
-            "generated_at": datetime.now().isoformat(),
-            "source_metadata": {
-                "title": doc.get('title', 'Unknown'),
-                "url": doc.get('metadata', {}).get('url', 'N/A'),
-                "vector_id": doc['id'],
-                "original_length": len(doc.get('content', ''))
-            }
+    
+    # Save markdown file
+    md_file_path = analysis_dir / filename
+    with open(md_file_path, 'w', encoding='utf-8') as f:
+        f.write(markdown_content)
+    
+    print(f"✅ Analysis saved: {filename}")
+    return {
+        "analysis_id": analysis_id,
+        "source_document_id": doc['id'],
+        "title": f"Legal Analysis - {doc['title']}",
+        "content": content,
+        "markdown_file": str(md_file_path),
+        "database": database,
+        "master_contexts": master_contexts_used,
+        "model_used": model_used,
+        "character_count": len(content),
+        "generated_at": datetime.now().isoformat(),
+        "source_metadata": {
+            "title": doc.get('title', 'Unknown'),
+            "url": doc.get('metadata', {}).get('url', 'N/A'),
+            "vector_id": doc['id'],
+            "original_length": len(doc.get('content', ''))
         }
-        
-        # Add to global batch analysis collection
-        if not hasattr(batch_state, 'analysis_results'):
-            batch_state['analysis_results'] = []
-        batch_state['analysis_results'].append(analysis_data)
-        
-        print(f"✅ Analysis saved: {filename}")
-            
-    except Exception as e:
-        print(f"Auto-save error: {e}")
+    }
 
-@app.get("/api/batch_progress")
-async def get_batch_progress():
-    """Get current batch processing progress"""
+async def _batch_job(job_id: Optional[str], database: Optional[str]) -> Tuple[JobStore, Dict, Dict]:
+    """(store, job, live state) for a job ID, or the most recently started job"""
+    live = batch_jobs.get(job_id or "latest")
+    if live is None and not job_id:
+        raise HTTPException(status_code=404, detail="No batch job has been started")
+    job_id = job_id or live["job_id"]
+    database = database or (live or {}).get("database") or SELECTED_DATABASE
+    store = await asyncio.to_thread(JobStore, database_path(database))
+    job = await asyncio.to_thread(store.job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"No batch job {job_id} in {database}")
+    return store, job, live or {}
+
+def _batch_progress(store: JobStore, job: Dict, live: Dict) -> Dict[str, Any]:
+    counts = store.counts(job["job_id"])
     return {
-        "active": batch_state["active"],
-        "total_docs": batch_state["total_docs"],
-        "current_index": batch_state["current_index"],
-        "current_doc": batch_state["current_doc"],
-        "success_count": batch_state["success_count"],
-        "failed_count": batch_state["failed_count"],
-        "processed_docs": batch_state["processed_docs"],
-        "start_time": batch_state["start_time"],
-        "current_model": batch_state["current_model"],
-        "selected_contexts": batch_state["selected_contexts"]
+        "job_id": job["job_id"],
+        "database": job["params"]["database"],
+        "status": job["status"],
+        "active": live.get("active", False),
+        "total_docs": sum(counts.values()),
+        "current_index": counts["done"] + counts["failed"],
+        "current_doc": live.get("current_doc", ""),
+        "in_flight": live.get("in_flight", 0),
+        "rate_limited": live.get("rate_limited", 0),
+        "success_count": counts["done"],
+        "failed_count": counts["failed"],
+        "processed_docs": [{"title": task["title"], "success": task["status"] == "done",
+                            "characters": task["characters"], "error": task["error"]}
+                           for task in store.finished_tasks(job["job_id"])],
+        "start_time": job["created"],
+        "current_model": job["params"]["provider"],
+        "selected_contexts": job["params"]["master_contexts"]
     }
 
+@app.get("/api/batch_progress")
+async def get_batch_progress(job_id: Optional[str] = Query(None), database: Optional[str] = Query(None)):
+    """Progress of one batch job (default: the most recently started)"""
+    if not job_id and "latest" not in batch_jobs:
+        return {"active": False, "total_docs": 0, "current_index": 0, "success_count": 0, "failed_count": 0,
+                "processed_docs": []}
+    return await asyncio.to_thread(_batch_progress, *await _batch_job(job_id, database))
+
+@app.get("/api/batch_events")
+async def batch_events(request: Request, job_id: Optional[str] = Query(None), database: Optional[str] = Query(None)):
+    """Server-Sent Events for one batch job: a snapshot, then started/finished events, then end
+
+    Reconnects send Last-Event-ID and get only the events they missed; a client
+    too far behind (or from before a restart) gets a fresh snapshot instead.
+    """
+    store, job, live = await _batch_job(job_id, database)
+    job_id = job["job_id"]
+    feed = live.get("feed")
+    after = feed.resume_point(request.headers.get("last-event-id")) if feed else None
+    
+    async def stream():
+        nonlocal after
+        if after is None:
+            after = feed.last_id if feed else 0
+            recent = (await asyncio.to_thread(store.finished_tasks, job_id))[-BATCH_RECENT_DOCS:]
+            status = (await asyncio.to_thread(store.job, job_id))["status"]
+            yield sse_message("snapshot", {
+                "status": status,
+                "active": live.get("active", False),
+                "current_doc": live.get("current_doc", ""),
+                "current_model": job["params"]["provider"],
+                "selected_contexts": job["params"]["master_contexts"],
+                "recent": [{"id": t["id"], "title": t["title"], "success": t["status"] == "done",
+                            "characters": t["characters"], "error": t["error"]} for t in recent],
+                "progress": await asyncio.to_thread(_batch_metrics, store, job_id, live)
+            }, feed.event_id(after) if feed else None)
+            if not live.get("active"):
+                yield sse_message("end", {"status": status})
+                return
+        async for item in feed.follow(after):
+            if await request.is_disconnected():
+                return
+            yield SSE_HEARTBEAT if item is None else sse_message(item[1], item[2], feed.event_id(item[0]))
+    
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.get("/api/batch_jobs")
+async def list_batch_jobs(database: Optional[str] = Query(None)):
+    """Every batch job recorded for a database, newest first"""
+    database = database or SELECTED_DATABASE
+    
+    def progress():
+        store = JobStore(database_path(database))
+        return [_batch_progress(store, job, batch_jobs.get(job["job_id"], {})) for job in store.jobs()]
+    
+    return {"jobs": await asyncio.to_thread(progress)}
+
+@app.post("/api/batch_jobs/{job_id}/resume")
+async def resume_batch_job(job_id: str, database: Optional[str] = Query(None)):
+    """Pick a cancelled or failed job back up where it stopped"""
+    store, job, live = await _batch_job(job_id, database)
+    if live.get("active") or job["status"] == "completed":
+        return {"success": True, "job_id": job_id, "status": "running" if live.get("active") else job["status"]}
+    await asyncio.to_thread(store.set_status, job_id, "running")
+    await _launch_batch_job(job["params"]["database"], job_id)
+    return {"success": True, "job_id": job_id}
+
 @app.post("/api/cancel_batch")
-async def cancel_batch():
-    """Cancel batch processing"""
-    batch_state["active"] = False
-    return {"success": True}
+async def cancel_batch(job_id: Optional[str] = Query(None), database: Optional[str] = Query(None)):
+    """Cancel a batch job (default: the most recently started); finished results are kept"""
+    store, job, live = await _batch_job(job_id, database)
+    live["active"] = False
+    await asyncio.to_thread(store.set_status, job["job_id"], "cancelled")
+    return {"success": True, "job_id": job["job_id"]}
+
+@app.on_event("startup")
+async def resume_interrupted_batch_jobs():
+    """Restart jobs a crash or shutdown left running, in every database"""
+    if not DB_ROOT.exists():
+        return
+    for db_dir in DB_ROOT.iterdir():
+        if db_dir.is_dir() and JobStore.exists(db_dir):
+            for job in await asyncio.to_thread(lambda: JobStore(db_dir).jobs(status="running")):
+                print(f"🔁 Resuming batch job {job['job_id']} in {db_dir.name}")
+                await _launch_batch_job(db_dir.name, job["job_id"])
+
+@app.on_event("startup")
+async def warm_up_groq():
+    """Optional Groq API probe (REMEMBER_GROQ_WARMUP=1), run off the event loop so it never delays startup"""
+    asyncio.get_running_loop().run_in_executor(None, warm_up)
 
 @app.post("/api/chunk_large_documents")
 async def chunk_large_documents(request: ChunkDocumentsRequest):
@@ -2569,15 +2789,7 @@ async def chunk_large_documents(request: ChunkDocumentsRequest):
         
         # Get existing analysis to avoid processing analyzed documents
         analysis_collection = None
-        analyzed_ids = set()
-        try:
-            analysis_collection = client.get_collection("llm_responses")
-            analysis_results = analysis_collection.get(include=['metadatas'])
-            for metadata in analysis_results['metadatas']:
-                if metadata and 'source_document_id' in metadata:
-                    analyzed_ids.add(metadata['source_document_id'])
-        except:
-            pass
+        analyzed_ids = _analyzed_source_ids(client)
         
         for i, doc_id in enumerate(all_data['ids']):
             # Skip already analyzed documents
@@ -2636,7 +2848,8 @@ async def chunk_large_documents(request: ChunkDocumentsRequest):
                         "character_count": len(chunk_content),
                         "token_count": int(len(chunk_content.split()) * 1.3),
                         "title": f"{metadata.get('title', 'Unknown')} - Chunk {chunk_idx}/{len(chunks)}",
-                        "created": datetime.now().isoformat()
+                        "created": datetime.now().isoformat(),
+                        "created_ts": int(datetime.now().timestamp())
                     })
                     
                     # Add chunk to collection
@@ -2650,6 +2863,9 @@ async def chunk_large_documents(request: ChunkDocumentsRequest):
                 
                 chunked_count += 1
         
+        if total_chunks_created:
+            client.mark_changed()
+        
         return {
             "success": True,
             "model": request.model,
@@ -2800,6 +3016,7 @@ async def clear_analysis_status(request: dict):
         # Delete the analysis records
         if to_delete:
             analysis_collection.delete(ids=to_delete)
+            client.mark_changed()
         
         return {
             "success": True,
@@ -2933,6 +3150,104 @@ async def view_file_content(file_id: str = Query(...), database: str = Query(...
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _encode_cursor(offset: int, version: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"o": offset, "v": version}).encode()).decode().rstrip("=")
+
+def _decode_cursor(cursor: str) -> Dict[str, int]:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return {"offset": int(data["o"]), "version": int(data["v"])}
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _search_hits(collections, ranked, query: str, mode: str) -> List[Dict[str, Any]]:
+    """Hydrate ranked IDs and reduce each hit to its best passage"""
+    return [_search_hit(hit) for hit in attach_previews(hydrate(collections, ranked), query, mode)]
+
+def _search_hit(hit: Dict) -> Dict[str, Any]:
+    """Snippet-only payload; the full document stays behind /api/view_file"""
+    metadata = hit["metadata"]
+    return {
+        "id": hit["id"],
+        "collection": hit["collection"],
+        "title": metadata.get("title", "No Title"),
+        "url": metadata.get("url", ""),
+        "rating": metadata.get("rating", 0),
+        "relevance": round(hit["relevance"], 4),
+        "character_count": metadata.get("character_count", len(hit["document"] or "")),
+        "snippet": hit["preview"],
+        "highlights": hit["highlights"]
+    }
+
+@app.get("/api/search")
+async def search_documents(query: str = Query(...), database: Optional[str] = Query(None),
+                           limit: int = Query(SEARCH_PAGE_SIZE, ge=1, le=SEARCH_MAX_PAGE_SIZE),
+                           cursor: Optional[str] = Query(None), stream: bool = Query(False),
+                           mode: str = Query("hybrid"), min_rating: Optional[int] = Query(None, ge=1, le=5),
+                           session: Optional[str] = Query(None), project: Optional[str] = Query(None),
+                           created_after: Optional[str] = Query(None), created_before: Optional[str] = Query(None),
+                           has_analysis: Optional[bool] = Query(None), is_chunk: Optional[bool] = Query(None)):
+    """Ranked search over the selected database, one cursor page at a time (NDJSON with stream=true)
+
+    mode=lexical answers from the BM25 index alone, without loading the embedding model.
+    Metadata filters go into the Chroma query; send the same filters with each cursor.
+    """
+    database_name = SELECTED_DATABASE or database
+    if not database_name or database_name == "null":
+        raise HTTPException(status_code=400, detail="No database selected")
+    if mode not in SEARCH_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of: {', '.join(SEARCH_MODES)}")
+    
+    try:
+        where = build_where(min_rating, session, project, created_after, created_before, has_analysis, is_chunk)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid date filter: {e}")
+    
+    client = get_client(database_name)
+    collections = [client.get_collection(c.name) for c in client.list_collections()
+                   if c.name not in ANALYSIS_COLLECTIONS]
+    if uses_dates(where):
+        for collection in collections:
+            await asyncio.to_thread(backfill_created_ts, database_path(database_name), collection)
+    version = database_version(database_path(database_name))
+    
+    offset = 0
+    if cursor:
+        position = _decode_cursor(cursor)
+        if position["version"] != version:
+            raise HTTPException(status_code=410, detail="Database changed since this cursor was issued; search again")
+        offset = position["offset"]
+    
+    # Ranking is IDs + scores only and cached per version, so later pages skip the vector query
+    outcome = await asyncio.to_thread(rank_documents, collections, query, SEARCH_DEPTH,
+                                      database_path(database_name), version, mode, where=where)
+    ranked = outcome["ranked"]
+    page = ranked[offset:offset + limit]
+    next_offset = offset + len(page)
+    meta = {
+        "query": query,
+        "database": database_name,
+        "mode": mode,
+        "where": where,
+        "total_ranked": len(ranked),
+        "offset": offset,
+        "next_cursor": _encode_cursor(next_offset, version) if next_offset < len(ranked) else None,
+        "cached": outcome["cached"],
+        "timings": {name: round(seconds, 4) for name, seconds in outcome["timings"].items()}
+    }
+    
+    if stream:
+        def ndjson():
+            yield json.dumps({"type": "meta", **meta}) + "\n"
+            for start in range(0, len(page), SEARCH_STREAM_CHUNK):
+                for hit in _search_hits(collections, page[start:start + SEARCH_STREAM_CHUNK], query, mode):
+                    yield json.dumps({"type": "result", **hit}) + "\n"
+            yield json.dumps({"type": "end", "next_cursor": meta["next_cursor"]}) + "\n"
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+    
+    hits = await asyncio.to_thread(_search_hits, collections, page, query, mode)
+    return {**meta, "results": hits}
+
 # Include other endpoints from original file...
 @app.post("/api/chat")
 async def process_chat_request(request: dict):
@@ -2974,61 +3289,43 @@ async def import_from_extracted(request: dict):
             return {"success": False, "error": "No markdown files found in extracted/ folder"}
         
         # Import to ChromaDB
-        client = get_client(database_name)
-        collection = client.get_or_create_collection(database_name)
+        client = await asyncio.to_thread(get_client, database_name)
+        collection = await asyncio.to_thread(client.get_or_create_collection, database_name)
         
-        # Check existing documents to avoid duplicates
-        existing_data = collection.get()
-        existing_titles = set()
-        if existing_data['metadatas']:
-            existing_titles = {metadata.get('title', '') for metadata in existing_data['metadatas'] if metadata}
-        
-        documents, metadatas, ids = [], [], []
-        vector_ids_created = []
-        doc_counter = len(existing_data['ids']) + 1 if existing_data['ids'] else 1
-        
-        for md_file in md_files:
-            try:
-                content = md_file.read_text(encoding='utf-8')
-                if len(content) < 50:  # Skip very short files
+        def md_records():
+            for position, md_file in enumerate(md_files, 1):
+                try:
+                    content = md_file.read_text(encoding='utf-8')
+                except Exception as e:
+                    logger.error(f"Error processing {md_file}: {e}")
                     continue
-                    
-                # Extract title from filename or content
-                title = md_file.stem.replace('extracted_', '').replace('_', ' ')
-                
-                # Skip if already imported
-                if title in existing_titles:
+                if len(content) < 50:  # Skip very short files
                     continue
-                    
-                vector_id = f"doc_{doc_counter:03d}"
-                
-                metadata = {
-                    "title": title,
-                    "source_file": str(md_file),
-                    "imported_from": "extracted_folder",
-                    "created": datetime.now().isoformat(),
-                    "vector_id": vector_id,
-                    "character_count": len(content)
-                }
-                
-                documents.append(content)
-                metadatas.append(metadata)
-                ids.append(vector_id)
-                vector_ids_created.append(vector_id)
-                doc_counter += 1
-                
-            except Exception as e:
-                logger.error(f"Error processing {md_file}: {e}")
-                continue
-        
-        if documents:
-            collection.add(documents=documents, metadatas=metadatas, ids=ids)
+                # The file path is the identity, so an edited file replaces its old vector
+                yield {"url": md_file.as_uri(), "source_file": str(md_file), "content": content,
+                       "title": md_file.stem.replace('extracted_', '').replace('_', ' ')}, position
+
+        def build_metadata(record: Dict, vector_id: str, content: str) -> Dict[str, Any]:
+            return {
+                "title": record["title"],
+                "source_file": record["source_file"],
+                "imported_from": "extracted_folder",
+                "created": datetime.now().isoformat(),
+                "vector_id": vector_id,
+                "character_count": len(content)
+            }
+
+        # Duplicates are caught by content hash in the sidecar index, not by re-reading the collection;
+        # embedding and sidecar transactions run on a thread so the event loop keeps serving
+        counts = await asyncio.to_thread(import_records, collection, md_records(), build_metadata, None,
+                                         len(md_files), progress=lambda *_: None, db_path=db_path)
         
         return {
             "success": True,
-            "imported_count": len(documents),
-            "vector_ids_created": vector_ids_created,
-            "skipped_duplicates": len(md_files) - len(documents)
+            "imported_count": len(counts["created"]) + len(counts["updated"]),
+            "vector_ids_created": counts["created"],
+            "vector_ids_updated": counts["updated"],
+            "skipped_duplicates": counts["skipped"]
         }
         
     except Exception as e:
@@ -3046,7 +3343,8 @@ async def import_from_json(request: dict):
         db_path = Path.home() / "remember" / ".db" / database_name
         
         # Look for JSON files in the database directory and extracted/ subdirectory
-        json_files = list(db_path.glob("*.json")) + list(db_path.glob("extracted/*.json"))
+        json_files = [f for pattern in ("*.json", "*.jsonl", "extracted/*.json", "extracted/*.jsonl")
+                      for f in db_path.glob(pattern)]
         
         if not json_files:
             return {"success": False, "error": "No JSON files found"}
@@ -3057,20 +3355,13 @@ async def import_from_json(request: dict):
         
         for json_file in json_files:
             try:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                # Skip if not extraction format
-                if not isinstance(data, list) or not data:
-                    continue
-                    
-                # Check if it looks like extraction data
-                first_item = data[0]
+                # Check if it looks like extraction data (reads only the first record)
+                first_item = await asyncio.to_thread(peek_json_record, json_file)
                 if not isinstance(first_item, dict) or 'content' not in first_item:
                     continue
                     
-                # Import using existing function
-                result = import_to_project(database_name, str(json_file))
+                # Import using existing function, on a thread (it embeds and holds sidecar transactions)
+                result = await asyncio.to_thread(import_to_project, database_name, str(json_file))
                 if result:
                     total_imported += result['urls_imported']
                     vector_ids_created.extend(result.get('vector_ids_created', []))